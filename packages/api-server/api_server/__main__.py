@@ -1,3 +1,5 @@
+import importlib.util
+
 import uvicorn
 import uvicorn.logging
 from uvicorn.config import LOGGING_CONFIG
@@ -18,6 +20,10 @@ LOGGING_CONFIG["handlers"]["logfmt"] = {
 LOGGING_CONFIG["loggers"]["uvicorn"]["handlers"] = []
 LOGGING_CONFIG["loggers"]["uvicorn.access"]["handlers"] = ["logfmt"]
 
+# websocket 프록시/JSON 처리가 event loop에 묶여 있으므로 uvloop(uvicorn[standard]에 포함)를
+# 명시적으로 사용하고, 설치되지 않은 환경에서는 기본 asyncio loop로 동작
+EVENT_LOOP = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
 
 def main():
     # we need to init logging before the app so we cannot import app at top level
@@ -30,6 +36,7 @@ def main():
         root_path=app_config.public_url.path,
         log_config=LOGGING_CONFIG,
         log_level=app_config.log_level.lower(),
+        loop=EVENT_LOOP,
     )
 
 
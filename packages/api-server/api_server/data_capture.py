@@ -17,6 +17,11 @@ RMF API Server 데이터 캡처 모듈
     RMF_CAPTURE_DATA=1          캡처 활성화
     RMF_CAPTURE_OUTPUT_DIR=...  출력 디렉토리 (기본: ./captured_data)
     RMF_CAPTURE_DURATION=300    캡처 시간(초) (기본: 300초 = 5분, 0=무제한)
+    RMF_CAPTURE_HISTORY=1       history(시간순 전체 이력) 기록 여부 (0=latest_states만 기록)
+    RMF_CAPTURE_HISTORY_LIMIT=0 유형별로 보관할 최근 history 개수 (기본: 0=무제한)
+    RMF_CAPTURE_MIN_INTERVAL_MS=0
+                                같은 엔티티의 history 기록 최소 간격(ms) (기본: 0=모두 기록)
+                                latest_states는 간격과 무관하게 항상 갱신
 
 캡처되는 데이터:
     - ROS 2 토픽 (gateway.py):
@@ -26,33 +31,182 @@ RMF API Server 데이터 캡처 모듈
         - task_state_update, task_log_update
         - fleet_state_update, fleet_log_update
 
+history 기록:
+    캡처 중에는 history를 메모리에 쌓지 않고 captured_data_{timestamp}.history.jsonl
+    파일에 한 줄씩 append 합니다. 저장 시 이 파일을 읽어 아래 JSON의 "history"
+    섹션으로 합친 뒤 삭제합니다. 캡처 시간이 길어도 메모리 사용량은
+    latest_states 크기로 제한됩니다.
+
 출력 형식:
     captured_data_{timestamp}.json:
     {
         "_metadata": {...},
-        "history": {...},      # 시간순 전체 이력
+        "history": {...},      # 시간순 전체 이력 (RMF_CAPTURE_HISTORY=0이면 생략)
         "latest_states": {...}, # 각 엔티티의 최종 상태
         "sample_format": {...}  # mock_rmf_server.py와 호환되는 형식
     }
 """
 
+import array
 import atexit
-import base64
+import functools
 import json
 import logging
+import operator
 import os
-import re
+import queue
 import shutil
+import sys
 import threading
 from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from time import time_ns
+from typing import Any, BinaryIO, Callable
 from urllib.parse import urlparse
 
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json 사용
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=512)
+def _parse_url(url: str):
+    """urlparse 결과 캐시 (같은 building_map이 반복 캡처되므로 URL이 반복됨)"""
+    return urlparse(url)
+
+
+@functools.lru_cache(maxsize=512)
+def _resolve_cache_path(rel_path: str) -> Path:
+    """캐시 상대 경로 → 실제 캐시 파일 경로 (run/cache/building/...)"""
+    return Path("run/cache") / rel_path
+
+
+# 존재가 확인된 캐시 파일. 캐시 파일은 서버 실행 중 삭제되지 않으므로
+# 존재하는 경우만 기억하고, 없는 파일은 나중에 생길 수 있어 매번 확인합니다.
+_existing_cache_files: set[Path] = set()
+
+
+def _cache_file_exists(path: Path) -> bool:
+    if path in _existing_cache_files:
+        return True
+    if path.exists():
+        _existing_cache_files.add(path)
+        return True
+    return False
+
+
+def _fast_copy(src: str | Path, dst: str | Path) -> None:
+    """파일 복사 (Linux에서는 copy_file_range로 커널 내부 복사)
+
+    user-space 버퍼를 거치지 않으며, btrfs/xfs에서는 reflink(CoW)로 처리됩니다.
+    지원되지 않는 플랫폼/파일시스템에서는 shutil.copyfile로 대체합니다.
+    mtime은 shutil.copy2와 동일하게 보존합니다.
+    """
+    src_stat = os.stat(src)
+    copied = False
+    if sys.platform == "linux" and hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+                remaining = src_stat.st_size
+                while remaining > 0:
+                    n = os.copy_file_range(in_fd, out_fd, remaining)
+                    if n == 0:
+                        break
+                    remaining -= n
+            copied = remaining == 0
+        except OSError:
+            copied = False
+    if not copied:
+        shutil.copyfile(src, dst)
+    os.utime(dst, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+
+
+def _identity(data: Any) -> Any:
+    return data
+
+
+_dump_pydantic = operator.methodcaller("model_dump", mode="json")
+
+
+def _pick_converter(data: Any) -> Callable[[Any], Any]:
+    """캡처 데이터를 dict로 변환하는 함수 선택 (pydantic v2/v1 모델 또는 dict)"""
+    if hasattr(data, "model_dump"):
+        return _dump_pydantic
+    if hasattr(data, "dict"):
+        return operator.methodcaller("dict")
+    return _identity
+
+
+# latest_states 유형 → sample_data.json 키 (값 목록을 그대로 사용하는 유형)
+_SAMPLE_LIST_KEYS = {
+    "fleet_state": "fleets",
+    "door_state": "doors",
+    "lift_state": "lifts",
+    "dispenser_state": "dispensers",
+    "ingestor_state": "ingestors",
+    "alert_request": "alerts",
+    "beacon_state": "beacons",
+}
+
+
+def _sample_from_unique(unique_data: dict[str, dict[str, Any]]) -> dict:
+    """sample_data.json 형식으로 변환 (mock_rmf_server.py와 호환)
+
+    unique_data를 한 번만 순회하며 유형별로 sample 키를 채웁니다.
+    """
+    sample: dict[str, Any] = {}
+    for data_type, entries in unique_data.items():
+        list_key = _SAMPLE_LIST_KEYS.get(data_type)
+        if list_key is not None:
+            sample[list_key] = list(entries.values())
+        elif data_type == "building_map":
+            if entries:
+                sample["building_map"] = next(iter(entries.values()))
+        elif data_type == "task_state":
+            # task_log가 있으면 추가
+            task_logs = unique_data.get("task_log", {})
+            tasks = []
+            for task_id, state in entries.items():
+                task_entry: dict[str, Any] = {"state": state}
+                if task_id in task_logs:
+                    task_entry["log"] = task_logs[task_id]
+                tasks.append(task_entry)
+            sample["tasks"] = tasks
+        elif data_type == "trajectory":
+            # Trajectories (로봇 경로)
+            sample["trajectories"] = dict(entries)
+    return sample
+
+
+def _dump_json(obj: Any) -> bytes:
+    """캡처 파일용 compact JSON 직렬화 (UTF-8 bytes, indent 없음)"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        obj, ensure_ascii=False, separators=(",", ":"), default=str
+    ).encode("utf-8")
+
+
+def _load_json(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _format_entry(entry: dict) -> dict:
+    """내부 캡처 엔트리를 저장 형식으로 변환 (ts_ns → ISO timestamp)"""
+    return {
+        "timestamp": datetime.fromtimestamp(entry["ts_ns"] / 1e9).isoformat(),
+        "source": entry["source"],
+        "data": entry["data"],
+    }
+
+
 class DataCaptureManager:
     """API 서버 데이터 캡처 관리자"""
 
@@ -79,11 +233,29 @@ class DataCaptureManager:
         )
         self._output_dir = os.environ.get("RMF_CAPTURE_OUTPUT_DIR", "./captured_data")
         self._duration = int(os.environ.get("RMF_CAPTURE_DURATION", "300"))  # 기본 5분
-
-        self._captured_data: dict[str, list[dict]] = defaultdict(list)
-        self._unique_data: dict[str, dict[str, Any]] = defaultdict(dict)
+        # 플레이백 샘플만 필요하면 history를 끄고 latest_states만 유지
+        self._keep_history = os.environ.get("RMF_CAPTURE_HISTORY", "1") != "0"
+        self._history_limit = int(os.environ.get("RMF_CAPTURE_HISTORY_LIMIT", "0")) or None
+        # 고빈도 스트림(fleet_state 등)은 엔티티별로 최소 간격마다 한 번만 history에 기록
+        self._min_interval_ns = (
+            int(os.environ.get("RMF_CAPTURE_MIN_INTERVAL_MS", "0")) * 1_000_000
+        )
+        self._last_append_ns: dict[tuple[str, str], int] = {}
+
+        # capture()는 lock을 잡지 않습니다. dict.setdefault, dict 항목 대입은 GIL
+        # 아래에서 원자적이고, history 로그는 O_APPEND로 열어 os.write 한 번이
+        # 한 줄을 파일 끝에 원자적으로 덧붙이므로 여러 producer가 동시에 기록할 수
+        # 있습니다. _data_lock은 save()/clear() 등 consumer 쪽 스냅샷에만 사용합니다.
+        # 메시지 수는 asyncio 이벤트 루프와 ROS spin 스레드가 함께 증가시키므로
+        # 정수 두 개만 갱신하는 짧은 _count_lock으로 보호합니다 (save()의 fsync 등
+        # _data_lock을 오래 잡는 작업과 경합하지 않도록 별도 lock 사용).
+        self._history_fd: int | None = None
+        self._history_log_path: Path | None = None
+        self._type_counts: dict[str, int] = {}
+        self._unique_data: dict[str, dict[str, Any]] = {}
         self._start_time = datetime.now()
         self._message_count = 0
+        self._count_lock = threading.Lock()
         self._data_lock = threading.Lock()
         self._stopped = False
         self._saved = False
@@ -92,11 +264,33 @@ class DataCaptureManager:
         # 캡처된 이미지 파일 목록 (building_map 이미지)
         self._captured_images: dict[str, str] = {}  # {filename: source_path}
 
+        # 입력 타입별 dict 변환 함수 캐시 (매 호출마다 hasattr 검사 생략)
+        self._converters: dict[type, Callable[[Any], Any]] = {}
+
+        # save()는 스냅샷만 만들고, JSON 인코딩/파일 쓰기/이미지 복사는
+        # writer 스레드에서 수행 (호출 스레드를 막지 않음)
+        self._write_queue: queue.Queue[Callable[[], None]] = queue.Queue()
+        self._writer: threading.Thread | None = None
+
         if self._enabled:
             Path(self._output_dir).mkdir(parents=True, exist_ok=True)
+            if self._keep_history:
+                timestamp = self._start_time.strftime("%Y%m%d_%H%M%S")
+                self._history_log_path = (
+                    Path(self._output_dir) / f"captured_data_{timestamp}.history.jsonl"
+                )
+                # 캡처 데이터는 DB가 아니므로 매 쓰기마다 fsync하지 않고
+                # 페이지 캐시에 맡긴 뒤 save() 시점에 한 번만 fsync
+                self._history_fd = os.open(
+                    self._history_log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644
+                )
             duration_str = f"{self._duration}초" if self._duration > 0 else "무제한"
             logger.info(f"데이터 캡처 활성화됨. 출력 디렉토리: {self._output_dir}")
             logger.info(f"캡처 시간: {duration_str}")
+            self._writer = threading.Thread(
+                target=self._writer_loop, name="capture-writer", daemon=True
+            )
+            self._writer.start()
             atexit.register(self._on_exit)
 
             # 시간 제한 타이머 설정
@@ -122,6 +316,23 @@ class DataCaptureManager:
         if self._timer:
             self._timer.cancel()
         self.save()
+        self.flush()
+
+    def _writer_loop(self) -> None:
+        """writer 스레드: 큐에 들어온 저장 작업을 순서대로 실행"""
+        while True:
+            job = self._write_queue.get()
+            try:
+                job()
+            except Exception as e:
+                logger.error(f"캡처 데이터 저장 실패: {e}")
+            finally:
+                self._write_queue.task_done()
+
+    def flush(self) -> None:
+        """대기 중인 저장 작업이 모두 끝날 때까지 대기"""
+        if self._writer is not None:
+            self._write_queue.join()
 
     def capture(
         self,
@@ -142,46 +353,80 @@ class DataCaptureManager:
             return
 
         # Pydantic 모델이면 dict로 변환
-        if hasattr(data, "model_dump"):
-            data = data.model_dump(mode="json")
-        elif hasattr(data, "dict"):
-            data = data.dict()
+        data_cls = type(data)
+        convert = self._converters.get(data_cls)
+        if convert is None:
+            convert = self._converters.setdefault(data_cls, _pick_converter(data))
+        data = convert(data)
 
         # building_map인 경우 이미지 파일도 캡처
         if data_type == "building_map":
             data = self._capture_building_map_images(data)
 
-        timestamp = datetime.now().isoformat()
-        entry = {"timestamp": timestamp, "source": source, "data": data}
-
-        with self._data_lock:
-            self._captured_data[data_type].append(entry)
-
-            if unique_key:
-                self._unique_data[data_type][unique_key] = data
-
+        # ISO 문자열 변환은 save() 시점으로 미룸 (hot path에서는 정수만 기록)
+        ts_ns = time_ns()
+
+        history_fd = self._history_fd
+        keep_entry = history_fd is not None
+        if keep_entry and self._min_interval_ns and unique_key:
+            throttle_key = (data_type, unique_key)
+            last_ns = self._last_append_ns.get(throttle_key, 0)
+            if ts_ns - last_ns < self._min_interval_ns:
+                keep_entry = False
+            else:
+                self._last_append_ns[throttle_key] = ts_ns
+
+        if keep_entry:
+            # "type"을 맨 앞에 두어 저장 시 파싱 없이 유형별로 분류할 수 있게 함
+            line = _dump_json(
+                {"type": data_type, "ts_ns": ts_ns, "source": source, "data": data}
+            )
+            try:
+                os.write(history_fd, line + b"\n")
+            except (ValueError, OSError):
+                # save() 이후 로그가 닫힌 경우
+                pass
+
+        with self._count_lock:
+            self._type_counts[data_type] = self._type_counts.get(data_type, 0) + 1
             self._message_count += 1
 
-        logger.debug(
-            f"[캡처 #{self._message_count}] {data_type} "
-            f"(key={unique_key}, source={source})"
-        )
+        if unique_key:
+            latest = self._unique_data.get(data_type)
+            if latest is None:
+                latest = self._unique_data.setdefault(data_type, {})
+            latest[unique_key] = data
+
+        logger.debug(f"[캡처] {data_type} (key={unique_key}, source={source})")
 
     def _capture_building_map_images(self, data: dict) -> dict:
-        """building_map 이미지 파일을 캡처하고 참조 경로를 기록"""
-        import copy
-        data = copy.deepcopy(data)
+        """building_map 이미지 파일을 캡처하고 참조 경로를 기록
 
-        levels = data.get("levels", [])
+        원본 dict는 수정하지 않습니다. 변경이 필요한 경로(data → levels →
+        level → images → img)의 dict/list만 얕은 복사하고, 나머지(이미지 데이터,
+        벽/문 geometry 등)는 원본과 참조를 공유합니다.
+        """
+        # HTTP 이미지 URL이 하나도 없으면 복사 없이 원본 반환
+        if not any(
+            str(img.get("data", "")).startswith("http")
+            for level in data.get("levels", [])
+            for img in level.get("images", [])
+        ):
+            return data
+
+        data = dict(data)
+        levels = [dict(level) for level in data.get("levels", [])]
+        data["levels"] = levels
         for level in levels:
-            images = level.get("images", [])
+            images = [dict(img) for img in level.get("images", [])]
+            level["images"] = images
             for img in images:
                 img_url = img.get("data", "")
                 if not img_url or not img_url.startswith("http"):
                     continue
 
                 # URL에서 파일명 추출
-                parsed = urlparse(img_url)
+                parsed = _parse_url(img_url)
                 path_parts = parsed.path.split("/")
 
                 # /cache/building/filename.png 형식에서 파일명 추출
@@ -192,8 +437,8 @@ class DataCaptureManager:
                     filename = path_parts[-1]
 
                     # 실제 캐시 파일 경로 (run/cache/building/...)
-                    cache_file = Path("run/cache") / rel_path
-                    if cache_file.exists():
+                    cache_file = _resolve_cache_path(rel_path)
+                    if _cache_file_exists(cache_file):
                         self._captured_images[filename] = str(cache_file)
                         # 이미지 URL을 상대 경로 참조로 변경
                         img["_captured_file"] = filename
@@ -206,11 +451,14 @@ class DataCaptureManager:
     def save(self, output_file: str | None = None) -> str | None:
         """캡처된 데이터를 JSON 파일로 저장
 
+        현재 상태의 스냅샷을 만들어 writer 스레드에 저장을 맡기고 바로 반환합니다.
+        파일 기록 완료를 기다리려면 flush()를 호출하세요.
+
         Args:
             output_file: 출력 파일 경로. None이면 자동 생성
 
         Returns:
-            저장된 파일 경로
+            저장될 파일 경로
         """
         if not self._enabled:
             return None
@@ -221,8 +469,11 @@ class DataCaptureManager:
 
         if self._message_count == 0:
             logger.info("캡처된 데이터가 없습니다.")
-            self._print_summary(None)
+            self._print_summary(None, {})
             self._saved = True
+            self._stopped = True
+            # 빈 history 로그가 출력 디렉토리에 남지 않도록 닫고 삭제
+            self._close_history_log()
             return None
 
         if output_file is None:
@@ -231,46 +482,139 @@ class DataCaptureManager:
                 self._output_dir, f"captured_data_{timestamp}.json"
             )
 
-        # 이미지 파일 복사
         images_dir = None
-        if self._captured_images:
+        captured_images = dict(self._captured_images)
+        if captured_images:
             base_name = Path(output_file).stem
             images_dir = Path(self._output_dir) / f"{base_name}_images"
-            images_dir.mkdir(parents=True, exist_ok=True)
-
-            for filename, source_path in self._captured_images.items():
-                dest_path = images_dir / filename
-                try:
-                    shutil.copy2(source_path, dest_path)
-                    logger.info(f"이미지 저장됨: {dest_path}")
-                except Exception as e:
-                    logger.error(f"이미지 복사 실패 {source_path}: {e}")
 
+        # lock 안에서는 얕은 스냅샷만 만들고, 직렬화/파일 쓰기는 writer 스레드에서 수행
         with self._data_lock:
-            output = {
-                "_metadata": {
-                    "description": "RMF API Server에서 캡처된 실시간 데이터",
-                    "capture_start": self._start_time.isoformat(),
-                    "capture_end": datetime.now().isoformat(),
-                    "total_messages": self._message_count,
-                    "data_types": list(self._captured_data.keys()),
-                    "images_dir": str(images_dir) if images_dir else None,
-                    "captured_images": list(self._captured_images.keys()),
-                },
-                "history": dict(self._captured_data),
-                "latest_states": {k: dict(v) for k, v in self._unique_data.items()},
-                "sample_format": self._convert_to_sample_format(),
+            metadata = {
+                "description": "RMF API Server에서 캡처된 실시간 데이터",
+                "capture_start": self._start_time.isoformat(),
+                "capture_end": datetime.now().isoformat(),
+                "total_messages": self._message_count,
+                "data_types": list(self._type_counts),
+                "history_enabled": self._keep_history,
+                "images_dir": str(images_dir) if images_dir else None,
+                "captured_images": list(captured_images),
             }
-
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(output, f, indent=2, ensure_ascii=False, default=str)
+            history_end = 0
+            if self._history_fd is not None:
+                os.fsync(self._history_fd)
+                history_end = os.fstat(self._history_fd).st_size
+            latest_states = self._snapshot_unique_data()
+            sample_format = _sample_from_unique(latest_states)
+
+        def write() -> None:
+            if images_dir is not None:
+                self._copy_images(captured_images, images_dir)
+            self._write_output(
+                output_file, metadata, history_end, latest_states, sample_format
+            )
+            self._close_history_log()
+            self._print_summary(output_file, latest_states)
 
         self._saved = True
-        self._print_summary(output_file)
+        self._stopped = True
+        if self._writer is not None:
+            self._write_queue.put(write)
+        else:
+            write()
 
         return output_file
 
-    def _print_summary(self, output_file: str | None) -> None:
+    def _copy_images(self, captured_images: dict[str, str], images_dir: Path) -> None:
+        """캡처된 building_map 이미지 파일 복사"""
+        images_dir.mkdir(parents=True, exist_ok=True)
+        for filename, source_path in captured_images.items():
+            dest_path = images_dir / filename
+            try:
+                _fast_copy(source_path, dest_path)
+                logger.info(f"이미지 저장됨: {dest_path}")
+            except Exception as e:
+                logger.error(f"이미지 복사 실패 {source_path}: {e}")
+
+    def _write_output(
+        self,
+        output_file: str,
+        metadata: dict,
+        history_end: int,
+        latest_states: dict[str, dict[str, Any]],
+        sample_format: dict,
+    ) -> None:
+        """캡처 파일 기록 (전체 출력을 하나의 dict로 합치지 않고 섹션/엔트리 단위로 스트리밍)"""
+        with open(output_file, "wb", buffering=1 << 20) as f:
+            f.write(b'{"_metadata":')
+            f.write(_dump_json(metadata))
+            if self._history_log_path is not None:
+                f.write(b',"history":{')
+                self._write_history(f, history_end)
+                f.write(b"}")
+            f.write(b',"latest_states":')
+            f.write(_dump_json(latest_states))
+            f.write(b',"sample_format":')
+            f.write(_dump_json(sample_format))
+            f.write(b"}\n")
+
+    def _write_history(self, f: BinaryIO, history_end: int) -> None:
+        """history 로그(JSONL)를 유형별로 묶어 "history" 섹션 내용으로 기록
+
+        로그를 한 번 훑어 유형별 줄 시작 offset만 색인한 뒤, 유형마다 해당 줄을
+        읽어 변환합니다. 메모리에는 offset 배열만 유지됩니다.
+        """
+        assert self._history_log_path is not None
+        offsets: dict[str, array.array] = {}
+        with open(self._history_log_path, "rb") as log:
+            pos = 0
+            for line in log:
+                if pos + len(line) > history_end:
+                    break
+                # 줄 형식: {"type":"<data_type>",...}
+                type_end = line.index(b'",', 9)
+                data_type = line[9:type_end].decode("utf-8")
+                type_offsets = offsets.get(data_type)
+                if type_offsets is None:
+                    type_offsets = offsets[data_type] = array.array("q")
+                type_offsets.append(pos)
+                pos += len(line)
+
+            for i, (data_type, type_offsets) in enumerate(offsets.items()):
+                if self._history_limit:
+                    type_offsets = type_offsets[-self._history_limit :]
+                if i:
+                    f.write(b",")
+                f.write(_dump_json(data_type))
+                f.write(b":[")
+                for j, offset in enumerate(type_offsets):
+                    log.seek(offset)
+                    if j:
+                        f.write(b",")
+                    f.write(_dump_json(_format_entry(_load_json(log.readline()))))
+                f.write(b"]")
+
+    def _close_history_log(self) -> None:
+        """저장이 끝난 history 로그를 닫고 삭제"""
+        if self._history_fd is None or self._history_log_path is None:
+            return
+        # save()에서 _stopped가 설정된 뒤이므로 새 쓰기는 없음. fd 번호 재사용으로
+        # 다른 파일에 쓰는 일이 없도록 속성을 먼저 비운 뒤 닫음
+        history_fd, self._history_fd = self._history_fd, None
+        os.close(history_fd)
+        self._history_log_path.unlink(missing_ok=True)
+
+    def _snapshot_unique_data(self) -> dict[str, dict[str, Any]]:
+        """latest_states의 얕은 스냅샷 (producer와 동시에 호출돼도 안전)
+
+        list()/dict() 복사는 C 수준에서 GIL을 놓지 않고 수행되므로
+        반복 중 크기 변경 오류가 발생하지 않습니다.
+        """
+        return {k: dict(v) for k, v in list(self._unique_data.items())}
+
+    def _print_summary(
+        self, output_file: str | None, unique_data: dict[str, dict[str, Any]]
+    ) -> None:
         """캡처 데이터 요약 출력 (서버 종료 시 콘솔에 표시)"""
         end_time = datetime.now()
         duration = (end_time - self._start_time).total_seconds()
@@ -283,170 +627,115 @@ class DataCaptureManager:
         print(f"  총 캡처 시간: {duration:.1f}초 ({duration/60:.1f}분)")
         print("-" * 60)
 
-        if self._message_count == 0:
+        message_count = self._message_count
+        if message_count == 0:
             print("  캡처된 데이터가 없습니다.")
             print("=" * 60 + "\n")
             return
 
-        print(f"  총 메시지 수: {self._message_count}")
+        print(f"  총 메시지 수: {message_count}")
         print("-" * 60)
 
         # 데이터 유형별 통계
         print("  [데이터 유형별 메시지 수]")
-        with self._data_lock:
-            for data_type, entries in sorted(self._captured_data.items()):
-                unique_count = len(self._unique_data.get(data_type, {}))
-                print(f"    {data_type}: {len(entries)}개 (고유: {unique_count}개)")
+        with self._count_lock:
+            type_counts = sorted(self._type_counts.items())
+        for data_type, count in type_counts:
+            unique_count = len(unique_data.get(data_type, {}))
+            print(f"    {data_type}: {count}개 (고유: {unique_count}개)")
 
         print("-" * 60)
 
         # 고유 엔티티 목록
         print("  [캡처된 엔티티 목록]")
-        with self._data_lock:
-            # Fleet & Robots
-            if "fleet_state" in self._unique_data:
-                fleets = self._unique_data["fleet_state"]
-                for fleet_name, fleet_data in fleets.items():
-                    robots = fleet_data.get("robots", {})
-                    robot_names = list(robots.keys())[:5]
-                    robot_str = ", ".join(robot_names)
-                    if len(robots) > 5:
-                        robot_str += f" 외 {len(robots)-5}개"
-                    print(f"    Fleet '{fleet_name}': 로봇 {len(robots)}대 ({robot_str})")
-
-            # Tasks
-            if "task_state" in self._unique_data:
-                tasks = self._unique_data["task_state"]
-                task_ids = list(tasks.keys())[:3]
-                print(f"    Task: {len(tasks)}개 ({', '.join(task_ids)}...)")
-
-            # Doors
-            if "door_state" in self._unique_data:
-                doors = list(self._unique_data["door_state"].keys())
-                print(f"    Door: {len(doors)}개 ({', '.join(doors[:5])})")
-
-            # Lifts
-            if "lift_state" in self._unique_data:
-                lifts = list(self._unique_data["lift_state"].keys())
-                print(f"    Lift: {len(lifts)}개 ({', '.join(lifts[:5])})")
-
-            # Building Map
-            if "building_map" in self._unique_data:
-                maps = list(self._unique_data["building_map"].keys())
-                print(f"    Building Map: {', '.join(maps)}")
-
-            # Dispensers
-            if "dispenser_state" in self._unique_data:
-                dispensers = list(self._unique_data["dispenser_state"].keys())
-                print(f"    Dispenser: {len(dispensers)}개 ({', '.join(dispensers[:5])})")
-
-            # Ingestors
-            if "ingestor_state" in self._unique_data:
-                ingestors = list(self._unique_data["ingestor_state"].keys())
-                print(f"    Ingestor: {len(ingestors)}개 ({', '.join(ingestors[:5])})")
-
-            # Beacons
-            if "beacon_state" in self._unique_data:
-                beacons = list(self._unique_data["beacon_state"].keys())
-                print(f"    Beacon: {len(beacons)}개 ({', '.join(beacons[:5])})")
-
-            # Alerts
-            if "alert_request" in self._unique_data:
-                alerts = list(self._unique_data["alert_request"].keys())
-                print(f"    Alert: {len(alerts)}개")
-
-            # Trajectory
-            if "trajectory" in self._unique_data:
-                trajectories = self._unique_data["trajectory"]
-                for map_name, traj_data in trajectories.items():
-                    if isinstance(traj_data, dict) and "values" in traj_data:
-                        count = len(traj_data.get("values", []))
-                        print(f"    Trajectory '{map_name}': {count}개 경로")
-
-        print("-" * 60)
-        if output_file:
-            print(f"  저장 파일: {output_file}")
-        print("=" * 60 + "\n")
-
-    def _convert_to_sample_format(self) -> dict:
-        """sample_data.json 형식으로 변환 (mock_rmf_server.py와 호환)"""
-        sample: dict[str, Any] = {}
-
-        # Building Map
-        if "building_map" in self._unique_data:
-            maps = list(self._unique_data["building_map"].values())
-            if maps:
-                sample["building_map"] = maps[0]
-
-        # Fleets
-        if "fleet_state" in self._unique_data:
-            sample["fleets"] = list(self._unique_data["fleet_state"].values())
+        # Fleet & Robots
+        if "fleet_state" in unique_data:
+            fleets = unique_data["fleet_state"]
+            for fleet_name, fleet_data in fleets.items():
+                robots = fleet_data.get("robots", {})
+                robot_names = list(robots.keys())[:5]
+                robot_str = ", ".join(robot_names)
+                if len(robots) > 5:
+                    robot_str += f" 외 {len(robots)-5}개"
+                print(f"    Fleet '{fleet_name}': 로봇 {len(robots)}대 ({robot_str})")
 
         # Tasks
-        if "task_state" in self._unique_data:
-            tasks = []
-            for task_id, state in self._unique_data["task_state"].items():
-                task_entry: dict[str, Any] = {"state": state}
-                # task_log가 있으면 추가
-                if (
-                    "task_log" in self._unique_data
-                    and task_id in self._unique_data["task_log"]
-                ):
-                    task_entry["log"] = self._unique_data["task_log"][task_id]
-                tasks.append(task_entry)
-            sample["tasks"] = tasks
+        if "task_state" in unique_data:
+            tasks = unique_data["task_state"]
+            task_ids = list(tasks.keys())[:3]
+            print(f"    Task: {len(tasks)}개 ({', '.join(task_ids)}...)")
 
         # Doors
-        if "door_state" in self._unique_data:
-            sample["doors"] = list(self._unique_data["door_state"].values())
+        if "door_state" in unique_data:
+            doors = list(unique_data["door_state"].keys())
+            print(f"    Door: {len(doors)}개 ({', '.join(doors[:5])})")
 
         # Lifts
-        if "lift_state" in self._unique_data:
-            sample["lifts"] = list(self._unique_data["lift_state"].values())
+        if "lift_state" in unique_data:
+            lifts = list(unique_data["lift_state"].keys())
+            print(f"    Lift: {len(lifts)}개 ({', '.join(lifts[:5])})")
+
+        # Building Map
+        if "building_map" in unique_data:
+            maps = list(unique_data["building_map"].keys())
+            print(f"    Building Map: {', '.join(maps)}")
 
         # Dispensers
-        if "dispenser_state" in self._unique_data:
-            sample["dispensers"] = list(self._unique_data["dispenser_state"].values())
+        if "dispenser_state" in unique_data:
+            dispensers = list(unique_data["dispenser_state"].keys())
+            print(f"    Dispenser: {len(dispensers)}개 ({', '.join(dispensers[:5])})")
 
         # Ingestors
-        if "ingestor_state" in self._unique_data:
-            sample["ingestors"] = list(self._unique_data["ingestor_state"].values())
-
-        # Alerts
-        if "alert_request" in self._unique_data:
-            sample["alerts"] = list(self._unique_data["alert_request"].values())
+        if "ingestor_state" in unique_data:
+            ingestors = list(unique_data["ingestor_state"].keys())
+            print(f"    Ingestor: {len(ingestors)}개 ({', '.join(ingestors[:5])})")
 
         # Beacons
-        if "beacon_state" in self._unique_data:
-            sample["beacons"] = list(self._unique_data["beacon_state"].values())
+        if "beacon_state" in unique_data:
+            beacons = list(unique_data["beacon_state"].keys())
+            print(f"    Beacon: {len(beacons)}개 ({', '.join(beacons[:5])})")
 
-        # Trajectories (로봇 경로)
-        if "trajectory" in self._unique_data:
-            sample["trajectories"] = dict(self._unique_data["trajectory"])
+        # Alerts
+        if "alert_request" in unique_data:
+            alerts = list(unique_data["alert_request"].keys())
+            print(f"    Alert: {len(alerts)}개")
+
+        # Trajectory
+        if "trajectory" in unique_data:
+            trajectories = unique_data["trajectory"]
+            for map_name, traj_data in trajectories.items():
+                if isinstance(traj_data, dict) and "values" in traj_data:
+                    count = len(traj_data.get("values", []))
+                    print(f"    Trajectory '{map_name}': {count}개 경로")
 
-        return sample
+        print("-" * 60)
+        if output_file:
+            print(f"  저장 파일: {output_file}")
+        print("=" * 60 + "\n")
 
     def get_stats(self) -> dict:
         """캡처 통계 반환"""
-        with self._data_lock:
+        with self._data_lock, self._count_lock:
             return {
                 "enabled": self._enabled,
                 "start_time": self._start_time.isoformat(),
                 "message_count": self._message_count,
-                "data_types": {
-                    k: len(v) for k, v in self._captured_data.items()
-                },
+                "data_types": dict(self._type_counts),
                 "unique_counts": {
-                    k: len(v) for k, v in self._unique_data.items()
+                    k: len(v) for k, v in list(self._unique_data.items())
                 },
             }
 
     def clear(self) -> None:
         """캡처 데이터 초기화"""
         with self._data_lock:
-            self._captured_data.clear()
+            if self._history_fd is not None:
+                os.ftruncate(self._history_fd, 0)
+            self._last_append_ns.clear()
+            with self._count_lock:
+                self._type_counts.clear()
+                self._message_count = 0
             self._unique_data.clear()
-            self._message_count = 0
             self._start_time = datetime.now()
         logger.info("캡처 데이터 초기화됨")
 
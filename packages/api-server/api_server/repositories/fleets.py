@@ -72,6 +72,10 @@ class FleetRepository:
             name=fleet_state.name,
         )
 
+    async def save_fleet_state_json(self, name: str | None, data: str) -> None:
+        """이미 직렬화된 FleetState JSON을 그대로 저장"""
+        await ttm.FleetState.update_or_create({"data": data}, name=name)
+
     async def save_fleet_log(self, fleet_log: FleetLog) -> None:
         async def _save_logs(db_fleet_log: ttm.FleetLog, logs: Sequence[LogEntry]):
             for log in logs:
@@ -1,13 +1,18 @@
 # NOTE: This will eventually replace `gateway.py``
-from datetime import datetime
-from typing import Annotated, Any
+import functools
+import json
+import logging
+import os
+from dataclasses import dataclass
+from time import time_ns
+from typing import Annotated, Any, Awaitable, Callable
 from uuid import uuid4
 
 from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
 from websockets.exceptions import ConnectionClosed
 
 from api_server import models as mdl
-from api_server.data_capture import capture_data
+from api_server.data_capture import get_capture_manager
 from api_server.exceptions import AlreadyExistsError
 from api_server.logging import LoggerAdapter, get_logger
 from api_server.models.user import User
@@ -15,9 +20,265 @@ from api_server.repositories import AlertRepository, FleetRepository, RmfReposit
 from api_server.rmf_io import AlertEvents, FleetEvents, TaskEvents
 from api_server.rmf_io.events import RmfEvents, get_alert_events, get_fleet_events, get_rmf_events, get_task_events
 
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+except ImportError:  # orjson이 없으면 표준 json 사용
+    _loads = json.loads
+    _dumps = json.dumps
+
 router = APIRouter(tags=["_internal"])
 
 
+def _capture_disabled(*args: Any, **kwargs: Any) -> None:
+    pass
+
+
+@functools.cache
+def _get_capture() -> Callable[..., None]:
+    """캡처 함수 (첫 메시지에서 한 번만 결정)
+
+    캡처 활성화 여부는 프로세스 시작 시 환경 변수로 결정되므로 한 번만 확인하고,
+    비활성화(운영 환경)면 메시지마다 캡처 관리자를 조회하지 않는 no-op을 사용.
+    모듈 import 시점이 아니라 처음 호출될 때 캡처 관리자를 만들므로, 캡처 파일과
+    캡처 시간은 첫 메시지부터 시작됨
+    """
+    capture_manager = get_capture_manager()
+    return capture_manager.capture if capture_manager.enabled else _capture_disabled
+
+# /_internal은 인증 없는 내부 트래픽이므로, 송신측을 신뢰할 수 있으면
+# 가장 빈번하고 큰 fleet_state_update를 저장할 때 검증된 모델을 다시 직렬화하지 않고
+# 받은 원본을 그대로 저장한다 (DB에서 읽을 때 FleetState로 검증되며 추가 필드는 무시됨).
+# 구독자에게 보내는 모델은 신뢰 여부와 관계없이 항상 검증해서 만든다.
+_TRUSTED_INTERNAL = os.environ.get("RMF_INTERNAL_TRUSTED", "").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+
+@dataclass
+class _MsgContext:
+    fleet_repo: FleetRepository
+    task_repo: TaskRepository
+    alert_repo: AlertRepository
+    rmf_repo: RmfRepository
+    task_events: TaskEvents
+    alert_events: AlertEvents
+    fleet_events: FleetEvents
+    rmf_events: RmfEvents
+    logger: LoggerAdapter
+
+
+# pydantic은 list 필드 검증 시 새 list를 만들므로 상수를 공유해도 안전하다
+_ACKNOWLEDGE_ONLY: list[str] = ["Acknowledge"]
+_NO_ALERT_PARAMETERS: list[mdl.AlertParameter] = []
+
+
+def _make_task_alert(
+    tier: mdl.AlertRequest.Tier, title: str, message: str, task_id: str
+) -> mdl.AlertRequest:
+    """Task 완료/실패 알림 생성. 호출마다 달라지는 필드만 인자로 받는다."""
+    return mdl.AlertRequest(
+        id=str(uuid4()),
+        unix_millis_alert_time=time_ns() // 1_000_000,
+        title=title,
+        subtitle=f"ID: {task_id}",
+        message=message,
+        display=True,
+        tier=tier,
+        responses_available=_ACKNOWLEDGE_ONLY,
+        alert_parameters=_NO_ALERT_PARAMETERS,
+        task_id=task_id,
+    )
+
+
+async def _handle_task_state_update(msg: dict[str, Any], ctx: _MsgContext) -> None:
+    task_state = mdl.TaskState(**msg["data"])
+    _get_capture()(
+        "task_state",
+        task_state,
+        task_state.booking.id,
+        source="internal",
+    )
+    await ctx.task_repo.save_task_state(task_state)
+    ctx.task_events.task_states.on_next(task_state)
+
+    if task_state.status == mdl.TaskStatus.completed:
+        alert_request = _make_task_alert(
+            mdl.AlertRequest.Tier.Info, "Task completed", "", task_state.booking.id
+        )
+    elif task_state.status == mdl.TaskStatus.failed:
+        errorMessage = ""
+        if (
+            task_state.dispatch is not None
+            and task_state.dispatch.status == mdl.DispatchStatus.failed_to_assign
+        ):
+            errorMessage += "Failed to assign\n"
+            if task_state.dispatch.errors is not None:
+                for error in task_state.dispatch.errors:
+                    errorMessage += error.json() + "\n"
+
+        alert_request = _make_task_alert(
+            mdl.AlertRequest.Tier.Error, "Task failed", errorMessage, task_state.booking.id
+        )
+    else:
+        return
+
+    try:
+        created_alert = await ctx.alert_repo.create_new_alert(alert_request)
+    except AlreadyExistsError as e:
+        ctx.logger.error(e)
+        return
+    ctx.alert_events.alert_requests.on_next(created_alert)
+
+
+async def _handle_task_log_update(msg: dict[str, Any], ctx: _MsgContext) -> None:
+    task_log = mdl.TaskEventLog(**msg["data"])
+    _get_capture()(
+        "task_log",
+        task_log,
+        task_log.task_id,
+        source="internal",
+    )
+    await ctx.task_repo.save_task_log(task_log)
+    ctx.task_events.task_event_logs.on_next(task_log)
+
+
+async def _handle_fleet_state_update(msg: dict[str, Any], ctx: _MsgContext) -> None:
+    # 원본 데이터를 먼저 캡처 (path 등 추가 필드 보존)
+    raw_data = msg["data"]
+    fleet_name = raw_data.get("name")
+
+    # 디버그: 로봇별 path waypoint 수 (DEBUG 레벨일 때만 robots 순회)
+    if ctx.logger.isEnabledFor(logging.DEBUG):
+        path_lengths = {
+            robot_name: len(robot_data.get("path") or ())
+            for robot_name, robot_data in (raw_data.get("robots") or {}).items()
+        }
+        ctx.logger.debug("[/_internal] %s path waypoints: %s", fleet_name, path_lengths)
+
+    _get_capture()(
+        "fleet_state",
+        raw_data,  # Pydantic 모델 대신 원본 데이터 캡처
+        fleet_name,
+        source="internal",
+    )
+    fleet_state = mdl.FleetState.model_validate(raw_data)
+    if _TRUSTED_INTERNAL:
+        await ctx.fleet_repo.save_fleet_state_json(fleet_state.name, _dumps(raw_data))
+    else:
+        await ctx.fleet_repo.save_fleet_state(fleet_state)
+    ctx.fleet_events.fleet_states.on_next(fleet_state)
+
+
+async def _handle_fleet_log_update(msg: dict[str, Any], ctx: _MsgContext) -> None:
+    fleet_log = mdl.FleetLog(**msg["data"])
+    _get_capture()(
+        "fleet_log",
+        fleet_log,
+        fleet_log.name,
+        source="internal",
+    )
+    await ctx.fleet_repo.save_fleet_log(fleet_log)
+    ctx.fleet_events.fleet_logs.on_next(fleet_log)
+
+
+# ROS 2 데이터 주입 지원 (캡처 데이터 플레이백용)
+async def _handle_door_state_update(msg: dict[str, Any], ctx: _MsgContext) -> None:
+    door_state = mdl.DoorState(**msg["data"])
+    _get_capture()(
+        "door_state",
+        door_state,
+        door_state.door_name,
+        source="internal",
+    )
+    await ctx.rmf_repo.save_door_state(door_state)
+    ctx.rmf_events.door_states.on_next(door_state)
+
+
+async def _handle_lift_state_update(msg: dict[str, Any], ctx: _MsgContext) -> None:
+    lift_state = mdl.LiftState(**msg["data"])
+    _get_capture()(
+        "lift_state",
+        lift_state,
+        lift_state.lift_name,
+        source="internal",
+    )
+    await ctx.rmf_repo.save_lift_state(lift_state)
+    ctx.rmf_events.lift_states.on_next(lift_state)
+
+
+async def _handle_dispenser_state_update(msg: dict[str, Any], ctx: _MsgContext) -> None:
+    dispenser_state = mdl.DispenserState(**msg["data"])
+    _get_capture()(
+        "dispenser_state",
+        dispenser_state,
+        dispenser_state.guid,
+        source="internal",
+    )
+    await ctx.rmf_repo.save_dispenser_state(dispenser_state)
+    ctx.rmf_events.dispenser_states.on_next(dispenser_state)
+
+
+async def _handle_ingestor_state_update(msg: dict[str, Any], ctx: _MsgContext) -> None:
+    ingestor_state = mdl.IngestorState(**msg["data"])
+    _get_capture()(
+        "ingestor_state",
+        ingestor_state,
+        ingestor_state.guid,
+        source="internal",
+    )
+    await ctx.rmf_repo.save_ingestor_state(ingestor_state)
+    ctx.rmf_events.ingestor_states.on_next(ingestor_state)
+
+
+async def _handle_beacon_state_update(msg: dict[str, Any], ctx: _MsgContext) -> None:
+    beacon_state = mdl.BeaconState(**msg["data"])
+    _get_capture()(
+        "beacon_state",
+        beacon_state,
+        beacon_state.id,
+        source="internal",
+    )
+    await ctx.rmf_repo.save_beacon_state(beacon_state)
+    ctx.rmf_events.beacons.on_next(beacon_state)
+
+
+async def _handle_building_map_update(msg: dict[str, Any], ctx: _MsgContext) -> None:
+    building_map = mdl.BuildingMap(**msg["data"])
+    _get_capture()(
+        "building_map",
+        building_map,
+        building_map.name,
+        source="internal",
+    )
+    await ctx.rmf_repo.save_building_map(building_map)
+    ctx.rmf_events.building_map.on_next(building_map)
+    ctx.logger.info("[/_internal] BuildingMap 저장됨: %s", building_map.name)
+
+
+_MsgHandler = Callable[[dict[str, Any], _MsgContext], Awaitable[None]]
+
+_HANDLERS: dict[str, _MsgHandler] = {
+    "task_state_update": _handle_task_state_update,
+    "task_log_update": _handle_task_log_update,
+    "fleet_state_update": _handle_fleet_state_update,
+    "fleet_log_update": _handle_fleet_log_update,
+    "door_state_update": _handle_door_state_update,
+    "lift_state_update": _handle_lift_state_update,
+    "dispenser_state_update": _handle_dispenser_state_update,
+    "ingestor_state_update": _handle_ingestor_state_update,
+    "beacon_state_update": _handle_beacon_state_update,
+    "building_map_update": _handle_building_map_update,
+}
+
+
 async def process_msg(
     msg: dict[str, Any],
     fleet_repo: FleetRepository,
@@ -40,194 +301,37 @@ async def process_msg(
         return
 
     # 디버그: 수신된 메시지 로깅
-    logger.info(f"[/_internal] 수신: {payload_type}")
-    logger.debug(msg)
-
-    if payload_type == "task_state_update":
-        task_state = mdl.TaskState(**msg["data"])
-        capture_data(
-            "task_state",
-            task_state,
-            task_state.booking.id,
-            source="internal",
-        )
-        await task_repo.save_task_state(task_state)
-        task_events.task_states.on_next(task_state)
-
-        if task_state.status == mdl.TaskStatus.completed:
-            alert_request = mdl.AlertRequest(
-                id=str(uuid4()),
-                unix_millis_alert_time=round(datetime.now().timestamp() * 1000),
-                title="Task completed",
-                subtitle=f"ID: {task_state.booking.id}",
-                message="",
-                display=True,
-                tier=mdl.AlertRequest.Tier.Info,
-                responses_available=["Acknowledge"],
-                alert_parameters=[],
-                task_id=task_state.booking.id,
-            )
-            try:
-                created_alert = await alert_repo.create_new_alert(alert_request)
-            except AlreadyExistsError as e:
-                logger.error(e)
-                return
-            alert_events.alert_requests.on_next(created_alert)
-        elif task_state.status == mdl.TaskStatus.failed:
-            errorMessage = ""
-            if (
-                task_state.dispatch is not None
-                and task_state.dispatch.status == mdl.DispatchStatus.failed_to_assign
-            ):
-                errorMessage += "Failed to assign\n"
-                if task_state.dispatch.errors is not None:
-                    for error in task_state.dispatch.errors:
-                        errorMessage += error.json() + "\n"
-
-            alert_request = mdl.AlertRequest(
-                id=str(uuid4()),
-                unix_millis_alert_time=round(datetime.now().timestamp() * 1000),
-                title="Task failed",
-                subtitle=f"ID: {task_state.booking.id}",
-                message=errorMessage,
-                display=True,
-                tier=mdl.AlertRequest.Tier.Error,
-                responses_available=["Acknowledge"],
-                alert_parameters=[],
-                task_id=task_state.booking.id,
-            )
-            try:
-                created_alert = await alert_repo.create_new_alert(alert_request)
-            except AlreadyExistsError as e:
-                logger.error(e)
-                return
-            alert_events.alert_requests.on_next(created_alert)
-
-    elif payload_type == "task_log_update":
-        task_log = mdl.TaskEventLog(**msg["data"])
-        capture_data(
-            "task_log",
-            task_log,
-            task_log.task_id,
-            source="internal",
-        )
-        await task_repo.save_task_log(task_log)
-        task_events.task_event_logs.on_next(task_log)
-
-    elif payload_type == "fleet_state_update":
-        # 원본 데이터를 먼저 캡처 (path 등 추가 필드 보존)
-        raw_data = msg["data"]
-        fleet_name = raw_data.get("name")
-
-        # 디버그: path 필드 존재 여부 확인
-        robots = raw_data.get("robots", {})
-        for robot_name, robot_data in robots.items():
-            if "path" in robot_data and robot_data["path"]:
-                logger.info(f"[/_internal] {robot_name}: path={len(robot_data['path'])} waypoints")
-            else:
-                logger.debug(f"[/_internal] {robot_name}: path 없음 또는 비어있음")
-
-        capture_data(
-            "fleet_state",
-            raw_data,  # Pydantic 모델 대신 원본 데이터 캡처
-            fleet_name,
-            source="internal",
-        )
-        fleet_state = mdl.FleetState(**raw_data)
-        await fleet_repo.save_fleet_state(fleet_state)
-        fleet_events.fleet_states.on_next(fleet_state)
-
-    elif payload_type == "fleet_log_update":
-        fleet_log = mdl.FleetLog(**msg["data"])
-        capture_data(
-            "fleet_log",
-            fleet_log,
-            fleet_log.name,
-            source="internal",
-        )
-        await fleet_repo.save_fleet_log(fleet_log)
-        fleet_events.fleet_logs.on_next(fleet_log)
-
-    # ROS 2 데이터 주입 지원 (캡처 데이터 플레이백용)
-    elif payload_type == "door_state_update":
-        door_state = mdl.DoorState(**msg["data"])
-        capture_data(
-            "door_state",
-            door_state,
-            door_state.door_name,
-            source="internal",
-        )
-        await rmf_repo.save_door_state(door_state)
-        rmf_events.door_states.on_next(door_state)
-
-    elif payload_type == "lift_state_update":
-        lift_state = mdl.LiftState(**msg["data"])
-        capture_data(
-            "lift_state",
-            lift_state,
-            lift_state.lift_name,
-            source="internal",
-        )
-        await rmf_repo.save_lift_state(lift_state)
-        rmf_events.lift_states.on_next(lift_state)
-
-    elif payload_type == "dispenser_state_update":
-        dispenser_state = mdl.DispenserState(**msg["data"])
-        capture_data(
-            "dispenser_state",
-            dispenser_state,
-            dispenser_state.guid,
-            source="internal",
-        )
-        await rmf_repo.save_dispenser_state(dispenser_state)
-        rmf_events.dispenser_states.on_next(dispenser_state)
-
-    elif payload_type == "ingestor_state_update":
-        ingestor_state = mdl.IngestorState(**msg["data"])
-        capture_data(
-            "ingestor_state",
-            ingestor_state,
-            ingestor_state.guid,
-            source="internal",
-        )
-        await rmf_repo.save_ingestor_state(ingestor_state)
-        rmf_events.ingestor_states.on_next(ingestor_state)
-
-    elif payload_type == "beacon_state_update":
-        beacon_state = mdl.BeaconState(**msg["data"])
-        capture_data(
-            "beacon_state",
-            beacon_state,
-            beacon_state.id,
-            source="internal",
-        )
-        await rmf_repo.save_beacon_state(beacon_state)
-        rmf_events.beacons.on_next(beacon_state)
-
-    elif payload_type == "building_map_update":
-        building_map = mdl.BuildingMap(**msg["data"])
-        capture_data(
-            "building_map",
-            building_map,
-            building_map.name,
-            source="internal",
-        )
-        await rmf_repo.save_building_map(building_map)
-        rmf_events.building_map.on_next(building_map)
-        logger.info(f"[/_internal] BuildingMap 저장됨: {building_map.name}")
+    logger.info("[/_internal] 수신: %s", payload_type)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(msg)
 
-    else:
+    handler = _HANDLERS.get(payload_type)
+    if handler is None:
         # 처리되지 않은 메시지 타입 로깅 및 캡처 (디버깅용)
-        logger.warning(f"[/_internal] 처리되지 않은 메시지 타입: {payload_type}")
-        logger.warning(f"[/_internal] 메시지 데이터: {msg}")
+        logger.warning("[/_internal] 처리되지 않은 메시지 타입: %s", payload_type)
+        logger.warning("[/_internal] 메시지 데이터: %s", msg)
         # 알려지지 않은 타입도 캡처하여 분석 가능하게 함
         if "data" in msg:
-            capture_data(
+            _get_capture()(
                 payload_type,
                 msg["data"],
                 None,
                 source="internal",
             )
+        return
+
+    ctx = _MsgContext(
+        fleet_repo,
+        task_repo,
+        alert_repo,
+        rmf_repo,
+        task_events,
+        alert_events,
+        fleet_events,
+        rmf_events,
+        logger,
+    )
+    await handler(msg, ctx)
 
 
 @router.websocket("")
@@ -252,7 +356,8 @@ async def rmf_gateway(
     logger.info("[/_internal] WebSocket 클라이언트 연결됨")
     try:
         while True:
-            msg: dict[str, Any] = await websocket.receive_json()
+            # receive_json()은 표준 json.loads를 사용하므로 원문을 받아 직접 디코딩
+            msg: dict[str, Any] = _loads(await websocket.receive_text())
             await process_msg(
                 msg,
                 fleet_repo,
@@ -13,17 +13,28 @@ Trajectory Server WebSocket 프록시 및 캡처/재생 라우트
 """
 
 import asyncio
+import functools
 import json
 import logging
 import os
 import time
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, Optional
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 import websockets
 from websockets.exceptions import ConnectionClosed
 
-from api_server.data_capture import capture_data
+from api_server.data_capture import capture_data, get_capture_manager
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json 사용
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # ijson이 없으면 큰 파일도 전체 파싱
+    ijson = None
 
 router = APIRouter(tags=["trajectory"])
 logger = logging.getLogger(__name__)
@@ -33,8 +44,54 @@ TRAJECTORY_SERVER_URL = os.environ.get("TRAJECTORY_SERVER_URL", "ws://localhost:
 REPLAY_MODE = os.environ.get("RMF_TRAJECTORY_REPLAY", "").lower() in ("1", "true", "yes")
 TRAJECTORY_DATA_FILE = os.environ.get("RMF_TRAJECTORY_DATA", "")
 
-# 캡처된 trajectory 데이터 저장소 (재생용)
-_trajectory_store: dict[str, Any] = {}
+# 이 크기 이상의 캡처 파일은 trajectory 부분만 스트리밍 파싱 (ijson 필요)
+_STREAM_PARSE_THRESHOLD = 50 * 1024 * 1024
+
+@functools.cache
+def _capture_enabled() -> bool:
+    """캡처가 꺼져 있으면 upstream 응답을 파싱하지 않고 그대로 전달
+    (캡처 관리자는 import 시점이 아니라 처음 필요할 때 생성)"""
+    return get_capture_manager().enabled
+
+
+class _Store:
+    """캡처된 trajectory 데이터 저장소 (재생용)
+
+    요청마다 읽히는 상태를 모듈 전역 대신 단일 인스턴스의 slot 속성으로 둡니다.
+    """
+
+    __slots__ = ("data", "default_key", "serialized_cache")
+
+    def __init__(self) -> None:
+        # {map_name: {"timestamp": ..., "response": ...}}
+        # upstream 원문으로 저장된 항목은 "response"가 None이고, 원문은 serialized_cache에 있음
+        self.data: dict[str, Any] = {}
+        # map_name이 없거나 모르는 맵 요청 시 응답할 키 (가장 최근에 저장된 맵)
+        self.default_key: Optional[str] = None
+        # 저장된 응답의 직렬화 결과 캐시 {map_name: json text}. 저장소가 바뀌면 무효화
+        self.serialized_cache: dict[str, str] = {}
+
+    def replace(self, data: dict) -> None:
+        """저장소 전체 교체 (캐시 무효화, 기본 맵은 첫 번째 항목)"""
+        self.serialized_cache.clear()
+        self.data = data
+        self.default_key = next(iter(data), None)
+
+
+_STORE = _Store()
+
+
+def _loads(data: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(obj: Any) -> str:
+    """응답 직렬화. Dashboard는 text frame의 JSON을 파싱하므로 str로 반환"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj)
 
 
 def load_trajectory_data(file_path: str) -> bool:
@@ -44,37 +101,53 @@ def load_trajectory_data(file_path: str) -> bool:
     1. 캡처 파일 (captured_data_*.json): sample_format.trajectories 또는 latest_states.trajectory
     2. trajectory 전용 파일: {"map_name": {"response": ..., "values": [...]}}
     """
-    global _trajectory_store
     try:
-        with open(file_path, "r") as f:
-            data = json.load(f)
+        with open(file_path, "rb") as f:
+            # 큰 캡처 파일은 history 등 사용하지 않는 섹션을 객체로 만들지 않도록
+            # trajectory 항목만 스트리밍으로 추출
+            if ijson is not None and os.fstat(f.fileno()).st_size > _STREAM_PARSE_THRESHOLD:
+                for prefix, label in (
+                    ("sample_format.trajectories", "sample_format"),
+                    ("latest_states.trajectory", "latest_states"),
+                ):
+                    f.seek(0)
+                    trajectories = dict(ijson.kvitems(f, prefix, use_float=True))
+                    if trajectories:
+                        _STORE.replace(trajectories)
+                        logger.info(
+                            f"Trajectory 데이터 로드됨 ({label}, 스트리밍): {len(_STORE.data)} 맵"
+                        )
+                        return True
+                f.seek(0)
+
+            data = _loads(f.read())
 
             # 1. 캡처 파일 형식 (sample_format.trajectories)
             if "sample_format" in data:
                 trajectories = data["sample_format"].get("trajectories", {})
                 if trajectories:
-                    _trajectory_store = trajectories
-                    logger.info(f"Trajectory 데이터 로드됨 (sample_format): {len(_trajectory_store)} 맵")
+                    _STORE.replace(trajectories)
+                    logger.info(f"Trajectory 데이터 로드됨 (sample_format): {len(_STORE.data)} 맵")
                     return True
 
             # 2. 캡처 파일 형식 (latest_states.trajectory)
             if "latest_states" in data:
                 trajectories = data["latest_states"].get("trajectory", {})
                 if trajectories:
-                    _trajectory_store = trajectories
-                    logger.info(f"Trajectory 데이터 로드됨 (latest_states): {len(_trajectory_store)} 맵")
+                    _STORE.replace(trajectories)
+                    logger.info(f"Trajectory 데이터 로드됨 (latest_states): {len(_STORE.data)} 맵")
                     return True
 
             # 3. trajectory 전용 형식
             if "trajectories" in data:
-                _trajectory_store = data["trajectories"]
-                logger.info(f"Trajectory 데이터 로드됨: {len(_trajectory_store)} 맵")
+                _STORE.replace(data["trajectories"])
+                logger.info(f"Trajectory 데이터 로드됨: {len(_STORE.data)} 맵")
                 return True
 
             # 4. 직접 trajectory 데이터
             if any(isinstance(v, dict) and "values" in v for v in data.values()):
-                _trajectory_store = data
-                logger.info(f"Trajectory 데이터 로드됨 (직접): {len(_trajectory_store)} 맵")
+                _STORE.replace(data)
+                logger.info(f"Trajectory 데이터 로드됨 (직접): {len(_STORE.data)} 맵")
                 return True
 
             logger.warning(f"Trajectory 데이터 없음: {file_path}")
@@ -92,23 +165,21 @@ def store_trajectory_response(map_name: str, response: dict) -> None:
     2. 캡처 형식: {"timestamp": ..., "response": {...}}
     3. values만 있는 형식: {"values": [...]}
     """
-    global _trajectory_store
-
     # 이미 response 형식이면 그대로 저장
     if "response" in response and response.get("response") == "trajectory":
-        _trajectory_store[map_name] = {
+        entry = {
             "timestamp": time.time(),
             "response": response,
         }
     # 캡처 형식 (timestamp + response)
     elif "response" in response and isinstance(response.get("response"), dict):
-        _trajectory_store[map_name] = {
+        entry = {
             "timestamp": response.get("timestamp", time.time()),
             "response": response["response"],
         }
     # values만 있는 형식
     elif "values" in response:
-        _trajectory_store[map_name] = {
+        entry = {
             "timestamp": time.time(),
             "response": {
                 "response": "trajectory",
@@ -118,21 +189,220 @@ def store_trajectory_response(map_name: str, response: dict) -> None:
         }
     # 기타 형식
     else:
-        _trajectory_store[map_name] = {
+        entry = {
             "timestamp": time.time(),
             "response": response,
         }
 
+    store = _STORE
+    store.serialized_cache.pop(map_name, None)
+    store.data[map_name] = entry
+    store.default_key = map_name
+
+
+def _store_raw_trajectory_response(map_name: str, text: str) -> None:
+    """upstream trajectory 응답 원문을 파싱하지 않고 저장 (처음 읽을 때 파싱)"""
+    store = _STORE
+    store.data[map_name] = {"timestamp": time.time(), "response": None}
+    store.serialized_cache[map_name] = text
+    store.default_key = map_name
+
+
+def _stored_response(key: str) -> Optional[dict]:
+    """저장소 항목의 응답 dict (원문으로 저장된 항목은 여기서 파싱)"""
+    store = _STORE
+    entry = store.data[key]
+    response = entry.get("response")
+    if response is None and key in store.serialized_cache:
+        response = entry["response"] = _loads(store.serialized_cache[key])
+    return response
+
+
+def _resolve_stored_key(map_name: str) -> Optional[str]:
+    """응답에 사용할 저장소 키 (map_name이 없으면 기본 맵)"""
+    store = _STORE
+    if map_name in store.data:
+        return map_name
+    return store.default_key
+
 
 def get_stored_trajectory(map_name: str) -> Optional[dict]:
     """저장된 trajectory 응답 반환"""
-    if map_name in _trajectory_store:
-        return _trajectory_store[map_name].get("response")
-    # map_name이 없으면 첫 번째 항목 반환
-    if _trajectory_store:
-        first_key = next(iter(_trajectory_store))
-        return _trajectory_store[first_key].get("response")
-    return None
+    key = _resolve_stored_key(map_name)
+    if key is None:
+        return None
+    return _stored_response(key)
+
+
+def get_stored_trajectory_text(map_name: str) -> Optional[str]:
+    """저장된 trajectory 응답을 직렬화된 JSON 문자열로 반환
+
+    같은 맵을 여러 클라이언트가 반복 요청해도 직렬화는 저장 시점당 한 번만 수행합니다.
+    """
+    key = _resolve_stored_key(map_name)
+    if key is None:
+        return None
+    cache = _STORE.serialized_cache
+    text = cache.get(key)
+    if text is None:
+        response = _STORE.data[key].get("response")
+        if not response:
+            return None
+        text = cache[key] = _dumps(response)
+    return text
+
+
+# param이 없는 요청에 사용 (요청마다 빈 dict를 만들지 않음, 읽기 전용)
+_EMPTY_PARAM: dict[str, Any] = {}
+
+# 진행 중인 upstream trajectory 요청 {요청 원문: 응답 태스크}
+# 여러 클라이언트가 같은 요청을 동시에 보내면 upstream 왕복은 한 번만 수행
+_inflight: dict[str | bytes, "asyncio.Task[str]"] = {}
+
+
+async def _upstream_round_trip(upstream_ws: Any, data: str | bytes, map_name: str) -> str:
+    """upstream에 trajectory 요청을 보내고 응답을 받아 캡처/저장
+
+    응답은 upstream 원문 그대로 반환합니다. 파싱은 캡처가 켜져 있을 때만 수행합니다.
+    """
+    await upstream_ws.send(data)
+    async with asyncio.timeout(5.0):
+        response_data = await upstream_ws.recv()
+    if isinstance(response_data, bytes):
+        response_data = response_data.decode("utf-8")
+
+    if _capture_enabled():
+        response = _loads(response_data)
+        capture_data(
+            "trajectory",
+            response,
+            map_name,
+            source="trajectory_proxy",
+        )
+        store_trajectory_response(map_name, response)
+        # 원문을 직렬화 캐시로 사용해 재생 응답 시 다시 직렬화하지 않음
+        _STORE.serialized_cache[map_name] = response_data
+    else:
+        _store_raw_trajectory_response(map_name, response_data)
+    return response_data
+
+
+def _finish_inflight(data: str | bytes, task: "asyncio.Task[str]") -> None:
+    """완료된 upstream 요청을 진행 목록에서 제거"""
+    if _inflight.get(data) is task:
+        del _inflight[data]
+    # 기다리는 클라이언트가 없어도 "exception was never retrieved" 경고가 없도록 조회
+    if not task.cancelled():
+        task.exception()
+
+
+async def _fetch_upstream_trajectory(
+    upstream_ws: Any, data: str | bytes, map_name: str
+) -> str:
+    """upstream trajectory 응답 조회 (동일 요청은 합쳐서 처리)
+
+    upstream 왕복은 특정 클라이언트에 속하지 않는 별도 태스크에서 수행합니다.
+    요청을 먼저 보낸 클라이언트의 연결이 끊겨 취소되더라도 같은 요청을 기다리는
+    다른 클라이언트는 영향을 받지 않습니다. (그 클라이언트의 upstream 연결이 닫히면
+    태스크는 ConnectionClosed로 끝나고, 기다리던 클라이언트는 저장된 데이터로 응답)
+    """
+    pending = _inflight.get(data)
+    if pending is None:
+        pending = asyncio.ensure_future(_upstream_round_trip(upstream_ws, data, map_name))
+        _inflight[data] = pending
+        pending.add_done_callback(functools.partial(_finish_inflight, data))
+    return await asyncio.shield(pending)
+
+
+# 핸들러는 (원본 요청 frame, param, upstream 연결)을 받아 응답 dict를 반환.
+# 이미 직렬화된 응답이 있으면 str을 그대로 반환해 재직렬화를 건너뜀
+_Response = dict | str
+_Handler = Callable[[str | bytes, dict, Any], Awaitable[_Response]]
+
+
+async def _handle_trajectory(data: str | bytes, param: dict, upstream_ws) -> _Response:
+    map_name = param.get("map_name", "")
+
+    # 1. upstream 연결이 있으면 프록시
+    if upstream_ws:
+        try:
+            response_text = await _fetch_upstream_trajectory(upstream_ws, data, map_name)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "[/trajectory] trajectory 응답: %d trajectories",
+                    len(_loads(response_text).get("values", [])),
+                )
+            return response_text
+        except asyncio.TimeoutError:
+            logger.warning("[/trajectory] upstream 응답 타임아웃")
+        except Exception as e:
+            logger.warning(f"[/trajectory] upstream 오류: {e}")
+
+    # 2. upstream 실패 또는 재생 모드면 저장된 데이터 사용
+    stored_text = get_stored_trajectory_text(map_name)
+    if stored_text:
+        if logger.isEnabledFor(logging.DEBUG):
+            stored = get_stored_trajectory(map_name) or {}
+            logger.debug(
+                "[/trajectory] 저장된 데이터 사용: %d trajectories",
+                len(stored.get("values", [])),
+            )
+        return stored_text
+
+    # 빈 응답
+    logger.info("[/trajectory] 데이터 없음, 빈 응답")
+    return {
+        "response": "trajectory",
+        "values": [],
+        "conflicts": [],
+    }
+
+
+async def _handle_time(data: str | bytes, param: dict, upstream_ws) -> _Response:
+    # 시간 요청은 현재 시간 반환
+    if upstream_ws:
+        try:
+            await upstream_ws.send(data)
+            async with asyncio.timeout(2.0):
+                response_data = await upstream_ws.recv()
+            return _loads(response_data)
+        except Exception:
+            pass
+
+    # 현재 시간 (나노초)
+    return {
+        "response": "time",
+        "values": [int(time.time() * 1e9)],
+    }
+
+
+async def _handle_trajectory_load(
+    data: str | bytes, param: dict, upstream_ws
+) -> _Response:
+    # 외부에서 trajectory 데이터 로드 (inject_captured_data.py에서 사용)
+    map_name = param.get("map_name", "")
+    traj_data = param.get("data", {})
+
+    if map_name and traj_data:
+        store_trajectory_response(map_name, traj_data)
+        logger.info(f"[/trajectory] trajectory 데이터 로드됨: {map_name}")
+        return {
+            "response": "trajectory_load",
+            "status": "ok",
+            "map_name": map_name,
+        }
+    return {
+        "response": "trajectory_load",
+        "status": "error",
+        "message": "map_name 또는 data가 없습니다",
+    }
+
+
+_HANDLERS: dict[str, _Handler] = {
+    "trajectory": _handle_trajectory,
+    "time": _handle_time,
+    "trajectory_load": _handle_trajectory_load,
+}
 
 
 @router.websocket("")
@@ -160,106 +430,35 @@ async def trajectory_proxy(websocket: WebSocket):
                 # upstream 연결 실패해도 캡처된 데이터로 응답 시도
 
         while True:
-            # 클라이언트 요청 수신
-            data = await websocket.receive_text()
-            request = json.loads(data)
-            logger.debug(f"[/trajectory] 요청 수신: {request.get('request')}")
-
-            response = None
-
-            if request.get("request") == "trajectory":
-                map_name = request.get("param", {}).get("map_name", "")
-
-                # 1. upstream 연결이 있으면 프록시
-                if upstream_ws:
-                    try:
-                        await upstream_ws.send(data)
-                        response_data = await asyncio.wait_for(
-                            upstream_ws.recv(), timeout=5.0
-                        )
-                        response = json.loads(response_data)
-
-                        # 캡처
-                        capture_data(
-                            "trajectory",
-                            response,
-                            map_name,
-                            source="trajectory_proxy",
-                        )
-                        store_trajectory_response(map_name, response)
-                        logger.info(
-                            f"[/trajectory] trajectory 응답: {len(response.get('values', []))} trajectories"
-                        )
-                    except asyncio.TimeoutError:
-                        logger.warning("[/trajectory] upstream 응답 타임아웃")
-                    except Exception as e:
-                        logger.warning(f"[/trajectory] upstream 오류: {e}")
-
-                # 2. upstream 실패 또는 재생 모드면 저장된 데이터 사용
-                if response is None:
-                    stored = get_stored_trajectory(map_name)
-                    if stored:
-                        response = stored
-                        logger.info(
-                            f"[/trajectory] 저장된 데이터 사용: {len(response.get('values', []))} trajectories"
-                        )
-                    else:
-                        # 빈 응답
-                        response = {
-                            "response": "trajectory",
-                            "values": [],
-                            "conflicts": [],
-                        }
-                        logger.info("[/trajectory] 데이터 없음, 빈 응답")
-
-            elif request.get("request") == "time":
-                # 시간 요청은 현재 시간 반환
-                if upstream_ws:
-                    try:
-                        await upstream_ws.send(data)
-                        response_data = await asyncio.wait_for(
-                            upstream_ws.recv(), timeout=2.0
-                        )
-                        response = json.loads(response_data)
-                    except Exception:
-                        pass
-
-                if response is None:
-                    # 현재 시간 (나노초)
-                    response = {
-                        "response": "time",
-                        "values": [int(time.time() * 1e9)],
-                    }
-
-            elif request.get("request") == "trajectory_load":
-                # 외부에서 trajectory 데이터 로드 (inject_captured_data.py에서 사용)
-                param = request.get("param", {})
-                map_name = param.get("map_name", "")
-                traj_data = param.get("data", {})
-
-                if map_name and traj_data:
-                    store_trajectory_response(map_name, traj_data)
-                    logger.info(
-                        f"[/trajectory] trajectory 데이터 로드됨: {map_name}"
-                    )
-                    response = {
-                        "response": "trajectory_load",
-                        "status": "ok",
-                        "map_name": map_name,
-                    }
+            # 클라이언트 요청 수신. binary frame으로 보내는 클라이언트는 UTF-8 검증 없이
+            # bytes 그대로 파싱하고, 응답도 binary frame으로 보냄 (Dashboard는 text frame)
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            binary = message.get("bytes") is not None
+            data: str | bytes = message["bytes"] if binary else message["text"]
+            request = _loads(data)
+            request_type = request.get("request")
+            param = request.get("param") or _EMPTY_PARAM
+            logger.debug("[/trajectory] 요청 수신: %s", request_type)
+
+            # 대부분의 frame은 trajectory 요청이므로 handler 조회 없이 바로 처리
+            if request_type == "trajectory":
+                response = await _handle_trajectory(data, param, upstream_ws)
+            else:
+                handler = _HANDLERS.get(request_type)
+                if handler is None:
+                    # 알 수 없는 요청 타입
+                    response = {"error": f"Unknown request type: {request_type}"}
                 else:
-                    response = {
-                        "response": "trajectory_load",
-                        "status": "error",
-                        "message": "map_name 또는 data가 없습니다",
-                    }
+                    response = await handler(data, param, upstream_ws)
 
+            # 응답 전송 (핸들러가 이미 직렬화된 문자열을 돌려주면 그대로 사용)
+            response_text = response if isinstance(response, str) else _dumps(response)
+            if binary:
+                await websocket.send_bytes(response_text.encode("utf-8"))
             else:
-                # 알 수 없는 요청 타입
-                response = {"error": f"Unknown request type: {request.get('request')}"}
-
-            # 응답 전송
-            await websocket.send_text(json.dumps(response))
+                await websocket.send_text(response_text)
 
     except WebSocketDisconnect:
         logger.info("[/trajectory] 클라이언트 연결 해제")
@@ -274,13 +473,14 @@ async def trajectory_proxy(websocket: WebSocket):
 
 def get_trajectory_store() -> dict:
     """현재 저장된 trajectory 데이터 반환 (캡처 저장용)"""
-    return _trajectory_store
+    for key in _STORE.data:
+        _stored_response(key)
+    return _STORE.data
 
 
 def set_trajectory_store(data: dict) -> None:
     """trajectory 저장소 설정 (재생 로드용)"""
-    global _trajectory_store
-    _trajectory_store = data
+    _STORE.replace(data)
 
 
 # 데이터 파일이 지정되어 있으면 로드
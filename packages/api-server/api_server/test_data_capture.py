@@ -0,0 +1,162 @@
+import atexit
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from .data_capture import DataCaptureManager
+
+
+class TestDataCaptureManager(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def create_manager(self, **env: str) -> DataCaptureManager:
+        """환경 변수를 적용한 새 캡처 관리자 생성 (싱글톤 초기화)"""
+        environ = {
+            "RMF_CAPTURE_DATA": "1",
+            "RMF_CAPTURE_OUTPUT_DIR": self.tmpdir.name,
+            "RMF_CAPTURE_DURATION": "0",
+            **env,
+        }
+        DataCaptureManager._instance = None
+        self.addCleanup(setattr, DataCaptureManager, "_instance", None)
+        with mock.patch.dict(os.environ, environ):
+            manager = DataCaptureManager()
+        # 테스트가 끝난 뒤 종료 시점에 임시 디렉토리로 저장하지 않도록 해제
+        atexit.unregister(manager._on_exit)
+        self.addCleanup(manager._close_history_log)
+        return manager
+
+    def save_and_load(self, manager: DataCaptureManager) -> dict:
+        output_file = manager.save()
+        self.assertIsNotNone(output_file)
+        manager.flush()
+        with open(output_file, "rb") as f:
+            return json.load(f)
+
+    def test_save_and_reload(self):
+        manager = self.create_manager()
+        manager.capture("door_state", {"door_name": "door_1", "mode": 0}, "door_1")
+        manager.capture("door_state", {"door_name": "door_1", "mode": 2}, "door_1")
+        manager.capture("fleet_state", {"name": "fleet_1", "robots": {}}, "fleet_1")
+        manager.capture("alert", {"id": "a1"}, source="gateway")
+
+        saved = self.save_and_load(manager)
+        self.assertEqual(saved["_metadata"]["total_messages"], 4)
+        history = saved["history"]
+        self.assertEqual(
+            [e["data"] for e in history["door_state"]],
+            [{"door_name": "door_1", "mode": 0}, {"door_name": "door_1", "mode": 2}],
+        )
+        self.assertEqual(
+            [e["data"] for e in history["fleet_state"]],
+            [{"name": "fleet_1", "robots": {}}],
+        )
+        self.assertEqual(history["alert"][0]["source"], "gateway")
+        self.assertIn("timestamp", history["alert"][0])
+        self.assertEqual(
+            saved["latest_states"],
+            {
+                "door_state": {"door_1": {"door_name": "door_1", "mode": 2}},
+                "fleet_state": {"fleet_1": {"name": "fleet_1", "robots": {}}},
+            },
+        )
+        self.assertEqual(
+            saved["sample_format"]["doors"], [{"door_name": "door_1", "mode": 2}]
+        )
+
+    def test_history_log_removed_after_save(self):
+        manager = self.create_manager()
+        log_path = manager._history_log_path
+        self.assertTrue(log_path.exists())
+        manager.capture("door_state", {"door_name": "door_1"}, "door_1")
+        output_file = manager.save()
+        manager.flush()
+        self.assertFalse(log_path.exists())
+        self.assertEqual(
+            os.listdir(self.tmpdir.name), [os.path.basename(output_file)]
+        )
+
+    def test_history_log_removed_when_nothing_captured(self):
+        manager = self.create_manager()
+        log_path = manager._history_log_path
+        self.assertIsNone(manager.save())
+        self.assertFalse(log_path.exists())
+        self.assertEqual(os.listdir(self.tmpdir.name), [])
+
+    def test_history_disabled(self):
+        manager = self.create_manager(RMF_CAPTURE_HISTORY="0")
+        self.assertIsNone(manager._history_log_path)
+        manager.capture("door_state", {"door_name": "door_1"}, "door_1")
+        saved = self.save_and_load(manager)
+        self.assertNotIn("history", saved)
+        self.assertEqual(
+            saved["latest_states"], {"door_state": {"door_1": {"door_name": "door_1"}}}
+        )
+
+    def test_history_limit(self):
+        manager = self.create_manager(RMF_CAPTURE_HISTORY_LIMIT="2")
+        for i in range(5):
+            manager.capture("door_state", {"mode": i}, "door_1")
+        manager.capture("lift_state", {"floor": "L1"}, "lift_1")
+
+        saved = self.save_and_load(manager)
+        self.assertEqual(
+            [e["data"] for e in saved["history"]["door_state"]],
+            [{"mode": 3}, {"mode": 4}],
+        )
+        self.assertEqual(len(saved["history"]["lift_state"]), 1)
+        self.assertEqual(saved["_metadata"]["total_messages"], 6)
+
+    def test_min_interval(self):
+        manager = self.create_manager(RMF_CAPTURE_MIN_INTERVAL_MS="60000")
+        for i in range(3):
+            manager.capture("door_state", {"mode": i}, "door_1")
+        manager.capture("door_state", {"mode": 0}, "door_2")
+        # unique_key가 없는 데이터는 간격과 무관하게 모두 기록
+        manager.capture("alert", {"id": "a1"})
+        manager.capture("alert", {"id": "a2"})
+
+        saved = self.save_and_load(manager)
+        self.assertEqual(
+            [e["data"] for e in saved["history"]["door_state"]],
+            [{"mode": 0}, {"mode": 0}],
+        )
+        self.assertEqual(len(saved["history"]["alert"]), 2)
+        # latest_states는 간격과 무관하게 항상 최신 상태
+        self.assertEqual(
+            saved["latest_states"]["door_state"],
+            {"door_1": {"mode": 2}, "door_2": {"mode": 0}},
+        )
+
+    def test_clear(self):
+        manager = self.create_manager(RMF_CAPTURE_MIN_INTERVAL_MS="60000")
+        manager.capture("door_state", {"mode": 0}, "door_1")
+        manager.capture("lift_state", {"floor": "L1"}, "lift_1")
+        manager.clear()
+
+        stats = manager.get_stats()
+        self.assertEqual(stats["message_count"], 0)
+        self.assertEqual(stats["data_types"], {})
+        self.assertEqual(stats["unique_counts"], {})
+        self.assertEqual(os.path.getsize(manager._history_log_path), 0)
+
+        # 초기화 후에는 최소 간격도 새로 시작
+        manager.capture("door_state", {"mode": 1}, "door_1")
+        saved = self.save_and_load(manager)
+        self.assertEqual(saved["_metadata"]["total_messages"], 1)
+        self.assertEqual(list(saved["history"]), ["door_state"])
+        self.assertEqual(
+            [e["data"] for e in saved["history"]["door_state"]], [{"mode": 1}]
+        )
+        self.assertEqual(saved["latest_states"], {"door_state": {"door_1": {"mode": 1}}})
+
+    def test_disabled(self):
+        manager = self.create_manager(RMF_CAPTURE_DATA="0")
+        manager.capture("door_state", {"door_name": "door_1"}, "door_1")
+        self.assertIsNone(manager.save())
+        self.assertEqual(manager.get_stats()["message_count"], 0)
+        self.assertEqual(os.listdir(self.tmpdir.name), [])
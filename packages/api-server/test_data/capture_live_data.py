@@ -34,7 +34,9 @@ RMF API Server 데이터 캡처 스크립트
 """
 
 import argparse
+import array
 import asyncio
+import importlib.util
 import json
 import signal
 import sys
@@ -55,25 +57,79 @@ except ImportError:
     print("❌ httpx 패키지가 필요합니다: pip install httpx")
     sys.exit(1)
 
+try:
+    import orjson
+except ImportError:  # 선택 사항: 없으면 표준 json으로 저장
+    orjson = None
+
+
+def _first(states) -> dict:
+    return next(iter(states))
+
+
+def _task_entries(states) -> list[dict]:
+    return [{"state": state} for state in states]
+
+
+# unique_data 유형 → (sample_data.json 키, 최신 상태 목록으로 값을 만드는 함수)
+_SAMPLE_MAP = {
+    "building_map": ("building_map", _first),
+    "fleet_state": ("fleets", list),
+    "task_state": ("tasks", _task_entries),
+    "door_state": ("doors", list),
+    "lift_state": ("lifts", list),
+    "dispenser_state": ("dispensers", list),
+    "ingestor_state": ("ingestors", list),
+    "alert_request": ("alerts", list),
+    "beacon_state": ("beacons", list),
+}
+
+
+def _dumps(obj: Any, indent: bool = False) -> bytes:
+    """JSON 직렬화 (orjson이 있으면 사용)"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option, default=str)
+    return json.dumps(
+        obj,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+        ensure_ascii=False,
+        default=str,
+    ).encode("utf-8")
+
 
 class DataCapture:
-    """데이터 캡처 관리자"""
+    """데이터 캡처 관리자
+
+    수신한 이벤트는 메모리에 쌓지 않고 출력 파일 옆의 JSONL 파일
+    (<output>.history.jsonl)에 바로 기록합니다. 메모리에는 엔티티별 최신 상태
+    (unique_data)와 유형별 줄 offset만 유지하고, save() 시 JSONL을 읽어 기존과
+    같은 "history" 섹션으로 합친 뒤 JSONL 파일을 삭제합니다.
+    """
 
     def __init__(self, output_file: str):
         self.output_file = output_file
-        self.captured_data: dict[str, list[dict]] = defaultdict(list)
         self.unique_data: dict[str, dict[str, dict]] = defaultdict(dict)
         self.start_time = datetime.now()
         self.message_count = 0
 
+        self.history_file = Path(f"{output_file}.history.jsonl")
+        self._history = open(self.history_file, "wb")
+        self._history_pos = 0
+        # 유형별 history 줄 시작 offset
+        self._history_offsets: dict[str, array.array] = {}
+
     def add_data(self, data_type: str, data: dict, unique_key: str | None = None):
         """데이터 추가"""
         timestamp = datetime.now().isoformat()
-        entry = {
-            "timestamp": timestamp,
-            "data": data
-        }
-        self.captured_data[data_type].append(entry)
+        line = _dumps({"timestamp": timestamp, "data": data}) + b"\n"
+        self._history.write(line)
+        offsets = self._history_offsets.get(data_type)
+        if offsets is None:
+            offsets = self._history_offsets[data_type] = array.array("q")
+        offsets.append(self._history_pos)
+        self._history_pos += len(line)
 
         if unique_key:
             self.unique_data[data_type][unique_key] = data
@@ -84,80 +140,78 @@ class DataCapture:
 
     def save(self):
         """캡처된 데이터를 JSON 파일로 저장"""
-        output = {
-            "_metadata": {
-                "description": "RMF API Server에서 캡처된 데이터",
-                "capture_start": self.start_time.isoformat(),
-                "capture_end": datetime.now().isoformat(),
-                "total_messages": self.message_count,
-                "data_types": list(self.captured_data.keys())
-            },
-            "history": dict(self.captured_data),
-            "latest_states": dict(self.unique_data),
-            "sample_format": self._convert_to_sample_format()
+        data_types = list(self._history_offsets.keys())
+        metadata = {
+            "description": "RMF API Server에서 캡처된 데이터",
+            "capture_start": self.start_time.isoformat(),
+            "capture_end": datetime.now().isoformat(),
+            "total_messages": self.message_count,
+            "data_types": data_types,
         }
 
-        with open(self.output_file, "w", encoding="utf-8") as f:
-            json.dump(output, f, indent=2, ensure_ascii=False, default=str)
+        self._history.close()
+        # history는 항목 단위로 스트리밍하고, 나머지 작은 섹션만 통째로 직렬화
+        with open(self.output_file, "wb", buffering=1 << 20) as f:
+            f.write(b'{\n"_metadata": ')
+            f.write(_dumps(metadata, indent=True))
+            f.write(b',\n"history": {')
+            self._write_history(f)
+            f.write(b'},\n"latest_states": ')
+            f.write(_dumps(dict(self.unique_data), indent=True))
+            f.write(b',\n"sample_format": ')
+            f.write(_dumps(self._convert_to_sample_format(), indent=True))
+            f.write(b"\n}\n")
+        self.history_file.unlink(missing_ok=True)
 
         print(f"\n✓ 데이터 저장 완료: {self.output_file}")
         print(f"  - 총 메시지 수: {self.message_count}")
-        print(f"  - 데이터 유형: {', '.join(self.captured_data.keys()) or '없음'}")
+        print(f"  - 데이터 유형: {', '.join(data_types) or '없음'}")
+
+    def _write_history(self, f):
+        """JSONL history를 유형별로 묶어 "history" 섹션 내용으로 기록"""
+        with open(self.history_file, "rb") as log:
+            for i, (data_type, offsets) in enumerate(self._history_offsets.items()):
+                if i:
+                    f.write(b",")
+                f.write(b"\n")
+                f.write(_dumps(data_type))
+                f.write(b": [")
+                for j, offset in enumerate(offsets):
+                    log.seek(offset)
+                    if j:
+                        f.write(b",")
+                    f.write(b"\n")
+                    # 한 줄이 곧 history 항목 JSON이므로 파싱 없이 그대로 복사
+                    f.write(log.readline().rstrip(b"\n"))
+                f.write(b"]")
 
     def _convert_to_sample_format(self) -> dict:
-        """sample_data.json 형식으로 변환 (mock_rmf_server.py와 호환)"""
-        sample = {}
-
-        # Building Map
-        if "building_map" in self.unique_data:
-            maps = list(self.unique_data["building_map"].values())
-            if maps:
-                sample["building_map"] = maps[0]
-
-        # Fleets
-        if "fleet_state" in self.unique_data:
-            sample["fleets"] = list(self.unique_data["fleet_state"].values())
-
-        # Tasks
-        if "task_state" in self.unique_data:
-            tasks = []
-            for task_id, state in self.unique_data["task_state"].items():
-                tasks.append({"state": state})
-            sample["tasks"] = tasks
-
-        # Doors
-        if "door_state" in self.unique_data:
-            sample["doors"] = list(self.unique_data["door_state"].values())
-
-        # Lifts
-        if "lift_state" in self.unique_data:
-            sample["lifts"] = list(self.unique_data["lift_state"].values())
-
-        # Dispensers
-        if "dispenser_state" in self.unique_data:
-            sample["dispensers"] = list(self.unique_data["dispenser_state"].values())
-
-        # Ingestors
-        if "ingestor_state" in self.unique_data:
-            sample["ingestors"] = list(self.unique_data["ingestor_state"].values())
-
-        # Alerts
-        if "alert_request" in self.unique_data:
-            sample["alerts"] = list(self.unique_data["alert_request"].values())
-
-        # Beacons
-        if "beacon_state" in self.unique_data:
-            sample["beacons"] = list(self.unique_data["beacon_state"].values())
+        """sample_data.json 형식으로 변환 (mock_rmf_server.py와 호환)
 
+        unique_data를 한 번만 순회하며, 값은 복사하지 않고 같은 dict를 참조합니다.
+        """
+        sample = {}
+        for data_type, entries in self.unique_data.items():
+            spec = _SAMPLE_MAP.get(data_type)
+            if spec is not None and entries:
+                sample_key, build = spec
+                sample[sample_key] = build(entries.values())
         return sample
 
 
 class SocketIOCapture:
     """Socket.IO를 통한 실시간 데이터 캡처"""
 
-    def __init__(self, capture: DataCapture, api_url: str, token: str | None = None):
+    def __init__(
+        self,
+        capture: DataCapture,
+        api_url: str,
+        client: httpx.AsyncClient,
+        token: str | None = None,
+    ):
         self.capture = capture
         self.api_url = api_url
+        self.client = client
         self.token = token
         self.sio = socketio.AsyncClient()
         self.subscribed_rooms: list[str] = []
@@ -198,11 +252,16 @@ class SocketIOCapture:
             handler = self._create_handler(data_type, key_extractor)
             self.sio.on(room, handler)
 
-            # 구독 요청
             print(f"  구독 중: {room}")
-            await self.sio.emit("subscribe", {"room": room})
-            self.subscribed_rooms.append(room)
-            await asyncio.sleep(0.1)  # 구독 요청 간 짧은 대기
+
+        await self._emit_subscribe([room_info["room"] for room_info in rooms])
+
+    async def _emit_subscribe(self, rooms: list[str]):
+        """구독 요청을 한 번에 전송 (요청 간 대기 없이 동시에 emit)"""
+        await asyncio.gather(
+            *(self.sio.emit("subscribe", {"room": room}) for room in rooms)
+        )
+        self.subscribed_rooms.extend(rooms)
 
     async def connect_and_capture(self, duration: float):
         """연결하고 캡처 시작"""
@@ -257,101 +316,73 @@ class SocketIOCapture:
                 await self.sio.disconnect()
 
     async def _subscribe_dynamic_rooms(self):
-        """REST API에서 목록을 가져와 동적으로 구독"""
-        headers = {}
-        if self.token:
-            headers["Authorization"] = f"Bearer {self.token}"
-
-        async with httpx.AsyncClient() as client:
-            # Fleets 구독
+        """REST API에서 목록을 가져와 동적으로 구독
+
+        목록 조회는 공유 client로 동시에 요청하고, 핸들러 등록 후 구독 요청은
+        마지막에 한 번에 전송합니다.
+        """
+        responses = await asyncio.gather(
+            *(
+                self.client.get(f"{self.api_url}{endpoint}", params=params)
+                for endpoint, params, _, _, _, _ in _DYNAMIC_ROOMS
+            ),
+            return_exceptions=True,
+        )
+
+        rooms: list[str] = []
+        for (_, _, data_type, key_extractor, room_format, label), resp in zip(
+            _DYNAMIC_ROOMS, responses
+        ):
             try:
-                resp = await client.get(f"{self.api_url}/fleets", headers=headers, timeout=10)
-                if resp.status_code == 200:
-                    fleets = resp.json()
-                    for fleet in fleets:
-                        fleet_name = fleet.get("name")
-                        if fleet_name:
-                            room = f"/fleets/{fleet_name}/state"
-                            self.sio.on(room, self._create_handler(
-                                "fleet_state",
-                                lambda d: d.get("name")
-                            ))
-                            await self.sio.emit("subscribe", {"room": room})
-                            print(f"  구독 중: {room}")
-                            await asyncio.sleep(0.1)
+                if isinstance(resp, BaseException):
+                    raise resp
+                if resp.status_code != 200:
+                    continue
+                for item in resp.json():
+                    name = key_extractor(item)
+                    if name:
+                        room = room_format.format(name)
+                        self.sio.on(room, self._create_handler(data_type, key_extractor))
+                        rooms.append(room)
+                        print(f"  구독 중: {room}")
             except Exception as e:
-                print(f"  Fleet 목록 조회 실패: {e}")
-
-            # Tasks 구독 (최근 작업)
-            try:
-                resp = await client.get(
-                    f"{self.api_url}/tasks",
-                    headers=headers,
-                    params={"limit": 10},
-                    timeout=10
-                )
-                if resp.status_code == 200:
-                    tasks = resp.json()
-                    for task in tasks:
-                        task_id = task.get("booking", {}).get("id")
-                        if task_id:
-                            room = f"/tasks/{task_id}/state"
-                            self.sio.on(room, self._create_handler(
-                                "task_state",
-                                lambda d: d.get("booking", {}).get("id")
-                            ))
-                            await self.sio.emit("subscribe", {"room": room})
-                            print(f"  구독 중: {room}")
-                            await asyncio.sleep(0.1)
-            except Exception as e:
-                print(f"  Task 목록 조회 실패: {e}")
-
-            # Doors 구독
-            try:
-                resp = await client.get(f"{self.api_url}/doors", headers=headers, timeout=10)
-                if resp.status_code == 200:
-                    doors = resp.json()
-                    for door in doors:
-                        door_name = door.get("door_name")
-                        if door_name:
-                            room = f"/doors/{door_name}/state"
-                            self.sio.on(room, self._create_handler(
-                                "door_state",
-                                lambda d: d.get("door_name")
-                            ))
-                            await self.sio.emit("subscribe", {"room": room})
-                            print(f"  구독 중: {room}")
-                            await asyncio.sleep(0.1)
-            except Exception as e:
-                print(f"  Door 목록 조회 실패: {e}")
-
-            # Lifts 구독
-            try:
-                resp = await client.get(f"{self.api_url}/lifts", headers=headers, timeout=10)
-                if resp.status_code == 200:
-                    lifts = resp.json()
-                    for lift in lifts:
-                        lift_name = lift.get("lift_name")
-                        if lift_name:
-                            room = f"/lifts/{lift_name}/state"
-                            self.sio.on(room, self._create_handler(
-                                "lift_state",
-                                lambda d: d.get("lift_name")
-                            ))
-                            await self.sio.emit("subscribe", {"room": room})
-                            print(f"  구독 중: {room}")
-                            await asyncio.sleep(0.1)
-            except Exception as e:
-                print(f"  Lift 목록 조회 실패: {e}")
-
-
-async def capture_rest_snapshot(capture: DataCapture, api_url: str, token: str | None = None):
-    """REST API에서 현재 상태 스냅샷 캡처"""
-    print("\nREST API 스냅샷 캡처 중...")
-
+                print(f"  {label} 목록 조회 실패: {e}")
+
+        await self._emit_subscribe(rooms)
+
+
+# REST 목록으로 구독할 room: (endpoint, query params, data_type, 이름 추출 함수, room 형식, 표시 이름)
+# 이름 추출 함수는 목록 항목과 room 이벤트 데이터 모두에 사용
+_DYNAMIC_ROOMS = [
+    ("/fleets", None, "fleet_state", lambda d: d.get("name"), "/fleets/{}/state", "Fleet"),
+    (
+        "/tasks",
+        {"limit": 10},
+        "task_state",
+        lambda d: d.get("booking", {}).get("id"),
+        "/tasks/{}/state",
+        "Task",
+    ),
+    ("/doors", None, "door_state", lambda d: d.get("door_name"), "/doors/{}/state", "Door"),
+    ("/lifts", None, "lift_state", lambda d: d.get("lift_name"), "/lifts/{}/state", "Lift"),
+]
+
+
+def create_http_client(token: str | None = None) -> httpx.AsyncClient:
+    """스냅샷과 동적 구독에서 함께 사용하는 HTTP client (h2 패키지가 있으면 HTTP/2)"""
     headers = {}
     if token:
         headers["Authorization"] = f"Bearer {token}"
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=10,
+        http2=importlib.util.find_spec("h2") is not None,
+    )
+
+
+async def capture_rest_snapshot(capture: DataCapture, api_url: str, client: httpx.AsyncClient):
+    """REST API에서 현재 상태 스냅샷 캡처 (모든 endpoint를 동시에 요청)"""
+    print("\nREST API 스냅샷 캡처 중...")
 
     endpoints = [
         ("/building_map", "building_map", lambda d: d.get("name") if d else None),
@@ -365,26 +396,32 @@ async def capture_rest_snapshot(capture: DataCapture, api_url: str, token: str |
         ("/alerts/requests", "alert_request", lambda d: d.get("id")),
     ]
 
-    async with httpx.AsyncClient() as client:
-        for endpoint, data_type, key_extractor in endpoints:
-            try:
-                resp = await client.get(f"{api_url}{endpoint}", headers=headers, timeout=10)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    if isinstance(data, list):
-                        for item in data:
-                            key = key_extractor(item) if key_extractor else None
-                            capture.add_data(data_type, item, key)
-                    elif data:
-                        key = key_extractor(data) if key_extractor else None
-                        capture.add_data(data_type, data, key)
-                    print(f"  ✓ {endpoint}: 성공")
-                elif resp.status_code == 401:
-                    print(f"  ✗ {endpoint}: 인증 필요 (--token 옵션 사용)")
-                else:
-                    print(f"  ✗ {endpoint}: HTTP {resp.status_code}")
-            except Exception as e:
-                print(f"  ✗ {endpoint}: {e}")
+    responses = await asyncio.gather(
+        *(client.get(f"{api_url}{endpoint}") for endpoint, _, _ in endpoints),
+        return_exceptions=True,
+    )
+
+    # 결과 처리는 endpoint 순서대로 (캡처 순서 유지)
+    for (endpoint, data_type, key_extractor), resp in zip(endpoints, responses):
+        try:
+            if isinstance(resp, BaseException):
+                raise resp
+            if resp.status_code == 200:
+                data = resp.json()
+                if isinstance(data, list):
+                    for item in data:
+                        key = key_extractor(item) if key_extractor else None
+                        capture.add_data(data_type, item, key)
+                elif data:
+                    key = key_extractor(data) if key_extractor else None
+                    capture.add_data(data_type, data, key)
+                print(f"  ✓ {endpoint}: 성공")
+            elif resp.status_code == 401:
+                print(f"  ✗ {endpoint}: 인증 필요 (--token 옵션 사용)")
+            else:
+                print(f"  ✗ {endpoint}: HTTP {resp.status_code}")
+        except Exception as e:
+            print(f"  ✗ {endpoint}: {e}")
 
 
 async def main():
@@ -466,17 +503,18 @@ async def main():
     print(f"출력 파일: {output_file}")
     print("=" * 60)
 
+    client = create_http_client(args.token)
     try:
         if args.snapshot_only:
             # REST API 스냅샷만
-            await capture_rest_snapshot(capture, args.api_url, args.token)
+            await capture_rest_snapshot(capture, args.api_url, client)
         else:
             # REST API 스냅샷 먼저 (옵션)
             if args.with_snapshot:
-                await capture_rest_snapshot(capture, args.api_url, args.token)
+                await capture_rest_snapshot(capture, args.api_url, client)
 
             # Socket.IO 실시간 캡처
-            sio_capture = SocketIOCapture(capture, args.api_url, args.token)
+            sio_capture = SocketIOCapture(capture, args.api_url, client, args.token)
 
             # 캡처 태스크와 중지 이벤트 동시 실행
             capture_task = asyncio.create_task(
@@ -499,6 +537,8 @@ async def main():
 
     except Exception as e:
         print(f"\n오류: {e}")
+    finally:
+        await client.aclose()
 
     # 데이터 저장
     capture.save()
@@ -18,16 +18,203 @@ Trajectory 데이터:
 
 import argparse
 import asyncio
+import contextlib
+import heapq
+import itertools
 import json
+import mmap
+import re
 import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
+from typing import Iterator
 from urllib.parse import urlparse
 
 import aiohttp
 import websockets
 
+try:
+    import ijson
+except ImportError:  # ijson이 없으면 캡처 파일 전체를 한 번에 파싱
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json 사용
+    orjson = None
+
+# WebSocket 연결 옵션
+# - 쓰기 버퍼 상한을 1MiB로 늘려 연속 전송 시 drain 대기를 줄임
+# - 재생 중 keepalive ping과 수신 크기 제한은 사용하지 않음
+# _internal 메시지는 수 KB 수준으로 작고 빈번하므로 압축(CPU 비용)을 끄고,
+# trajectory 메시지는 수 MB까지 커지고 반복이 많으므로 permessage-deflate 사용
+_WS_COMMON_OPTIONS = {"write_limit": 1 << 20, "max_size": None, "ping_interval": None}
+_INTERNAL_WS_OPTIONS = {**_WS_COMMON_OPTIONS, "compression": None}
+_TRAJECTORY_WS_OPTIONS = {**_WS_COMMON_OPTIONS, "compression": "deflate"}
+# trajectory 주입 시 동시에 사용할 최대 연결 수
+_TRAJECTORY_POOL_SIZE = 4
+
+# 이 크기 이상의 캡처 파일은 history를 객체로 만들지 않고 스트리밍 (ijson 필요)
+_STREAM_PARSE_THRESHOLD = 50 * 1024 * 1024
+# 스트리밍 스캔 시 ijson에 한 번에 넘기는 크기
+_SCAN_BUF_SIZE = 64 * 1024
+
+
+def _dumps(obj) -> str:
+    """WebSocket 전송용 직렬화
+
+    /_internal은 text frame만 받으므로 orjson 결과(bytes)도 str로 반환합니다.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj)
+
+
+def _loads(data: str | bytes):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@contextlib.contextmanager
+def _map_file(path: Path) -> Iterator[mmap.mmap]:
+    """파일을 읽기 전용으로 memory-map (필요한 부분만 OS가 page in/out)"""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        yield mm
+
+
+class CapturedHistory:
+    """캡처 파일의 history 섹션
+
+    전체 파싱으로 읽은 경우 메모리의 dict를 그대로 사용하고, 스트리밍으로 읽은
+    경우 유형별 항목을 필요할 때 파일에서 하나씩 읽습니다.
+    """
+
+    def __init__(
+        self,
+        captured_file: Path,
+        counts: dict[str, int],
+        history: dict[str, list] | None = None,
+        offsets: dict[str, int] | None = None,
+    ):
+        self._file = captured_file
+        self._history = history
+        # 유형별 메시지 수
+        self.counts = counts
+        # 유형별 history 배열('[')의 파일 내 위치 (스트리밍 시)
+        self._offsets = offsets or {}
+
+    def iter_entries(self, data_type: str) -> Iterator[dict]:
+        """유형별 history 항목을 기록 순서대로 반환"""
+        if self._history is not None:
+            yield from self._history.get(data_type, [])
+            return
+        count = self.counts.get(data_type, 0)
+        if not count:
+            return
+        with _map_file(self._file) as mm:
+            offset = self._offsets.get(data_type)
+            if offset is None:
+                # 위치를 모르면 파일 처음부터 파싱
+                yield from ijson.items(mm, f"history.{data_type}.item", use_float=True)
+                return
+            # 해당 유형의 배열부터 파싱하고 항목 수만큼 읽은 뒤 중단
+            # (배열 뒤의 다른 유형은 토큰화하지 않음)
+            mm.seek(offset)
+            yield from itertools.islice(ijson.items(mm, "item", use_float=True), count)
+
+
+def _find_history_array(mm: mmap.mmap, data_type: str, end: int) -> int | None:
+    """history 유형 키의 값 배열('[') 위치 반환
+
+    ijson은 byte 위치를 알려주지 않으므로, 스캔 중 키 이벤트가 나온 시점까지 읽은
+    위치(end)를 기준으로 마지막 읽기 구간에서 키를 찾습니다. '{' 또는 ',' 뒤의
+    따옴표는 문자열 안에 있을 수 없으므로 일치하는 곳은 모두 실제 객체 키입니다.
+    구간 안에 같은 이름의 배열 키가 하나뿐일 때만 위치를 반환합니다.
+    """
+    pattern = re.compile(
+        rb'[{,]\s*' + re.escape(json.dumps(data_type).encode()) + rb'\s*:\s*\['
+    )
+    start = max(0, end - _SCAN_BUF_SIZE - 4096)
+    matches = [
+        m for m in pattern.finditer(mm, start, min(len(mm), end + 4096))
+        if m.start() < end
+    ]
+    if len(matches) != 1:
+        return None
+    return matches[0].end() - 1
+
+
+def _scan_captured_file(
+    captured_file: Path,
+) -> tuple[dict, dict[str, int], dict[str, int]]:
+    """캡처 파일을 한 번 훑어 history를 제외한 섹션, history 유형별 메시지 수,
+    유형별 history 배열 위치를 반환
+
+    history 항목은 객체로 만들지 않고 개수만 셉니다.
+    """
+    sections: dict = {}
+    counts: dict[str, int] = {}
+    offsets: dict[str, int] = {}
+    key = None
+    builder = None
+    with _map_file(captured_file) as mm:
+        for prefix, event, value in ijson.parse(mm, buf_size=_SCAN_BUF_SIZE, use_float=True):
+            if not prefix:
+                # 최상위 키 경계: 이전 섹션 완료
+                if builder is not None:
+                    sections[key] = builder.value
+                    builder = None
+                if event == "map_key":
+                    key = value
+                    if key != "history":
+                        builder = ijson.ObjectBuilder()
+                continue
+            if builder is not None:
+                builder.event(event, value)
+            elif prefix == "history" and event == "map_key":
+                offset = _find_history_array(mm, value, mm.tell())
+                if offset is not None:
+                    offsets[value] = offset
+            elif event == "start_map" and prefix.count(".") == 2 and prefix.endswith(".item"):
+                # history.<data_type>.item
+                data_type = prefix[len("history.") : -len(".item")]
+                counts[data_type] = counts.get(data_type, 0) + 1
+    return sections, counts, offsets
+
+
+def load_captured_file(captured_file: Path) -> tuple[dict, CapturedHistory]:
+    """캡처 파일 로드
+
+    큰 파일은 ijson으로 history를 제외한 섹션만 객체로 만들고, history는
+    CapturedHistory를 통해 재생 시 스트리밍합니다.
+    """
+    if ijson is not None and captured_file.stat().st_size > _STREAM_PARSE_THRESHOLD:
+        data, counts, offsets = _scan_captured_file(captured_file)
+        return data, CapturedHistory(captured_file, counts, offsets=offsets)
+
+    if orjson is not None:
+        # orjson은 memoryview를 직접 파싱하므로 파일 내용을 bytes로 복사하지 않음
+        with _map_file(captured_file) as mm, memoryview(mm) as view:
+            data = orjson.loads(view)
+    else:
+        with open(captured_file, "rb") as f:
+            data = json.loads(f.read())
+    history = data.pop("history", {})
+    counts = {data_type: len(entries) for data_type, entries in history.items()}
+    return data, CapturedHistory(captured_file, counts, history)
+
+
+def _restore_image(src: Path, dst: Path) -> bool:
+    if not src.exists():
+        return False
+    # Linux에서는 shutil.copyfile이 sendfile로 커널 내부 복사를 수행
+    shutil.copyfile(src, dst)
+    return True
+
 
 def restore_images(data: dict, captured_file: Path, cache_dir: Path) -> None:
     """캡처된 이미지 파일을 캐시 디렉토리로 복원"""
@@ -59,20 +246,41 @@ def restore_images(data: dict, captured_file: Path, cache_dir: Path) -> None:
     print(f"  소스: {images_dir}")
     print(f"  대상: {building_cache}")
 
-    restored = 0
-    for img_file in captured_images:
-        src = images_dir / img_file
-        dst = building_cache / img_file
-        if src.exists():
-            shutil.copy2(src, dst)
-            print(f"  ✓ {img_file}")
-            restored += 1
-        else:
-            print(f"  ✗ {img_file} (파일 없음)")
+    # 파일마다 독립적인 복사이므로 thread pool에서 동시에 수행 (결과는 입력 순서대로)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = executor.map(
+            _restore_image,
+            [images_dir / img_file for img_file in captured_images],
+            [building_cache / img_file for img_file in captured_images],
+        )
+        restored = 0
+        for img_file, ok in zip(captured_images, results):
+            if ok:
+                print(f"  ✓ {img_file}")
+                restored += 1
+            else:
+                print(f"  ✗ {img_file} (파일 없음)")
 
     print(f"  총 {restored}개 이미지 복원됨")
 
 
+# ROS 2 RobotMode.mode 값 → API Server status (index = mode 값)
+_MODE_STATUS = ("idle", "charging", "moving", "paused", "waiting", "emergency")
+
+# robot_state 기본값. 변환 결과는 직렬화만 되므로 모든 로봇이 같은 객체를 공유 (수정 금지)
+# MappingProxyType은 json/orjson으로 직렬화할 수 없어 일반 dict를 사용
+_DEFAULT_COMMISSION = {
+    "direct_tasks": True,
+    "dispatch_tasks": True,
+    "idle_behavior": True,
+}
+_DEFAULT_MUTEX_GROUPS = {
+    "locked": [],
+    "requesting": [],
+}
+_NO_ISSUES: list = []
+
+
 def _convert_ros2_robot_state(robot: dict) -> dict:
     """ROS 2 robot_state를 API Server 형식으로 변환
 
@@ -108,31 +316,20 @@ def _convert_ros2_robot_state(robot: dict) -> dict:
     # mode → status 변환
     mode = robot.get("mode", {})
     mode_val = mode.get("mode", 0) if isinstance(mode, dict) else 0
-    mode_map = {
-        0: "idle",
-        1: "charging",
-        2: "moving",
-        3: "paused",
-        4: "waiting",
-        5: "emergency",
-    }
-    converted["status"] = mode_map.get(mode_val, "idle")
+    converted["status"] = (
+        _MODE_STATUS[mode_val]
+        if isinstance(mode_val, int) and 0 <= mode_val < len(_MODE_STATUS)
+        else "idle"
+    )
 
     # path 유지 (ROS 2에서 가져온 중요한 데이터)
     if "path" in robot:
         converted["path"] = robot["path"]
 
     # 기타 기본 필드
-    converted["commission"] = robot.get("commission", {
-        "direct_tasks": True,
-        "dispatch_tasks": True,
-        "idle_behavior": True,
-    })
-    converted["mutex_groups"] = robot.get("mutex_groups", {
-        "locked": [],
-        "requesting": [],
-    })
-    converted["issues"] = robot.get("issues", [])
+    converted["commission"] = robot.get("commission", _DEFAULT_COMMISSION)
+    converted["mutex_groups"] = robot.get("mutex_groups", _DEFAULT_MUTEX_GROUPS)
+    converted["issues"] = robot.get("issues", _NO_ISSUES)
 
     # 시간 정보 (t.sec + t.nanosec → unix_millis_time)
     if "location" in robot and "t" in robot["location"]:
@@ -144,16 +341,22 @@ def _convert_ros2_robot_state(robot: dict) -> dict:
     return converted
 
 
-def _convert_ros2_fleet_state(data: dict) -> dict:
+def _convert_ros2_fleet_state(data: dict, copy: bool = False) -> dict:
     """ROS 2 fleet_state 형식을 API Server 형식으로 변환
 
     ROS 2 형식: robots가 리스트 [{"name": "robot1", ...}, {"name": "robot2", ...}]
     API Server 형식: robots가 딕셔너리 {"robot1": {...}, "robot2": {...}}
+
+    호출하는 쪽은 캡처 파일에서 직접 파싱한 dict를 넘기므로 기본적으로 data의
+    robots를 제자리에서 교체합니다 (변환 결과도 fleet/로봇 이름은 같고, 다시
+    변환해도 그대로 반환됨). 원본을 유지해야 하면 copy=True.
     """
     robots_data = data.get("robots", [])
 
     # 이미 dict 형식이고 location.map이 있으면 그대로 반환
     if isinstance(robots_data, dict):
+        if not robots_data:
+            return data  # 변환할 로봇 없음
         # API Server 형식인지 확인 (location.map 존재 여부)
         for robot in robots_data.values():
             if isinstance(robot, dict):
@@ -162,68 +365,83 @@ def _convert_ros2_fleet_state(data: dict) -> dict:
                     return data  # 이미 API Server 형식
                 break
         # dict지만 ROS2 형식인 경우 변환 필요
-        robots_dict = {}
-        for name, robot in robots_data.items():
-            if isinstance(robot, dict):
-                robots_dict[name] = _convert_ros2_robot_state(robot)
-        converted = data.copy()
-        converted["robots"] = robots_dict
-        return converted
-
+        robots_dict = {
+            name: _convert_ros2_robot_state(robot)
+            for name, robot in robots_data.items()
+            if isinstance(robot, dict)
+        }
     # 리스트 형식이면 dict로 변환
-    if isinstance(robots_data, list):
-        robots_dict = {}
-        for robot in robots_data:
-            if isinstance(robot, dict) and "name" in robot:
-                robots_dict[robot["name"]] = _convert_ros2_robot_state(robot)
-
-        # 변환된 데이터 반환
-        converted = data.copy()
-        converted["robots"] = robots_dict
-        return converted
+    elif isinstance(robots_data, list):
+        robots_dict = {
+            robot["name"]: _convert_ros2_robot_state(robot)
+            for robot in robots_data
+            if isinstance(robot, dict) and "name" in robot
+        }
+    else:
+        return data
 
+    if copy:
+        return {**data, "robots": robots_dict}
+    data["robots"] = robots_dict
     return data
 
 
+def _id_fleet(data: dict) -> str:
+    name = data.get("name", "unknown")
+    robots_data = data.get("robots", {})
+    # robots가 dict인 경우 (API Server 형식)
+    if isinstance(robots_data, dict):
+        robots = list(robots_data.keys())
+    # robots가 list인 경우 (ROS 2 형식)
+    elif isinstance(robots_data, list):
+        robots = [r.get("name", "unknown") for r in robots_data if isinstance(r, dict)]
+    else:
+        robots = []
+    return f"{name} (로봇: {', '.join(robots[:3])}{'...' if len(robots) > 3 else ''})"
+
+
+def _id_task(data: dict) -> str:
+    booking = data.get("booking", {})
+    task_id = booking.get("id", "unknown")
+    status = data.get("status", "unknown")
+    return f"{task_id} ({status})"
+
+
+def _id_building_map(data: dict) -> str:
+    name = data.get("name", "unknown")
+    levels = [l.get("name") for l in data.get("levels", [])]
+    return f"{name} (levels: {', '.join(levels)})"
+
+
+def _id_field(field: str):
+    def extract(data: dict) -> str:
+        return data.get(field, "unknown")
+
+    return extract
+
+
+def _id_default(data: dict) -> str:
+    return str(list(data.keys())[:3])
+
+
+# 메시지 타입별 식별자 추출 함수
+_ID_EXTRACTORS = {
+    "fleet_state_update": _id_fleet,
+    "task_state_update": _id_task,
+    "door_state_update": _id_field("door_name"),
+    "lift_state_update": _id_field("lift_name"),
+    "dispenser_state_update": _id_field("guid"),
+    "ingestor_state_update": _id_field("guid"),
+    "beacon_state_update": _id_field("id"),
+    "task_log_update": _id_field("task_id"),
+    "fleet_log_update": _id_field("name"),
+    "building_map_update": _id_building_map,
+}
+
+
 def _get_data_identifier(msg_type: str, data: dict) -> str:
     """메시지 타입에 따른 식별자 추출"""
-    if msg_type == "fleet_state_update":
-        name = data.get("name", "unknown")
-        robots_data = data.get("robots", {})
-        # robots가 dict인 경우 (API Server 형식)
-        if isinstance(robots_data, dict):
-            robots = list(robots_data.keys())
-        # robots가 list인 경우 (ROS 2 형식)
-        elif isinstance(robots_data, list):
-            robots = [r.get("name", "unknown") for r in robots_data if isinstance(r, dict)]
-        else:
-            robots = []
-        return f"{name} (로봇: {', '.join(robots[:3])}{'...' if len(robots) > 3 else ''})"
-    elif msg_type == "task_state_update":
-        booking = data.get("booking", {})
-        task_id = booking.get("id", "unknown")
-        status = data.get("status", "unknown")
-        return f"{task_id} ({status})"
-    elif msg_type == "door_state_update":
-        return data.get("door_name", "unknown")
-    elif msg_type == "lift_state_update":
-        return data.get("lift_name", "unknown")
-    elif msg_type == "dispenser_state_update":
-        return data.get("guid", "unknown")
-    elif msg_type == "ingestor_state_update":
-        return data.get("guid", "unknown")
-    elif msg_type == "beacon_state_update":
-        return data.get("id", "unknown")
-    elif msg_type == "task_log_update":
-        return data.get("task_id", "unknown")
-    elif msg_type == "fleet_log_update":
-        return data.get("name", "unknown")
-    elif msg_type == "building_map_update":
-        name = data.get("name", "unknown")
-        levels = [l.get("name") for l in data.get("levels", [])]
-        return f"{name} (levels: {', '.join(levels)})"
-    else:
-        return str(list(data.keys())[:3])
+    return _ID_EXTRACTORS.get(msg_type, _id_default)(data)
 
 
 def _extract_trajectory_map_name(traj_data: dict) -> str:
@@ -234,11 +452,49 @@ def _extract_trajectory_map_name(traj_data: dict) -> str:
     return "unknown"
 
 
-async def inject_trajectory_data(data: dict, trajectory_url: str) -> None:
+async def _load_trajectories(ws, items: list[tuple[str, dict]]) -> None:
+    """한 연결에서 맵별 trajectory_load 요청/응답을 순서대로 처리"""
+    dumps = _dumps
+    for map_name, traj_data in items:
+        # trajectory 요청을 보내서 저장소에 캐시되게 함
+        # 실제로는 서버 측에서 _trajectory_store에 저장해야 함
+        # 여기서는 서버에 trajectory_load 메시지를 보냄
+
+        values = []
+        if isinstance(traj_data, dict):
+            if "values" in traj_data:
+                values = traj_data.get("values", [])
+            elif "response" in traj_data:
+                response = traj_data.get("response", {})
+                if isinstance(response, dict):
+                    values = response.get("values", [])
+
+        # trajectory_load 메시지 전송
+        msg = {
+            "request": "trajectory_load",
+            "param": {
+                "map_name": map_name,
+                "data": traj_data
+            }
+        }
+        await ws.send(dumps(msg))
+
+        # 응답 대기
+        response = await asyncio.wait_for(ws.recv(), timeout=5.0)
+        resp_data = _loads(response)
+
+        if resp_data.get("response") == "trajectory_load":
+            print(f"  [trajectory] '{map_name}': {len(values)}개 경로 로드됨")
+        else:
+            print(f"  [trajectory] '{map_name}': 응답 - {resp_data}")
+
+
+async def inject_trajectory_data(data: dict, ws, trajectory_url: str) -> None:
     """trajectory 데이터를 API Server에 주입
 
     trajectory 데이터는 sample_format.trajectories 또는 latest_states.trajectory에서 가져옵니다.
-    WebSocket /trajectory 엔드포인트에 연결하여 데이터를 로드합니다.
+    연결된 WebSocket /trajectory 엔드포인트로 데이터를 로드합니다. 맵이 여러 개면
+    연결을 최대 _TRAJECTORY_POOL_SIZE개까지 추가로 열어 맵을 나눠 동시에 로드합니다.
     """
     # trajectory 데이터 찾기
     trajectories = None
@@ -259,45 +515,26 @@ async def inject_trajectory_data(data: dict, trajectory_url: str) -> None:
         return
 
     print(f"\n=== Trajectory 데이터 주입 ===")
-    print(f"  WebSocket 연결 중: {trajectory_url}")
-
+    items = list(trajectories.items())
+    pool_size = min(_TRAJECTORY_POOL_SIZE, len(items))
     try:
-        async with websockets.connect(trajectory_url) as ws:
-            print(f"  ✓ WebSocket 연결됨")
-
-            # 각 맵별 trajectory 데이터 주입
-            for map_name, traj_data in trajectories.items():
-                # trajectory 요청을 보내서 저장소에 캐시되게 함
-                # 실제로는 서버 측에서 _trajectory_store에 저장해야 함
-                # 여기서는 서버에 trajectory_load 메시지를 보냄
-
-                values = []
-                if isinstance(traj_data, dict):
-                    if "values" in traj_data:
-                        values = traj_data.get("values", [])
-                    elif "response" in traj_data:
-                        response = traj_data.get("response", {})
-                        if isinstance(response, dict):
-                            values = response.get("values", [])
-
-                # trajectory_load 메시지 전송
-                msg = {
-                    "request": "trajectory_load",
-                    "param": {
-                        "map_name": map_name,
-                        "data": traj_data
-                    }
-                }
-                await ws.send(json.dumps(msg))
-
-                # 응답 대기
-                response = await asyncio.wait_for(ws.recv(), timeout=5.0)
-                resp_data = json.loads(response)
-
-                if resp_data.get("response") == "trajectory_load":
-                    print(f"  [trajectory] '{map_name}': {len(values)}개 경로 로드됨")
-                else:
-                    print(f"  [trajectory] '{map_name}': 응답 - {resp_data}")
+        async with contextlib.AsyncExitStack() as stack:
+            extra = await asyncio.gather(
+                *(
+                    stack.enter_async_context(
+                        websockets.connect(trajectory_url, **_TRAJECTORY_WS_OPTIONS)
+                    )
+                    for _ in range(pool_size - 1)
+                )
+            )
+            conns = [ws, *extra]
+            # 한 연결에서 recv를 동시에 기다릴 수 없으므로 연결마다 맵을 나눠 순서대로 처리
+            await asyncio.gather(
+                *(
+                    _load_trajectories(conn, items[i :: len(conns)])
+                    for i, conn in enumerate(conns)
+                )
+            )
 
     except asyncio.TimeoutError:
         print(f"  ✗ trajectory 서버 응답 타임아웃")
@@ -305,139 +542,110 @@ async def inject_trajectory_data(data: dict, trajectory_url: str) -> None:
         print(f"  ✗ trajectory 주입 실패: {e}")
 
 
-async def inject_latest_states(data: dict, internal_url: str) -> None:
-    """latest_states를 API Server에 주입"""
-    latest = data.get("latest_states", {})
+def _describe_building_map(map_data: dict) -> str:
+    levels = [l.get("name") for l in map_data.get("levels", [])]
+    return f": levels={levels}"
 
-    print("\n=== 최신 상태 주입 ===")
-    print(f"  WebSocket 연결 중: {internal_url}")
 
-    async with websockets.connect(internal_url) as ws:
-        print(f"  ✓ WebSocket 연결됨")
+def _describe_fleet_state(fleet_data: dict) -> str:
+    return f": 로봇 {len(fleet_data.get('robots', {}))}대"
 
-        # Building Map (먼저 주입 - 다른 데이터의 기반이 됨)
-        if "building_map" in latest:
-            for map_name, map_data in latest["building_map"].items():
-                msg = {
-                    "type": "building_map_update",
-                    "data": map_data
-                }
-                await ws.send(json.dumps(msg))
-                levels = [l.get("name") for l in map_data.get("levels", [])]
-                print(f"  [building_map] {map_name}: levels={levels}")
-
-        # Fleet State (ROS2 형식을 API Server 형식으로 변환)
-        if "fleet_state" in latest:
-            for fleet_name, fleet_data in latest["fleet_state"].items():
-                converted_data = _convert_ros2_fleet_state(fleet_data)
-                msg = {
-                    "type": "fleet_state_update",
-                    "data": converted_data
-                }
-                await ws.send(json.dumps(msg))
-                robots_count = len(converted_data.get('robots', {}))
-                print(f"  [fleet_state] {fleet_name}: 로봇 {robots_count}대")
-
-        # Fleet State ROS2 (별도 저장된 경우)
-        if "fleet_state_ros2" in latest:
-            for fleet_name, fleet_data in latest["fleet_state_ros2"].items():
-                converted_data = _convert_ros2_fleet_state(fleet_data)
-                msg = {
-                    "type": "fleet_state_update",
-                    "data": converted_data
-                }
-                await ws.send(json.dumps(msg))
-                robots_count = len(converted_data.get('robots', {}))
-                print(f"  [fleet_state_ros2] {fleet_name}: 로봇 {robots_count}대")
-
-        # Task State
-        if "task_state" in latest:
-            for task_id, task_data in latest["task_state"].items():
-                msg = {
-                    "type": "task_state_update",
-                    "data": task_data
-                }
-                await ws.send(json.dumps(msg))
-                print(f"  [task_state] {task_id}: {task_data.get('status', 'unknown')}")
-
-        # Task Log
-        if "task_log" in latest:
-            for task_id, log_data in latest["task_log"].items():
-                msg = {
-                    "type": "task_log_update",
-                    "data": log_data
-                }
-                await ws.send(json.dumps(msg))
-                print(f"  [task_log] {task_id}")
-
-        # Fleet Log
-        if "fleet_log" in latest:
-            for fleet_name, log_data in latest["fleet_log"].items():
-                msg = {
-                    "type": "fleet_log_update",
-                    "data": log_data
-                }
-                await ws.send(json.dumps(msg))
-                print(f"  [fleet_log] {fleet_name}")
-
-        # Door State (ROS 2 데이터)
-        if "door_state" in latest:
-            for door_name, door_data in latest["door_state"].items():
-                msg = {
-                    "type": "door_state_update",
-                    "data": door_data
-                }
-                await ws.send(json.dumps(msg))
-                print(f"  [door_state] {door_name}")
-
-        # Lift State (ROS 2 데이터)
-        if "lift_state" in latest:
-            for lift_name, lift_data in latest["lift_state"].items():
-                msg = {
-                    "type": "lift_state_update",
-                    "data": lift_data
-                }
-                await ws.send(json.dumps(msg))
-                print(f"  [lift_state] {lift_name}")
-
-        # Dispenser State (ROS 2 데이터)
-        if "dispenser_state" in latest:
-            for guid, disp_data in latest["dispenser_state"].items():
-                msg = {
-                    "type": "dispenser_state_update",
-                    "data": disp_data
-                }
-                await ws.send(json.dumps(msg))
-                print(f"  [dispenser_state] {guid}")
-
-        # Ingestor State (ROS 2 데이터)
-        if "ingestor_state" in latest:
-            for guid, ing_data in latest["ingestor_state"].items():
-                msg = {
-                    "type": "ingestor_state_update",
-                    "data": ing_data
-                }
-                await ws.send(json.dumps(msg))
-                print(f"  [ingestor_state] {guid}")
-
-        # Beacon State (ROS 2 데이터)
-        if "beacon_state" in latest:
-            for beacon_id, beacon_data in latest["beacon_state"].items():
-                msg = {
-                    "type": "beacon_state_update",
-                    "data": beacon_data
-                }
-                await ws.send(json.dumps(msg))
-                print(f"  [beacon_state] {beacon_id}")
+
+def _describe_task_state(task_data: dict) -> str:
+    return f": {task_data.get('status', 'unknown')}"
 
 
-async def replay_history(data: dict, internal_url: str, trajectory_url: str, speed: float = 1.0) -> None:
-    """history를 시간 순서대로 재생 (trajectory 포함)"""
-    history = data.get("history", {})
+# latest_states 주입 순서와 유형별 처리:
+# (latest_states 키, 메시지 타입, 변환 함수, 로그 설명 함수)
+# Building Map을 먼저 주입 (다른 데이터의 기반이 됨). fleet_state는 ROS2 형식을
+# API Server 형식으로 변환하고, 나머지 ROS 2 데이터는 그대로 전송
+_LATEST_STATE_TYPES = [
+    ("building_map", "building_map_update", None, _describe_building_map),
+    ("fleet_state", "fleet_state_update", _convert_ros2_fleet_state, _describe_fleet_state),
+    # Fleet State ROS2 (별도 저장된 경우)
+    ("fleet_state_ros2", "fleet_state_update", _convert_ros2_fleet_state, _describe_fleet_state),
+    ("task_state", "task_state_update", None, _describe_task_state),
+    ("task_log", "task_log_update", None, None),
+    ("fleet_log", "fleet_log_update", None, None),
+    ("door_state", "door_state_update", None, None),
+    ("lift_state", "lift_state_update", None, None),
+    ("dispenser_state", "dispenser_state_update", None, None),
+    ("ingestor_state", "ingestor_state_update", None, None),
+    ("beacon_state", "beacon_state_update", None, None),
+]
 
-    # 모든 히스토리 엔트리를 시간순으로 정렬
-    all_entries = []
 
+async def inject_latest_states(data: dict, ws, verbose: bool = False) -> None:
+    """latest_states를 API Server에 주입
+
+    전송할 메시지를 모두 먼저 직렬화한 뒤 한 번에 전송하고, 전송 후 유형별
+    요약을 출력합니다. verbose이면 항목별 로그도 출력합니다.
+    """
+    latest = data.get("latest_states", {})
+
+    print("\n=== 최신 상태 주입 ===")
+
+    dumps = _dumps
+    frames: list[str] = []
+    logs: list[str] = []
+    summary: list[str] = []
+    for data_type, msg_type, convert, describe in _LATEST_STATE_TYPES:
+        states = latest.get(data_type)
+        if not states:
+            continue
+        robots = 0
+        for name, state in states.items():
+            if convert is not None:
+                state = convert(state)
+            frames.append(dumps({"type": msg_type, "data": state}))
+            if msg_type == "fleet_state_update":
+                robots += len(state.get("robots", {}))
+            if verbose:
+                detail = describe(state) if describe is not None else ""
+                logs.append(f"  [{data_type}] {name}{detail}")
+        robots_info = f" (로봇 {robots}대)" if msg_type == "fleet_state_update" else ""
+        summary.append(f"  [{data_type}] {len(states)}개 주입{robots_info}")
+
+    for frame in frames:
+        await ws.send(frame)
+
+    print("\n".join(logs + summary))
+
+
+def _tag_entries(
+    msg_type: str, entries: Iterator[dict]
+) -> Iterator[tuple[str, str, dict]]:
+    """history 항목을 (timestamp, 메시지 타입, data) tuple로 변환"""
+    for entry in entries:
+        yield entry["timestamp"], msg_type, entry["data"]
+
+
+# 재생 시 이보다 짧은 대기(초)는 건너뜀
+_MIN_REPLAY_SLEEP = 0.0005
+
+# 캡처 중 거의 바뀌지 않고 크기가 큰 메시지 타입. 직전과 내용이 같으면 직렬화 결과를 재사용
+# (history 항목은 파일에서 각각 새로 파싱된 객체이므로 id()가 아니라 내용으로 비교.
+#  dict 비교는 C 수준에서 수행되어 다시 직렬화하는 것보다 저렴)
+_STATIC_MSG_TYPES = frozenset({"building_map_update"})
+
+
+async def _drain(ws) -> None:
+    """수신 frame을 계속 받아서 버림 (연결이 닫히면 종료)"""
+    try:
+        while True:
+            await ws.recv()
+    except websockets.ConnectionClosed:
+        pass
+
+
+async def replay_history(
+    history: CapturedHistory, internal_ws, trajectory_ws, speed: float = 1.0
+) -> None:
+    """history를 시간 순서대로 재생 (trajectory 포함)
+
+    유형별 history는 이미 기록 순서(시간순)이므로, 전체를 모아 정렬하지 않고
+    유형별 스트림을 k-way merge 합니다.
+    """
     type_mapping = {
         "fleet_state": "fleet_state_update",
         "fleet_state_ros2": "fleet_state_update",  # ROS 2 토픽에서 캡처된 데이터 (path 포함)
@@ -454,87 +662,112 @@ async def replay_history(data: dict, internal_url: str, trajectory_url: str, spe
         "trajectory": "trajectory",  # 특별 처리 - /trajectory WebSocket으로 전송
     }
 
-    for data_type, entries in history.items():
-        if data_type in type_mapping:
-            for entry in entries:
-                all_entries.append({
-                    "timestamp": entry["timestamp"],
-                    "type": type_mapping[data_type],
-                    "data": entry["data"]
-                })
+    replay_types = [data_type for data_type in history.counts if data_type in type_mapping]
+    total = sum(history.counts[data_type] for data_type in replay_types)
 
-    if not all_entries:
+    if not total:
         print("재생할 데이터가 없습니다.")
         return
 
-    # 시간순 정렬
-    all_entries.sort(key=lambda x: x["timestamp"])
-
-    print(f"\n=== 히스토리 재생 ({len(all_entries)}개 메시지, 속도 {speed}x) ===")
-
-    print(f"  WebSocket 연결 중: {internal_url}, {trajectory_url}")
-    async with websockets.connect(internal_url) as internal_ws, \
-               websockets.connect(trajectory_url) as trajectory_ws:
-        print(f"  ✓ WebSocket 연결됨 (internal + trajectory)")
-        prev_time = None
-        sent_count = 0
-
-        for i, entry in enumerate(all_entries):
-            # 타임스탬프 파싱
-            curr_time = datetime.fromisoformat(entry["timestamp"])
-
-            # 이전 메시지와의 시간 차이만큼 대기
-            if prev_time:
-                delay = (curr_time - prev_time).total_seconds() / speed
-                if delay > 0:
-                    await asyncio.sleep(min(delay, 5.0))  # 최대 5초 대기
-
-            # 메시지 전송
-            msg_data = entry["data"]
-
-            if entry["type"] == "trajectory":
-                # Trajectory는 별도 WebSocket으로 전송
-                map_name = _extract_trajectory_map_name(msg_data)
-                msg = {
-                    "request": "trajectory_load",
-                    "param": {
-                        "map_name": map_name,
-                        "data": msg_data
-                    }
-                }
-                await trajectory_ws.send(json.dumps(msg))
-                # 응답 대기 (non-blocking)
-                try:
-                    await asyncio.wait_for(trajectory_ws.recv(), timeout=0.5)
-                except asyncio.TimeoutError:
-                    pass
-            else:
-                # 일반 메시지는 internal WebSocket으로 전송
-                if entry["type"] == "fleet_state_update":
-                    msg_data = _convert_ros2_fleet_state(msg_data)
+    # 시간순 병합 (같은 시각이면 유형 순서, 유형 내 기록 순서 유지)
+    all_entries = heapq.merge(
+        *(
+            _tag_entries(type_mapping[data_type], history.iter_entries(data_type))
+            for data_type in replay_types
+        ),
+        key=itemgetter(0),
+    )
 
-                msg = {
-                    "type": entry["type"],
+    print(f"\n=== 히스토리 재생 ({total}개 메시지, 속도 {speed}x) ===")
+
+    prev_time = None
+    sent_count = 0
+    dumps = _dumps
+    fromisoformat = datetime.fromisoformat
+    loop_time = asyncio.get_running_loop().time
+    # 재생 시작 시각 기준 각 메시지의 전송 예정 시각(초). 메시지마다 상대 sleep을
+    # 하면 전송/변환 시간만큼 지연이 누적되므로 절대 시각까지 남은 시간만 대기
+    start = loop_time()
+    scheduled = 0.0
+    drain_task = asyncio.create_task(_drain(trajectory_ws))
+    # 메시지 타입별 마지막 (data, frame)
+    static_frames: dict[str, tuple[dict, str]] = {}
+
+    for i, (timestamp, msg_type, entry_data) in enumerate(all_entries):
+        # 타임스탬프 파싱 (C 구현 fromisoformat이 문자열 slicing 파싱보다 빠름)
+        curr_time = fromisoformat(timestamp)
+
+        # 이전 메시지와의 시간 차이만큼 대기
+        if prev_time:
+            gap = (curr_time - prev_time).total_seconds() / speed
+            if gap > 0:
+                scheduled += min(gap, 5.0)  # 최대 5초 대기
+                delay = start + scheduled - loop_time()
+                # 아주 짧은 대기는 scheduler tick으로 반올림되어 오히려 늦어지므로 바로 전송
+                # (다음 메시지의 대기 시간에서 자연히 보정됨)
+                if delay > _MIN_REPLAY_SLEEP:
+                    await asyncio.sleep(delay)
+
+        # 메시지 전송
+        msg_data = entry_data
+
+        if msg_type == "trajectory":
+            # Trajectory는 별도 WebSocket으로 전송
+            map_name = _extract_trajectory_map_name(msg_data)
+            msg = {
+                "request": "trajectory_load",
+                "param": {
+                    "map_name": map_name,
                     "data": msg_data
                 }
-                await internal_ws.send(json.dumps(msg))
+            }
+            # 응답은 drain 태스크가 받아서 버림 (응답을 기다리지 않음)
+            await trajectory_ws.send(dumps(msg))
+        else:
+            # 일반 메시지는 internal WebSocket으로 전송
+            if msg_type == "fleet_state_update":
+                msg_data = _convert_ros2_fleet_state(msg_data)
+
+            msg = {
+                "type": msg_type,
+                "data": msg_data
+            }
+            if msg_type in _STATIC_MSG_TYPES:
+                # 이전과 같은 내용이면 직렬화된 frame 재사용
+                cached = static_frames.get(msg_type)
+                if cached is not None and cached[0] == msg_data:
+                    frame = cached[1]
+                else:
+                    frame = dumps(msg)
+                    static_frames[msg_type] = (msg_data, frame)
+            else:
+                frame = dumps(msg)
+            await internal_ws.send(frame)
 
-            sent_count += 1
+        sent_count += 1
 
-            # 각 메시지 전송 로그 (처음 10개는 상세히, 이후는 10개마다)
-            if i < 10:
-                # 데이터 식별자 추출
-                data_id = _get_data_identifier(entry["type"], entry["data"])
-                print(f"  [{i+1}] 전송: {entry['type']} - {data_id}")
-            elif (i + 1) % 100 == 0 or i == len(all_entries) - 1:
-                print(f"  진행: {i + 1}/{len(all_entries)} ({(i + 1) * 100 // len(all_entries)}%) - 전송됨: {sent_count}개")
+        # 각 메시지 전송 로그 (처음 10개는 상세히, 이후는 10개마다)
+        if i < 10:
+            # 데이터 식별자 추출
+            data_id = _get_data_identifier(msg_type, entry_data)
+            print(f"  [{i+1}] 전송: {msg_type} - {data_id}")
+        elif (i + 1) % 100 == 0 or i == total - 1:
+            print(f"  진행: {i + 1}/{total} ({(i + 1) * 100 // total}%) - 전송됨: {sent_count}개")
 
-            prev_time = curr_time
+        prev_time = curr_time
+
+    # 마지막 trajectory_load 응답을 받을 시간을 준 뒤 drain 종료
+    await asyncio.sleep(0.1)
+    drain_task.cancel()
+    try:
+        await drain_task
+    except asyncio.CancelledError:
+        pass
 
     print(f"  ✓ 재생 완료! 총 {sent_count}개 메시지 전송됨")
 
 
-def print_captured_info(data: dict) -> None:
+def print_captured_info(data: dict, history: CapturedHistory) -> None:
     """캡처 데이터 정보 출력"""
     metadata = data.get("_metadata", {})
 
@@ -554,10 +787,9 @@ def print_captured_info(data: dict) -> None:
         print(f"    {data_type}: {len(items)}개")
 
     # History 정보
-    history = data.get("history", {})
     print("  [히스토리]")
-    for data_type, entries in history.items():
-        print(f"    {data_type}: {len(entries)}개 메시지")
+    for data_type, count in history.counts.items():
+        print(f"    {data_type}: {count}개 메시지")
 
     # Trajectory 정보
     sample_format = data.get("sample_format", {})
@@ -601,6 +833,7 @@ async def main():
     parser.add_argument("--speed", type=float, default=1.0, help="재생 속도 (기본: 1.0)")
     parser.add_argument("--info-only", action="store_true", help="정보만 출력하고 주입하지 않음")
     parser.add_argument("--cache-dir", default="../run/cache", help="API 서버 캐시 디렉토리 (기본: ../run/cache)")
+    parser.add_argument("--verbose", action="store_true", help="최신 상태 주입 시 항목별 로그 출력")
 
     args = parser.parse_args()
 
@@ -611,11 +844,10 @@ async def main():
         sys.exit(1)
 
     print(f"캡처 파일 로드 중: {captured_file}")
-    with open(captured_file) as f:
-        data = json.load(f)
+    data, history = load_captured_file(captured_file)
 
     # 정보 출력
-    print_captured_info(data)
+    print_captured_info(data, history)
 
     if args.info_only:
         return
@@ -640,14 +872,20 @@ async def main():
     print(f"WebSocket (trajectory): {trajectory_url}")
 
     try:
-        if args.replay:
-            # replay 모드: trajectory도 시간 순서대로 함께 재생
-            await replay_history(data, internal_url, trajectory_url, args.speed)
-        else:
-            # 최신 상태 주입
-            await inject_latest_states(data, internal_url)
-            # Trajectory 데이터 주입 (별도 WebSocket 엔드포인트)
-            await inject_trajectory_data(data, trajectory_url)
+        # 두 엔드포인트 모두 실행 동안 연결 하나씩만 사용
+        print(f"\n  WebSocket 연결 중: {internal_url}, {trajectory_url}")
+        async with websockets.connect(internal_url, **_INTERNAL_WS_OPTIONS) as internal_ws, \
+                   websockets.connect(trajectory_url, **_TRAJECTORY_WS_OPTIONS) as trajectory_ws:
+            print(f"  ✓ WebSocket 연결됨 (internal + trajectory)")
+            if args.replay:
+                # replay 모드: trajectory도 시간 순서대로 함께 재생
+                await replay_history(history, internal_ws, trajectory_ws, args.speed)
+            else:
+                # 최신 상태와 Trajectory는 서로 다른 엔드포인트로 가고 공유하는 상태가
+                # 없으므로 동시에 주입 (전체 시간이 둘의 합이 아니라 긴 쪽의 시간)
+                async with asyncio.TaskGroup() as tg:
+                    tg.create_task(inject_latest_states(data, internal_ws, args.verbose))
+                    tg.create_task(inject_trajectory_data(data, trajectory_ws, trajectory_url))
 
         print("\n주입 완료!")
 
@@ -656,9 +894,18 @@ async def main():
         print("API Server가 실행 중인지 확인하세요.")
         sys.exit(1)
     except Exception as e:
-        print(f"\n오류: {e}")
+        # TaskGroup에서 발생한 오류는 ExceptionGroup으로 묶여 있으므로 원래 오류를 출력
+        errors = e.exceptions if isinstance(e, ExceptionGroup) else (e,)
+        for error in errors:
+            print(f"\n오류: {error}")
         sys.exit(1)
 
 
 if __name__ == "__main__":
+    try:
+        import uvloop
+    except ImportError:  # 선택 사항: 없으면 기본 asyncio loop 사용
+        pass
+    else:
+        uvloop.install()
     asyncio.run(main())
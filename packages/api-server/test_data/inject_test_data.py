@@ -34,15 +34,73 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from tortoise import Tortoise
+from tortoise.exceptions import OperationalError
+from tortoise.transactions import in_transaction
+
+from api_server.models.tortoise_models import (
+    AlertRequest,
+    BeaconState,
+    BuildingMap,
+    DispenserState,
+    DoorState,
+    FleetState,
+    IngestorState,
+    LiftState,
+    ResourcePermission,
+    Role,
+    TaskLabel,
+    TaskRequest,
+    TaskState,
+    User,
+)
+
+try:
+    import ijson
+except ImportError:  # ijson이 없으면 데이터 파일 전체를 한 번에 파싱
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json 사용
+    orjson = None
+
+# 이 크기 이상의 데이터 파일은 전체를 한 번에 파싱하지 않음 (ijson 필요)
+_STREAM_PARSE_THRESHOLD = 50 * 1024 * 1024
+
+
+# 테스트 데이터 bulk 주입용 SQLite 설정. journal_mode=WAL은 tortoise 기본값이고,
+# 테스트 DB이므로 commit마다 fsync 하지 않음
+_SQLITE_PRAGMAS = """
+PRAGMA synchronous=OFF;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-200000;
+PRAGMA busy_timeout=5000;
+"""
+
+
+async def _schema_exists() -> bool:
+    """스키마가 이미 생성되어 있는지 확인 (테이블이 없으면 조회가 실패함)"""
+    try:
+        await User.exists()
+    except OperationalError:
+        return False
+    return True
+
 
+async def init_db(db_url: str, force_schema: bool = False):
+    """데이터베이스 초기화
 
-async def init_db(db_url: str):
-    """데이터베이스 초기화"""
+    이미 스키마가 있는 DB(파일 SQLite, PostgreSQL 등)에는 DDL을 다시 실행하지 않습니다.
+    모델이 바뀌어 테이블을 추가해야 하면 force_schema=True.
+    """
     await Tortoise.init(
         db_url=db_url,
         modules={"models": ["api_server.models.tortoise_models"]},
     )
-    await Tortoise.generate_schemas()
+    if db_url.startswith("sqlite"):
+        await Tortoise.get_connection("default").execute_script(_SQLITE_PRAGMAS)
+    if force_schema or not await _schema_exists():
+        await Tortoise.generate_schemas()
     print(f"✓ 데이터베이스 연결됨: {db_url}")
 
 
@@ -58,10 +116,8 @@ def millis_to_datetime(unix_millis: int | None) -> datetime | None:
     return datetime.fromtimestamp(unix_millis / 1000, tz=timezone.utc)
 
 
-async def inject_building_map(data: dict):
+async def inject_building_map(data: dict, verbose: bool = False):
     """빌딩 맵 데이터 주입"""
-    from api_server.models.tortoise_models import BuildingMap
-
     building_map = data.get("building_map")
     if not building_map:
         print("  - 빌딩 맵 데이터 없음")
@@ -74,25 +130,42 @@ async def inject_building_map(data: dict):
     print(f"  ✓ 빌딩 맵 주입됨: {building_map['name']}")
 
 
-async def inject_fleets(data: dict):
-    """Fleet 데이터 주입"""
-    from api_server.models.tortoise_models import FleetState
+async def _bulk_replace(model, objects: dict):
+    """pk별 update_or_create 대신 기존 행 삭제 + bulk_create 두 쿼리로 저장
+
+    다른 테이블이 참조하지 않는 테이블(또는 참조하는 행도 다시 쓰는 경우)용입니다. objects는 {pk: 모델 인스턴스}로,
+    같은 pk가 여러 번 나오면 마지막 항목만 남습니다.
+    (tortoise 0.21의 bulk_create(on_conflict=...)는 생성 컬럼이 없는 모델에서 conflict
+    절이 중복되고, bulk_update는 pk 이름이 "id"인 모델만 지원하므로 upsert에 쓸 수 없음)
+    """
+    if not objects:
+        return
+    pk_attr = model._meta.pk_attr
+    async with in_transaction():
+        await model.filter(**{f"{pk_attr}__in": list(objects)}).delete()
+        await model.bulk_create(objects.values())
 
+
+async def inject_fleets(data: dict, verbose: bool = False):
+    """Fleet 데이터 주입"""
     fleets = data.get("fleets", [])
-    for fleet in fleets:
-        await FleetState.update_or_create(
-            defaults={"data": fleet},
-            name=fleet["name"]
-        )
-        robot_count = len(fleet.get("robots", {}))
-        print(f"  ✓ Fleet 주입됨: {fleet['name']} (로봇 {robot_count}대)")
+    await _bulk_replace(
+        FleetState,
+        {fleet["name"]: FleetState(name=fleet["name"], data=fleet) for fleet in fleets},
+    )
+    if verbose:
+        for fleet in fleets:
+            robot_count = len(fleet.get("robots", {}))
+            print(f"  ✓ Fleet 주입됨: {fleet['name']} (로봇 {robot_count}대)")
+    print(f"  ✓ Fleet {len(fleets)}개 주입됨")
 
 
-async def inject_tasks(data: dict):
+async def inject_tasks(data: dict, verbose: bool = False):
     """Task 데이터 주입"""
-    from api_server.models.tortoise_models import TaskState, TaskRequest, TaskLabel
-
     tasks = data.get("tasks", [])
+    states: dict[str, TaskState] = {}
+    requests: dict[str, TaskRequest] = {}
+    label_objs: dict[tuple, TaskLabel] = {}
     for task_data in tasks:
         state = task_data.get("state", {})
         request = task_data.get("request", {})
@@ -102,230 +175,293 @@ async def inject_tasks(data: dict):
         if not task_id:
             continue
 
-        # TaskState 저장
-        await TaskState.update_or_create(
-            defaults={
-                "data": state,
-                "category": state.get("category"),
-                "assigned_to": state.get("assigned_to", {}).get("name") if state.get("assigned_to") else None,
-                "unix_millis_start_time": millis_to_datetime(state.get("unix_millis_start_time")),
-                "unix_millis_finish_time": millis_to_datetime(state.get("unix_millis_finish_time")),
-                "unix_millis_request_time": millis_to_datetime(booking.get("unix_millis_request_time")),
-                "status": state.get("status"),
-                "requester": booking.get("requester"),
-            },
-            id_=task_id
+        # TaskState
+        states[task_id] = TaskState(
+            id_=task_id,
+            data=state,
+            category=state.get("category"),
+            assigned_to=state.get("assigned_to", {}).get("name") if state.get("assigned_to") else None,
+            unix_millis_start_time=millis_to_datetime(state.get("unix_millis_start_time")),
+            unix_millis_finish_time=millis_to_datetime(state.get("unix_millis_finish_time")),
+            unix_millis_request_time=millis_to_datetime(booking.get("unix_millis_request_time")),
+            status=state.get("status"),
+            requester=booking.get("requester"),
         )
 
-        # TaskRequest 저장
-        await TaskRequest.update_or_create(
-            defaults={"request": request},
-            id_=task_id
-        )
+        # TaskRequest
+        requests[task_id] = TaskRequest(id_=task_id, request=request)
 
-        # TaskLabel 저장
-        task_state_obj = await TaskState.get(id_=task_id)
-        labels = booking.get("labels", [])
-        for label in labels:
-            if "=" in label:
-                name, value = label.split("=", 1)
-            else:
-                name, value = label, ""
-            await TaskLabel.update_or_create(
-                defaults={},
-                state=task_state_obj,
-                label_name=name,
-                label_value=value
+        # TaskLabel ("name=value", "="가 없으면 value는 "")
+        for label in booking.get("labels", []):
+            name, _, value = label.partition("=")
+            label_objs[(task_id, name, value)] = TaskLabel(
+                state_id=task_id, label_name=name, label_value=value
             )
 
-        print(f"  ✓ Task 주입됨: {task_id} (상태: {state.get('status')})")
+    # 기존 label을 지운 뒤 TaskState/TaskRequest를 교체하고 label을 다시 넣음
+    async with in_transaction():
+        if states:
+            await TaskLabel.filter(state_id__in=list(states)).delete()
+        await _bulk_replace(TaskState, states)
+        await _bulk_replace(TaskRequest, requests)
+        if label_objs:
+            await TaskLabel.bulk_create(label_objs.values())
 
+    if verbose:
+        for task_id, task_state_obj in states.items():
+            print(f"  ✓ Task 주입됨: {task_id} (상태: {task_state_obj.status})")
+    print(f"  ✓ Task {len(states)}개 주입됨")
 
-async def inject_doors(data: dict):
-    """Door 상태 데이터 주입"""
-    from api_server.models.tortoise_models import DoorState
 
+async def inject_doors(data: dict, verbose: bool = False):
+    """Door 상태 데이터 주입"""
     doors = data.get("doors", [])
-    for door in doors:
-        await DoorState.update_or_create(
-            defaults={"data": door},
-            id_=door["door_name"]
-        )
-        mode = door.get("current_mode", {}).get("value", "unknown")
-        print(f"  ✓ Door 주입됨: {door['door_name']} (모드: {mode})")
+    await _bulk_replace(
+        DoorState,
+        {door["door_name"]: DoorState(id_=door["door_name"], data=door) for door in doors},
+    )
+    if verbose:
+        for door in doors:
+            mode = door.get("current_mode", {}).get("value", "unknown")
+            print(f"  ✓ Door 주입됨: {door['door_name']} (모드: {mode})")
+    print(f"  ✓ Door {len(doors)}개 주입됨")
 
 
-async def inject_lifts(data: dict):
+async def inject_lifts(data: dict, verbose: bool = False):
     """Lift 상태 데이터 주입"""
-    from api_server.models.tortoise_models import LiftState
-
     lifts = data.get("lifts", [])
-    for lift in lifts:
-        await LiftState.update_or_create(
-            defaults={"data": lift},
-            id_=lift["lift_name"]
-        )
-        print(f"  ✓ Lift 주입됨: {lift['lift_name']} (현재층: {lift['current_floor']})")
+    await _bulk_replace(
+        LiftState,
+        {lift["lift_name"]: LiftState(id_=lift["lift_name"], data=lift) for lift in lifts},
+    )
+    if verbose:
+        for lift in lifts:
+            print(f"  ✓ Lift 주입됨: {lift['lift_name']} (현재층: {lift['current_floor']})")
+    print(f"  ✓ Lift {len(lifts)}개 주입됨")
 
 
-async def inject_dispensers(data: dict):
+async def inject_dispensers(data: dict, verbose: bool = False):
     """Dispenser 상태 데이터 주입"""
-    from api_server.models.tortoise_models import DispenserState
-
     dispensers = data.get("dispensers", [])
-    for disp in dispensers:
-        await DispenserState.update_or_create(
-            defaults={"data": disp},
-            id_=disp["guid"]
-        )
-        print(f"  ✓ Dispenser 주입됨: {disp['guid']}")
+    await _bulk_replace(
+        DispenserState,
+        {disp["guid"]: DispenserState(id_=disp["guid"], data=disp) for disp in dispensers},
+    )
+    if verbose:
+        for disp in dispensers:
+            print(f"  ✓ Dispenser 주입됨: {disp['guid']}")
+    print(f"  ✓ Dispenser {len(dispensers)}개 주입됨")
 
 
-async def inject_ingestors(data: dict):
+async def inject_ingestors(data: dict, verbose: bool = False):
     """Ingestor 상태 데이터 주입"""
-    from api_server.models.tortoise_models import IngestorState
-
     ingestors = data.get("ingestors", [])
-    for ing in ingestors:
-        await IngestorState.update_or_create(
-            defaults={"data": ing},
-            id_=ing["guid"]
-        )
-        print(f"  ✓ Ingestor 주입됨: {ing['guid']}")
+    await _bulk_replace(
+        IngestorState,
+        {ing["guid"]: IngestorState(id_=ing["guid"], data=ing) for ing in ingestors},
+    )
+    if verbose:
+        for ing in ingestors:
+            print(f"  ✓ Ingestor 주입됨: {ing['guid']}")
+    print(f"  ✓ Ingestor {len(ingestors)}개 주입됨")
 
 
-async def inject_alerts(data: dict):
+async def inject_alerts(data: dict, verbose: bool = False):
     """Alert 데이터 주입"""
-    from api_server.models.tortoise_models import AlertRequest
-
     alerts = data.get("alerts", [])
-    for alert in alerts:
-        await AlertRequest.update_or_create(
-            defaults={
-                "request_time": millis_to_datetime(alert["unix_millis_alert_time"]),
-                "response_expected": len(alert.get("responses_available", [])) > 0,
-                "task_id": alert.get("task_id"),
-                "data": alert
-            },
-            id=alert["id"]
+    requests = {
+        alert["id"]: AlertRequest(
+            id=alert["id"],
+            request_time=millis_to_datetime(alert["unix_millis_alert_time"]),
+            response_expected=len(alert.get("responses_available", [])) > 0,
+            task_id=alert.get("task_id"),
+            data=alert,
         )
-        print(f"  ✓ Alert 주입됨: {alert['id']} ({alert['tier']})")
-
-
-async def inject_beacons(data: dict):
+        for alert in alerts
+    }
+    if requests:
+        # AlertResponse가 참조하므로 기존 항목은 삭제하지 않고 행 단위로 갱신
+        # (bulk_update는 SQLite에서 datetime을 다른 문자열 형식으로 저장하므로 사용하지 않음)
+        async with in_transaction():
+            existing = set(
+                await AlertRequest.filter(id__in=list(requests)).values_list("id", flat=True)
+            )
+            created = [req for id_, req in requests.items() if id_ not in existing]
+            if created:
+                await AlertRequest.bulk_create(created)
+            for id_ in existing:
+                await requests[id_].save(force_update=True)
+    if verbose:
+        for alert in alerts:
+            print(f"  ✓ Alert 주입됨: {alert['id']} ({alert['tier']})")
+    print(f"  ✓ Alert {len(alerts)}개 주입됨")
+
+
+async def inject_beacons(data: dict, verbose: bool = False):
     """Beacon 데이터 주입"""
-    from api_server.models.tortoise_models import BeaconState
-
     beacons = data.get("beacons", [])
-    for beacon in beacons:
-        await BeaconState.update_or_create(
-            defaults={
-                "online": beacon["online"],
-                "category": beacon.get("category"),
-                "activated": beacon["activated"],
-                "level": beacon.get("level")
-            },
-            id=beacon["id"]
-        )
-        status = "온라인" if beacon["online"] else "오프라인"
-        print(f"  ✓ Beacon 주입됨: {beacon['id']} ({status})")
+    await _bulk_replace(
+        BeaconState,
+        {
+            beacon["id"]: BeaconState(
+                id=beacon["id"],
+                online=beacon["online"],
+                category=beacon.get("category"),
+                activated=beacon["activated"],
+                level=beacon.get("level"),
+            )
+            for beacon in beacons
+        },
+    )
+    if verbose:
+        for beacon in beacons:
+            status = "온라인" if beacon["online"] else "오프라인"
+            print(f"  ✓ Beacon 주입됨: {beacon['id']} ({status})")
+    print(f"  ✓ Beacon {len(beacons)}개 주입됨")
 
 
-async def inject_users(data: dict):
+async def inject_users(data: dict, verbose: bool = False):
     """User 데이터 주입"""
-    from api_server.models.tortoise_models import User, Role
-
     users = data.get("users", [])
-    for user_data in users:
-        user, _ = await User.update_or_create(
-            defaults={"is_admin": user_data.get("is_admin", False)},
-            username=user_data["username"]
+    async with in_transaction():
+        # 사용자마다 Role을 조회하지 않고 참조되는 Role을 한 번에 조회
+        referenced = {name for user_data in users for name in user_data.get("roles", [])}
+        roles_by_name = (
+            {role.name: role for role in await Role.filter(name__in=referenced)}
+            if referenced
+            else {}
         )
+        for user_data in users:
+            user, _ = await User.update_or_create(
+                defaults={"is_admin": user_data.get("is_admin", False)},
+                username=user_data["username"]
+            )
 
-        # 역할 연결
-        role_names = user_data.get("roles", [])
-        if role_names:
-            roles = await Role.filter(name__in=role_names)
-            await user.roles.clear()
-            for role in roles:
-                await user.roles.add(role)
+            # 역할 연결
+            role_names = user_data.get("roles", [])
+            if role_names:
+                roles = [roles_by_name[name] for name in dict.fromkeys(role_names) if name in roles_by_name]
+                await user.roles.clear()
+                if roles:
+                    await user.roles.add(*roles)
 
-        role_str = ", ".join(role_names) if role_names else "없음"
-        admin_str = "관리자" if user_data.get("is_admin") else "일반"
-        print(f"  ✓ User 주입됨: {user_data['username']} ({admin_str}, 역할: {role_str})")
+    if verbose:
+        for user_data in users:
+            role_names = user_data.get("roles", [])
+            role_str = ", ".join(role_names) if role_names else "없음"
+            admin_str = "관리자" if user_data.get("is_admin") else "일반"
+            print(f"  ✓ User 주입됨: {user_data['username']} ({admin_str}, 역할: {role_str})")
+    print(f"  ✓ User {len(users)}명 주입됨")
 
 
-async def inject_roles(data: dict):
+async def inject_roles(data: dict, verbose: bool = False):
     """Role 및 권한 데이터 주입"""
-    from api_server.models.tortoise_models import Role, ResourcePermission
-
     roles = data.get("roles", [])
-    for role_data in roles:
-        role, _ = await Role.update_or_create(
-            defaults={},
-            name=role_data["name"]
-        )
-
-        # 기존 권한 삭제 후 새로 추가
-        await ResourcePermission.filter(role=role).delete()
-
-        permissions = role_data.get("permissions", [])
-        for perm in permissions:
-            await ResourcePermission.create(
-                role=role,
-                authz_grp=perm["authz_grp"],
-                action=perm["action"]
-            )
-
-        print(f"  ✓ Role 주입됨: {role_data['name']} (권한 {len(permissions)}개)")
-
-
-async def inject_all_data(data: dict):
-    """모든 테스트 데이터 주입"""
+    # 같은 이름이 여러 번 나오면 마지막 항목의 권한을 사용
+    roles_by_name = {role_data["name"]: role_data for role_data in roles}
+    role_names = list(roles_by_name)
+    if role_names:
+        async with in_transaction():
+            # Role은 이름(pk)만 있으므로 없는 것만 생성
+            existing = set(await Role.filter(name__in=role_names).values_list("name", flat=True))
+            missing = [Role(name=name) for name in role_names if name not in existing]
+            if missing:
+                await Role.bulk_create(missing)
+
+            # 기존 권한 삭제 후 새로 추가
+            await ResourcePermission.filter(role_id__in=role_names).delete()
+            await ResourcePermission.bulk_create([
+                ResourcePermission(
+                    role_id=name,
+                    authz_grp=perm["authz_grp"],
+                    action=perm["action"],
+                )
+                for name, role_data in roles_by_name.items()
+                for perm in role_data.get("permissions", [])
+            ])
+
+    if verbose:
+        for role_data in roles:
+            print(f"  ✓ Role 주입됨: {role_data['name']} (권한 {len(role_data.get('permissions', []))}개)")
+    print(f"  ✓ Role {len(roles)}개 주입됨")
+
+
+# (진행 메시지, 주입 함수들) - 순서대로 주입할 때의 순서
+_INJECT_STEPS = [
+    ("빌딩 맵 주입 중...", (inject_building_map,)),
+    ("Fleet 데이터 주입 중...", (inject_fleets,)),
+    ("Task 데이터 주입 중...", (inject_tasks,)),
+    ("Door 상태 주입 중...", (inject_doors,)),
+    ("Lift 상태 주입 중...", (inject_lifts,)),
+    ("Dispenser 상태 주입 중...", (inject_dispensers,)),
+    ("Ingestor 상태 주입 중...", (inject_ingestors,)),
+    ("Role 데이터 주입 중...", (inject_roles,)),
+    ("User 데이터 주입 중...", (inject_users,)),
+    ("Alert 및 Beacon 데이터 주입 중...", (inject_alerts, inject_beacons)),
+]
+
+
+async def inject_all_data(data: dict, concurrent: bool = False, verbose: bool = False):
+    """모든 테스트 데이터 주입
+
+    concurrent이면 서로 다른 테이블을 쓰는 주입 함수를 동시에 실행합니다
+    (connection pool이 있는 DB용. User는 Role을 참조하므로 마지막에 주입).
+    기본은 테이블별 요약만 출력하고, verbose이면 항목별로 출력합니다.
+    """
     print("\n" + "=" * 60)
     print("RMF API Server 테스트 데이터 주입")
     print("=" * 60)
 
-    print("\n[1/10] 빌딩 맵 주입 중...")
-    await inject_building_map(data)
-
-    print("\n[2/10] Fleet 데이터 주입 중...")
-    await inject_fleets(data)
-
-    print("\n[3/10] Task 데이터 주입 중...")
-    await inject_tasks(data)
-
-    print("\n[4/10] Door 상태 주입 중...")
-    await inject_doors(data)
-
-    print("\n[5/10] Lift 상태 주입 중...")
-    await inject_lifts(data)
+    if concurrent:
+        print("\n[1/2] User를 제외한 데이터 동시 주입 중...")
+        await asyncio.gather(
+            *(
+                inject(data, verbose)
+                for _, injectors in _INJECT_STEPS
+                for inject in injectors
+                if inject is not inject_users
+            )
+        )
+        print("\n[2/2] User 데이터 주입 중...")
+        await inject_users(data, verbose)
+    else:
+        for i, (message, injectors) in enumerate(_INJECT_STEPS, 1):
+            print(f"\n[{i}/{len(_INJECT_STEPS)}] {message}")
+            for inject in injectors:
+                await inject(data, verbose)
 
-    print("\n[6/10] Dispenser 상태 주입 중...")
-    await inject_dispensers(data)
+    print("\n" + "=" * 60)
+    print("✓ 모든 테스트 데이터 주입 완료!")
+    print("=" * 60)
 
-    print("\n[7/10] Ingestor 상태 주입 중...")
-    await inject_ingestors(data)
 
-    print("\n[8/10] Role 데이터 주입 중...")
-    await inject_roles(data)
+class StreamedSampleData:
+    """데이터 파일의 최상위 항목을 요청할 때마다 ijson으로 파싱
 
-    print("\n[9/10] User 데이터 주입 중...")
-    await inject_users(data)
+    각 injector는 data.get(key)로 자기 항목만 읽으므로, 파일 전체 대신 한 번에
+    한 항목만큼만 메모리를 사용합니다.
+    """
 
-    print("\n[10/10] Alert 및 Beacon 데이터 주입 중...")
-    await inject_alerts(data)
-    await inject_beacons(data)
+    def __init__(self, data_file: str):
+        self._file = data_file
 
-    print("\n" + "=" * 60)
-    print("✓ 모든 테스트 데이터 주입 완료!")
-    print("=" * 60)
+    def get(self, key: str, default=None):
+        with open(self._file, "rb") as f:
+            for value in ijson.items(f, key, use_float=True):
+                return value
+        return default
 
 
-def load_sample_data(data_file: str) -> dict:
+def load_sample_data(data_file: str) -> dict | StreamedSampleData:
     """샘플 데이터 파일 로드"""
-    with open(data_file, "r", encoding="utf-8") as f:
-        return json.load(f)
+    if ijson is not None and os.path.getsize(data_file) >= _STREAM_PARSE_THRESHOLD:
+        print("  (대용량 파일: 항목별로 필요할 때 파싱)")
+        return StreamedSampleData(data_file)
+    # JSON 파서는 UTF-8 bytes를 직접 받으므로 텍스트로 디코딩하지 않음
+    raw = Path(data_file).read_bytes()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
 
 
 async def main():
@@ -342,6 +478,16 @@ async def main():
         default=os.path.join(os.path.dirname(__file__), "sample_data.json"),
         help="샘플 데이터 JSON 파일 경로"
     )
+    parser.add_argument(
+        "--force-schema",
+        action="store_true",
+        help="스키마가 이미 있어도 테이블 생성(DDL)을 다시 실행"
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="항목별 주입 로그 출력 (기본: 테이블별 요약)"
+    )
     parser.add_argument(
         "--keep-running",
         action="store_true",
@@ -356,10 +502,12 @@ async def main():
 
     try:
         # 데이터베이스 초기화
-        await init_db(args.db_url)
+        await init_db(args.db_url, args.force_schema)
 
-        # 데이터 주입
-        await inject_all_data(data)
+        # 데이터 주입 (SQLite는 writer가 하나이므로 순서대로)
+        await inject_all_data(
+            data, concurrent=not args.db_url.startswith("sqlite"), verbose=args.verbose
+        )
 
         if args.keep_running:
             print("\n[Enter]를 눌러 종료...")
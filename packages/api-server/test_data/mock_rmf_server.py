@@ -45,59 +45,168 @@ except ImportError:
     print("websockets 패키지가 필요합니다: pip install websockets")
     sys.exit(1)
 
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json 사용
+    orjson = None
+
+
+def _dumps(obj) -> str:
+    """WebSocket 전송용 직렬화
+
+    /_internal은 text frame만 받으므로 orjson 결과(bytes)도 str로 반환합니다.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj)
+
+
+def _loads(data: str | bytes):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _fleet_signature(fleet: dict) -> tuple:
+    """시뮬레이션 fleet 상태 요약 (위치는 cm, 배터리는 0.01 단위)"""
+    signature = []
+    for robot_name, robot in fleet.get("robots", {}).items():
+        location = robot.get("location") or {}
+        signature.append((
+            robot_name,
+            robot.get("status"),
+            round(location.get("x", 0.0), 2),
+            round(location.get("y", 0.0), 2),
+            round(robot.get("battery") or 0.0, 2),
+        ))
+    return tuple(signature)
+
 
 class MockRmfServer:
     """RMF Mock 서버 - API 서버에 테스트 데이터 전송"""
 
-    def __init__(self, api_url: str, data_file: str):
+    def __init__(
+        self,
+        api_url: str,
+        data_file: str,
+        compression: bool = True,
+        heartbeat_ticks: int = 6,
+    ):
         self.api_url = api_url
         self.data_file = data_file
+        # permessage-deflate 사용 여부. 반복되는 상태 JSON은 압축률이 높지만
+        # 로컬 루프백에서는 압축 CPU 비용이 대역폭 절감보다 큼
+        self.compression = compression
         self.data: dict = {}
         self.ws: Any = None
         self.running = False
         self.message_count = 0
+        # 전송할 frame 대기열. 시뮬레이션이 네트워크 전송을 기다리지 않도록
+        # 별도 태스크가 순서대로 보냄
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._sender: asyncio.Task | None = None
+        # 시뮬레이션에서 마지막으로 전송한 fleet/task 상태 요약과 전송한 tick.
+        # 바뀌지 않았으면 전송을 생략하되, heartbeat_ticks마다는 변경이 없어도 전송
+        self.heartbeat_ticks = max(1, heartbeat_ticks)
+        self._tick = 0
+        self._fleet_signatures: dict[str, tuple[tuple, int]] = {}
+        self._task_signatures: dict[str, tuple[tuple, int]] = {}
 
     def load_data(self):
         """데이터 파일 로드"""
-        with open(self.data_file, "r", encoding="utf-8") as f:
-            self.data = json.load(f)
+        # JSON 파서는 UTF-8 bytes를 직접 받으므로 텍스트로 디코딩하지 않음
+        self.data = _loads(Path(self.data_file).read_bytes())
         print(f"✓ 데이터 로드됨: {self.data_file}")
 
     async def connect(self):
         """WebSocket 연결"""
         print(f"연결 중: {self.api_url}")
-        self.ws = await websockets.connect(self.api_url)
+        self.ws = await websockets.connect(
+            self.api_url,
+            compression="deflate" if self.compression else None,
+            max_size=None,
+            write_limit=2**20,
+        )
+        self._sender = asyncio.create_task(self._sender_loop())
+        # 새 연결(API 서버 재시작 포함)에는 이전 연결에서 보낸 상태가 없으므로 모두 다시 전송
+        self._fleet_signatures.clear()
+        self._task_signatures.clear()
         print(f"✓ 연결됨: {self.api_url}")
 
     async def disconnect(self):
-        """WebSocket 연결 해제"""
+        """WebSocket 연결 해제 (대기 중인 frame을 모두 보낸 뒤)"""
+        if self._sender:
+            # 전송 태스크가 오류로 끝나면 남은 frame은 보낼 수 없으므로 기다리지 않음
+            flushed = asyncio.create_task(self._queue.join())
+            await asyncio.wait((flushed, self._sender), return_when=asyncio.FIRST_COMPLETED)
+            flushed.cancel()
+            self._sender.cancel()
+            self._sender = None
         if self.ws:
             await self.ws.close()
             print("연결 해제됨")
 
+    async def _sender_loop(self):
+        """대기열의 frame을 순서대로 WebSocket으로 전송"""
+        while True:
+            frame = await self._queue.get()
+            try:
+                await self.ws.send(frame)
+            finally:
+                self._queue.task_done()
+
+    def _enqueue(self, frame: str):
+        if self._sender is not None and self._sender.done():
+            # 전송 태스크가 오류(연결 끊김 등)로 종료되었으면 그 오류를 발생시킴
+            self._sender.result()
+        self._queue.put_nowait(frame)
+
+    def _should_send(
+        self, signatures: dict[str, tuple[tuple, int]], key: str, signature: tuple
+    ) -> bool:
+        """상태가 바뀌었거나 heartbeat_ticks 동안 전송하지 않았으면 True"""
+        last = signatures.get(key)
+        if (
+            last is not None
+            and last[0] == signature
+            and self._tick - last[1] < self.heartbeat_ticks
+        ):
+            return False
+        signatures[key] = (signature, self._tick)
+        return True
+
     async def send_message(self, msg_type: str, data: dict):
         """WebSocket 메시지 전송"""
         message = {
             "type": msg_type,
             "data": data
         }
-        await self.ws.send(json.dumps(message))
+        self._enqueue(_dumps(message))
         self.message_count += 1
         print(f"  [{self.message_count}] 전송: {msg_type}")
 
+    async def send_messages(self, msgs: list[tuple[str, dict]]):
+        """여러 메시지를 메시지당 한 frame으로 이어서 전송
+
+        모든 frame을 대기열에 한 번에 넣으므로 전송 태스크가 중간에 다른 작업을
+        기다리지 않고 연속으로 보냅니다.
+        """
+        for msg_type, data in msgs:
+            self._enqueue(_dumps({"type": msg_type, "data": data}))
+            self.message_count += 1
+            print(f"  [{self.message_count}] 전송: {msg_type}")
+
     async def send_fleet_states(self):
         """Fleet 상태 전송"""
         fleets = self.data.get("fleets", [])
-        for fleet in fleets:
-            await self.send_message("fleet_state_update", fleet)
+        await self.send_messages([("fleet_state_update", fleet) for fleet in fleets])
 
     async def send_task_states(self):
         """Task 상태 전송"""
         tasks = self.data.get("tasks", [])
-        for task in tasks:
-            state = task.get("state", {})
-            if state:
-                await self.send_message("task_state_update", state)
+        await self.send_messages(
+            [("task_state_update", task["state"]) for task in tasks if task.get("state")]
+        )
 
     async def send_all_data_once(self):
         """모든 데이터 한 번 전송"""
@@ -122,6 +231,7 @@ class MockRmfServer:
         while self.running:
             iteration += 1
             print(f"\n--- 시뮬레이션 #{iteration} ---")
+            self._tick = iteration
 
             # Fleet 상태 업데이트 (로봇 위치, 배터리 등 변경)
             await self.send_simulated_fleet_update()
@@ -134,9 +244,17 @@ class MockRmfServer:
     async def send_simulated_fleet_update(self):
         """시뮬레이션된 Fleet 업데이트 전송"""
         fleets = self.data.get("fleets", [])
+        msgs = []
+        # 한 tick의 모든 로봇은 같은 시각을 사용
+        now_ms = int(time.time() * 1000)
         for fleet in fleets:
-            # 로봇 상태 약간 변경
-            fleet_copy = json.loads(json.dumps(fleet))  # deep copy
+            # 로봇 상태 약간 변경. 원본은 그대로 두고 값을 바꾸는 robot/location dict만 복사
+            # (JSON 왕복 deep copy는 fleet 전체를 다시 만들어서 느림)
+            fleet_copy = dict(fleet)
+            if "robots" in fleet:
+                fleet_copy["robots"] = {
+                    robot_name: dict(robot) for robot_name, robot in fleet["robots"].items()
+                }
             for robot_name, robot in fleet_copy.get("robots", {}).items():
                 # 배터리 약간 변화
                 if robot.get("battery"):
@@ -145,17 +263,25 @@ class MockRmfServer:
 
                 # 위치 약간 변화 (working 상태인 경우)
                 if robot.get("status") == "working" and robot.get("location"):
-                    robot["location"]["x"] += random.uniform(-0.5, 0.5)
-                    robot["location"]["y"] += random.uniform(-0.5, 0.5)
+                    robot["location"] = location = dict(robot["location"])
+                    location["x"] += random.uniform(-0.5, 0.5)
+                    location["y"] += random.uniform(-0.5, 0.5)
 
                 # 시간 업데이트
-                robot["unix_millis_time"] = int(time.time() * 1000)
+                robot["unix_millis_time"] = now_ms
 
-            await self.send_message("fleet_state_update", fleet_copy)
+            signature = _fleet_signature(fleet_copy)
+            if not self._should_send(
+                self._fleet_signatures, fleet_copy.get("name"), signature
+            ):
+                continue
+            msgs.append(("fleet_state_update", fleet_copy))
+        await self.send_messages(msgs)
 
     async def send_simulated_task_update(self):
         """시뮬레이션된 Task 업데이트 전송"""
         tasks = self.data.get("tasks", [])
+        msgs = []
         for task in tasks:
             state = task.get("state", {})
             if not state:
@@ -163,15 +289,22 @@ class MockRmfServer:
 
             # underway 상태인 task만 업데이트
             if state.get("status") == "underway":
-                state_copy = json.loads(json.dumps(state))
+                # 최상위 estimate_millis만 바뀌므로 shallow copy로 충분
+                state_copy = dict(state)
 
-                # estimate_millis 감소
+                # estimate_millis 감소. 다음 tick이 이어서 감소하도록 저장
                 if state_copy.get("estimate_millis"):
                     state_copy["estimate_millis"] = max(
                         0, state_copy["estimate_millis"] - 5000
                     )
+                task["state"] = state_copy
 
-                await self.send_message("task_state_update", state_copy)
+                task_id = state_copy.get("booking", {}).get("id")
+                signature = (state_copy.get("status"), state_copy.get("estimate_millis"))
+                if not self._should_send(self._task_signatures, task_id, signature):
+                    continue
+                msgs.append(("task_state_update", state_copy))
+        await self.send_messages(msgs)
 
     async def run_once(self):
         """한 번만 데이터 전송"""
@@ -398,6 +531,17 @@ async def main():
         action="store_true",
         help="대화형 모드"
     )
+    parser.add_argument(
+        "--no-compression",
+        action="store_true",
+        help="WebSocket permessage-deflate 압축 끄기 (localhost 연결 시 권장)"
+    )
+    parser.add_argument(
+        "--heartbeat-ticks",
+        type=int,
+        default=6,
+        help="시뮬레이션 모드에서 상태가 바뀌지 않아도 N tick마다 전송 (기본값: 6)"
+    )
     parser.add_argument(
         "--create-sample",
         action="store_true",
@@ -435,7 +579,12 @@ async def main():
             print("--data-file 옵션으로 지정하거나 --create-sample로 샘플을 생성하세요.")
             sys.exit(1)
 
-    mock_server = MockRmfServer(args.api_url, data_file)
+    mock_server = MockRmfServer(
+        args.api_url,
+        data_file,
+        compression=not args.no_compression,
+        heartbeat_ticks=args.heartbeat_ticks,
+    )
 
     # 시그널 핸들러
     def signal_handler(sig, frame):
@@ -15,15 +15,27 @@ API Server가 실제 RMF 시스템처럼 데이터를 받을 수 있게 합니
 """
 
 import argparse
+import functools
+import hashlib
 import json
+import os
+import pickle
 import sys
+import threading
 import time
-from datetime import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from operator import attrgetter, itemgetter
 from pathlib import Path
+from typing import Callable, Iterable, Iterator
 
 import rclpy
+from rclpy.callback_groups import MutuallyExclusiveCallbackGroup
+from rclpy.executors import MultiThreadedExecutor
 from rclpy.node import Node
 from rclpy.qos import QoSProfile, ReliabilityPolicy, DurabilityPolicy
+from rclpy.task import Future
 
 # RMF 메시지 타입
 from rmf_door_msgs.msg import DoorState
@@ -33,69 +45,499 @@ from rmf_ingestor_msgs.msg import IngestorState
 from rmf_building_map_msgs.msg import BuildingMap, Level, Graph, GraphNode, GraphEdge, Door, Lift, AffineImage
 from builtin_interfaces.msg import Time
 
+try:
+    import ijson
+except ImportError:  # ijson이 없으면 캡처 파일 전체를 한 번에 파싱
+    ijson = None
 
-def dict_to_time(d: dict) -> Time:
-    """dict를 builtin_interfaces/Time으로 변환"""
-    t = Time()
-    t.sec = d.get("sec", 0)
-    t.nanosec = d.get("nanosec", 0)
-    return t
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json 사용
+    orjson = None
 
+# 이 크기 이상의 캡처 파일은 history를 dict 트리로 만들지 않고 스트리밍 (ijson 필요)
+_STREAM_PARSE_THRESHOLD = 50 * 1024 * 1024
 
-def create_door_state(data: dict) -> DoorState:
-    """dict에서 DoorState 메시지 생성"""
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=timezone.utc)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def timestamp_to_ns(timestamp: str) -> int:
+    """ISO 8601 타임스탬프를 정수 epoch 나노초로 변환 (float 오차 없음)"""
+    dt = datetime.fromisoformat(timestamp)
+    epoch = _EPOCH if dt.tzinfo is None else _EPOCH_UTC
+    return (dt - epoch) // _ONE_MICROSECOND * 1000
+
+
+def _time_fields(d: dict) -> tuple[int, int]:
+    """builtin_interfaces/Time dict → (sec, nanosec)"""
+    return d.get("sec", 0), d.get("nanosec", 0)
+
+
+# 필드를 한 번의 C 호출로 꺼내는 getter. 캡처 데이터는 보통 모든 필드를 갖고 있으므로
+# 이 경로를 먼저 시도하고, 필드가 빠진 항목(KeyError)만 기본값을 채우는 .get 경로로 처리
+_get_door = itemgetter("door_time", "door_name", "current_mode")
+_get_lift = itemgetter(
+    "lift_time",
+    "lift_name",
+    "available_floors",
+    "current_floor",
+    "destination_floor",
+    "door_state",
+    "motion_state",
+    "available_modes",
+    "current_mode",
+    "session_id",
+)
+_get_workcell = itemgetter("time", "guid", "mode", "request_guid_queue", "seconds_remaining")
+_get_time = itemgetter("sec", "nanosec")
+
+
+def _door_fields(data: dict) -> tuple:
+    try:
+        door_time, door_name, current_mode = _get_door(data)
+        return door_time["sec"], door_time["nanosec"], door_name, current_mode["value"]
+    except KeyError:
+        pass
+    return (
+        *_time_fields(data.get("door_time", {})),
+        data.get("door_name", ""),
+        data.get("current_mode", {}).get("value", 0),
+    )
+
+
+def _lift_fields(data: dict) -> tuple:
+    try:
+        fields = _get_lift(data)
+        return _get_time(fields[0]) + fields[1:]
+    except KeyError:
+        pass
+    return (
+        *_time_fields(data.get("lift_time", {})),
+        data.get("lift_name", ""),
+        data.get("available_floors", []),
+        data.get("current_floor", ""),
+        data.get("destination_floor", ""),
+        data.get("door_state", 0),
+        data.get("motion_state", 0),
+        data.get("available_modes", []),
+        data.get("current_mode", 0),
+        data.get("session_id", ""),
+    )
+
+
+def _workcell_fields(data: dict) -> tuple:
+    """DispenserState/IngestorState 공통 필드"""
+    try:
+        fields = _get_workcell(data)
+        return _get_time(fields[0]) + fields[1:]
+    except KeyError:
+        pass
+    return (
+        *_time_fields(data.get("time", {})),
+        data.get("guid", ""),
+        data.get("mode", 0),
+        data.get("request_guid_queue", []),
+        data.get("seconds_remaining", 0.0),
+    )
+
+
+def _build_door_state(fields: tuple) -> DoorState:
     msg = DoorState()
-    msg.door_time = dict_to_time(data.get("door_time", {}))
-    msg.door_name = data.get("door_name", "")
-    msg.current_mode.value = data.get("current_mode", {}).get("value", 0)
+    msg.door_time.sec, msg.door_time.nanosec, msg.door_name, msg.current_mode.value = fields
     return msg
 
 
-def create_lift_state(data: dict) -> LiftState:
-    """dict에서 LiftState 메시지 생성"""
+def _build_lift_state(fields: tuple) -> LiftState:
     msg = LiftState()
-    msg.lift_time = dict_to_time(data.get("lift_time", {}))
-    msg.lift_name = data.get("lift_name", "")
-    msg.available_floors = data.get("available_floors", [])
-    msg.current_floor = data.get("current_floor", "")
-    msg.destination_floor = data.get("destination_floor", "")
-    msg.door_state = data.get("door_state", 0)
-    msg.motion_state = data.get("motion_state", 0)
-    msg.available_modes = data.get("available_modes", [])
-    msg.current_mode = data.get("current_mode", 0)
-    msg.session_id = data.get("session_id", "")
+    (
+        msg.lift_time.sec,
+        msg.lift_time.nanosec,
+        msg.lift_name,
+        msg.available_floors,
+        msg.current_floor,
+        msg.destination_floor,
+        msg.door_state,
+        msg.motion_state,
+        msg.available_modes,
+        msg.current_mode,
+        msg.session_id,
+    ) = fields
     return msg
 
 
+def _build_workcell_state(msg_type, fields: tuple):
+    msg = msg_type()
+    (
+        msg.time.sec,
+        msg.time.nanosec,
+        msg.guid,
+        msg.mode,
+        msg.request_guid_queue,
+        msg.seconds_remaining,
+    ) = fields
+    return msg
+
+
+def create_door_state(data: dict) -> DoorState:
+    """dict에서 DoorState 메시지 생성"""
+    return _build_door_state(_door_fields(data))
+
+
+def create_lift_state(data: dict) -> LiftState:
+    """dict에서 LiftState 메시지 생성"""
+    return _build_lift_state(_lift_fields(data))
+
+
 def create_dispenser_state(data: dict) -> DispenserState:
     """dict에서 DispenserState 메시지 생성"""
-    msg = DispenserState()
-    msg.time = dict_to_time(data.get("time", {}))
-    msg.guid = data.get("guid", "")
-    msg.mode = data.get("mode", 0)
-    msg.request_guid_queue = data.get("request_guid_queue", [])
-    msg.seconds_remaining = data.get("seconds_remaining", 0.0)
-    return msg
+    return _build_workcell_state(DispenserState, _workcell_fields(data))
 
 
 def create_ingestor_state(data: dict) -> IngestorState:
     """dict에서 IngestorState 메시지 생성"""
-    msg = IngestorState()
-    msg.time = dict_to_time(data.get("time", {}))
-    msg.guid = data.get("guid", "")
-    msg.mode = data.get("mode", 0)
-    msg.request_guid_queue = data.get("request_guid_queue", [])
-    msg.seconds_remaining = data.get("seconds_remaining", 0.0)
-    return msg
+    return _build_workcell_state(IngestorState, _workcell_fields(data))
+
+
+# 시간순 재생 대상 history 유형별 (dict → 필드 tuple, 필드 tuple → 메시지) 변환 함수.
+# 캐시에는 ROS 메시지 대신 필드 tuple을 저장 (메시지 객체는 ROS 배포판 간 pickle 호환이 안 됨)
+_MSG_CODECS = {
+    "door_state": (_door_fields, _build_door_state),
+    "lift_state": (_lift_fields, _build_lift_state),
+    "dispenser_state": (_workcell_fields, functools.partial(_build_workcell_state, DispenserState)),
+    "ingestor_state": (_workcell_fields, functools.partial(_build_workcell_state, IngestorState)),
+}
+
+def _stream_captured_file(
+    captured_file: Path, sections: dict, counts: dict[str, int]
+) -> Iterator[tuple[str, str, dict]]:
+    """ijson으로 캡처 파일을 한 번 훑으며 재생 대상 history 항목을 하나씩 반환
+
+    history 외 섹션은 sections에 객체로 만들고, 재생하지 않는 history 항목은
+    객체로 만들지 않고 개수만 셉니다.
+    """
+    key = None
+    builder = None
+    item = None
+    item_type = None
+    item_prefix = None
+    with open(captured_file, "rb") as f:
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if not prefix:
+                # 최상위 키 경계: 이전 섹션 완료
+                if builder is not None:
+                    sections[key] = builder.value
+                    builder = None
+                if event == "map_key":
+                    key = value
+                    if key != "history":
+                        builder = ijson.ObjectBuilder()
+                continue
+            if builder is not None:
+                builder.event(event, value)
+            elif item is not None:
+                item.event(event, value)
+                if event == "end_map" and prefix == item_prefix:
+                    entry = item.value
+                    item = None
+                    yield item_type, entry["timestamp"], entry["data"]
+            elif event == "map_key" and prefix == "history":
+                # 항목이 없는 유형도 0개로 표시
+                counts.setdefault(value, 0)
+            elif event == "start_map" and prefix.count(".") == 2 and prefix.endswith(".item"):
+                # history.<data_type>.item
+                data_type = prefix[len("history.") : -len(".item")]
+                counts[data_type] = counts.get(data_type, 0) + 1
+                if data_type in _MSG_CODECS:
+                    item = ijson.ObjectBuilder()
+                    item.event(event, value)
+                    item_type = data_type
+                    item_prefix = prefix
+
+
+def iter_captured_file(
+    captured_file: Path, sections: dict, counts: dict[str, int]
+) -> Iterator[tuple[str, str, dict]]:
+    """캡처 파일의 재생 대상 history 항목을 (data_type, timestamp, data)로 반환
+
+    history 외 섹션(_metadata, latest_states 등)은 sections에, history 유형별
+    메시지 수는 counts에 채웁니다. 둘 다 반환값을 끝까지 소비한 뒤에 사용하세요.
+    큰 파일은 ijson으로 스트리밍하여 history 전체를 메모리에 올리지 않습니다.
+    """
+    if ijson is not None and captured_file.stat().st_size > _STREAM_PARSE_THRESHOLD:
+        yield from _stream_captured_file(captured_file, sections, counts)
+        return
+
+    raw = captured_file.read_bytes()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    history = data.pop("history", {})
+    sections.update(data)
+    for data_type, entries in history.items():
+        counts[data_type] = len(entries)
+    for data_type, entries in history.items():
+        if data_type in _MSG_CODECS:
+            for entry in entries:
+                yield data_type, entry["timestamp"], entry["data"]
+
+
+def _build_rows(
+    entries: Iterable[tuple[str, str, dict]], sections: dict
+) -> list[tuple[int, str, tuple]]:
+    """history 항목을 시간순 (offset 나노초, data_type, 필드 tuple) 목록으로 변환
+
+    타임스탬프는 한 번만 정수 나노초로 파싱하고, 정렬과 대기 시간 계산은
+    정수 비교/뺄셈으로 수행합니다. offset 기준(0)은 _metadata의 capture_start이고,
+    없으면 가장 이른 항목 시각입니다. sections는 entries를 모두 소비한 뒤에 읽습니다.
+    """
+    rows = [
+        (timestamp_to_ns(timestamp), data_type, _MSG_CODECS[data_type][0](data))
+        for data_type, timestamp, data in entries
+    ]
+    if not rows:
+        return []
+
+    # 시간순 정렬 (같은 시각이면 history 순서 유지)
+    rows.sort(key=itemgetter(0))
+
+    # 재생 시작 시각은 캡처 시작 시각에 대응 (첫 항목까지의 간격도 그대로 재생)
+    start = rows[0][0]
+    capture_start = sections.get("_metadata", {}).get("capture_start")
+    if capture_start:
+        start = min(start, timestamp_to_ns(capture_start))
+    return [(ts_ns - start, data_type, fields) for ts_ns, data_type, fields in rows]
+
+
+# 캐시 형식이 바뀌면 올려서 이전 캐시를 무시
+_CACHE_VERSION = 3
+
+
+def _cache_path_for(captured_file: Path) -> Path:
+    """캡처 파일의 pickle 캐시 경로 ($XDG_CACHE_HOME/rmf-playback/<hash>.pkl)
+
+    캐시는 git으로 관리되는 캡처 디렉토리가 아니라 사용자 캐시 디렉토리에 둡니다.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    digest = hashlib.sha256(str(captured_file.resolve()).encode()).hexdigest()[:32]
+    return Path(cache_home) / "rmf-playback" / f"{digest}.pkl"
+
+
+def load_capture(
+    captured_file: Path, use_cache: bool = True
+) -> tuple[dict, dict[str, int], list[tuple[int, str, tuple]]]:
+    """캡처 파일 로드
+
+    Returns:
+        (history 외 섹션, history 유형별 메시지 수, 재생 행 목록)
+
+    use_cache면 로드 결과를 사용자 캐시 디렉토리(_cache_path_for)에 저장해 두고,
+    캡처 파일의 경로/크기/수정 시각이 같으면 다음 실행부터 JSON 파싱 없이
+    pickle로 읽습니다. 캐시 디렉토리는 이 스크립트만 쓰므로 그 밖의 .pkl 파일은
+    읽지 않습니다.
+    """
+    cache_path = _cache_path_for(captured_file)
+    stat = captured_file.stat()
+    cache_key = (
+        _CACHE_VERSION, str(captured_file.resolve()), stat.st_size, stat.st_mtime_ns
+    )
+
+    if use_cache and cache_path.exists():
+        try:
+            with open(cache_path, "rb") as f:
+                cached = pickle.load(f)
+            if cached["key"] == cache_key:
+                print(f"캐시 사용: {cache_path}")
+                return cached["sections"], cached["counts"], cached["rows"]
+        except Exception as e:
+            # 손상되었거나 다른 형식의 파일이면 캡처 파일에서 다시 생성
+            print(f"캐시를 읽지 못해 무시합니다: {e}")
+
+    sections: dict = {}
+    counts: dict[str, int] = {}
+    rows = _build_rows(iter_captured_file(captured_file, sections, counts), sections)
+
+    if use_cache:
+        tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump(
+                    {"key": cache_key, "sections": sections, "counts": counts, "rows": rows},
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"경고: 캐시 파일을 저장하지 못했습니다: {e}")
+
+    return sections, counts, rows
+
+
+def build_timeline(
+    rows: list[tuple[int, str, tuple]],
+    speed: float = 1.0,
+    max_gap: float | None = None,
+    dedup: bool = True,
+) -> list[tuple[int, list[tuple[str, object]]]]:
+    """재생 행을 (offset 나노초, [(data_type, 메시지), ...]) 목록으로 변환
+
+    같은 시각의 메시지(일괄 상태 스냅샷 등)는 한 묶음으로 모아 한 번만 대기한 뒤
+    연달아 발행합니다. 메시지는 한 번만 만들어 두고 --loop 반복 재생에도 그대로
+    재사용합니다. max_gap(재생 시간 기준 초)을 지정하면 긴 공백(캡처 일시 정지 등)을
+    그 길이로 줄입니다.
+
+    dedup이면 같은 엔티티(door/lift 이름, dispenser/ingestor guid)의 상태가 직전
+    상태와 시각 필드 외에 같을 때 발행하지 않습니다. 구독자에게 새 정보가 없는
+    TRANSIENT_LOCAL 상태를 다시 직렬화/전송하지 않기 위함입니다.
+    """
+    max_gap_ns = int(max_gap * speed * 1e9) if max_gap is not None else None
+    timeline: list[tuple[int, list[tuple[str, object]]]] = []
+    offset = 0
+    prev = 0
+    bucket: list[tuple[str, object]] = []
+    # (data_type, 엔티티 이름) → 마지막으로 발행한 상태 (필드 tuple에서 시각 (sec, nanosec) 제외)
+    last_states: dict[tuple[str, str], tuple] = {}
+    skipped = 0
+    builders = {data_type: build for data_type, (_, build) in _MSG_CODECS.items()}
+    for row_offset, data_type, fields in rows:
+        if dedup:
+            # 모든 필드 tuple은 (sec, nanosec, 엔티티 이름, ...) 순서
+            state = fields[2:]
+            entity = (data_type, fields[2])
+            if last_states.get(entity) == state:
+                skipped += 1
+                continue
+            last_states[entity] = state
+        if row_offset != prev or not timeline:
+            gap = row_offset - prev
+            if max_gap_ns is not None and gap > max_gap_ns:
+                gap = max_gap_ns
+            offset += gap
+            prev = row_offset
+            bucket = []
+            timeline.append((offset, bucket))
+        bucket.append((data_type, builders[data_type](fields)))
+
+    if skipped:
+        print(
+            f"변경 없는 상태 {skipped}/{len(rows)}개 생략 "
+            f"({skipped * 100 // len(rows)}%, --no-dedup으로 모두 발행)"
+        )
+    return timeline
+
+
+# 재생 진행 상황 출력 간격(초)
+_REPORT_INTERVAL = 1.0
+
+
+# 재생 타이머와 토픽별 publish 스레드 사이 큐의 최대 길이
+_PUBLISH_QUEUE_SIZE = 1024
+
+# data_type별 엔티티 식별자 (publish 큐에서 같은 엔티티의 상태를 찾을 때 사용)
+_ENTITY_KEYS: dict[str, Callable] = {
+    "door_state": attrgetter("door_name"),
+    "lift_state": attrgetter("lift_name"),
+    "dispenser_state": attrgetter("guid"),
+    "ingestor_state": attrgetter("guid"),
+}
+
+
+class _PublishQueue:
+    """토픽 하나의 publish를 전용 스레드에서 실행하는 bounded 큐
+
+    RELIABLE + TRANSIENT_LOCAL QoS에서는 구독자가 느리면 DDS writer history가 차서
+    publish()가 블록될 수 있으므로, 재생 타이머는 큐에 넣기만 하고 실제 publish는
+    writer 스레드가 합니다. 토픽마다 큐와 스레드를 따로 두므로 한 토픽의 publish가
+    막혀도 다른 토픽은 영향을 받지 않습니다.
+
+    큐가 가득 찼을 때 block이 아니면, 큐에 같은 엔티티의 이전 상태가 있을 경우 그
+    메시지를 새 상태로 바꿉니다 (엔티티마다 최신 상태만 의미가 있음). 같은 엔티티의
+    메시지가 없으면 다른 엔티티의 상태를 잃지 않도록 자리가 날 때까지 기다립니다.
+    """
+
+    def __init__(self, publish: Callable, name: str, maxsize: int = _PUBLISH_QUEUE_SIZE, block: bool = False):
+        self.publish = publish
+        self.maxsize = maxsize
+        self.block = block
+        self.replaced = 0
+        # (엔티티 키, 메시지)
+        self._items: deque[tuple[str, object]] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"playback-{name}", daemon=True)
+        self._thread.start()
+
+    def put(self, key: str, msg) -> None:
+        with self._cond:
+            items = self._items
+            if len(items) >= self.maxsize:
+                if not self.block:
+                    for i, (queued_key, _) in enumerate(items):
+                        if queued_key == key:
+                            items[i] = (key, msg)
+                            self.replaced += 1
+                            return
+                self._cond.wait_for(lambda: len(items) < self.maxsize)
+            items.append((key, msg))
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        """큐에 남은 메시지를 모두 발행한 뒤 writer 스레드 종료"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _run(self) -> None:
+        items = self._items
+        publish = self.publish
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: items or self._closed)
+                if not items:
+                    return
+                _, msg = items.popleft()
+                self._cond.notify_all()
+            publish(msg)
+
+
+class _TopicSchedule:
+    """토픽 하나의 재생 목록과 재생 위치"""
+
+    __slots__ = ("name", "publish", "schedule", "cursor", "timer", "queue")
+
+    def __init__(self, name: str, publish: Callable):
+        self.name = name
+        self.publish = publish
+        # (offset 나노초, [(엔티티 키, 메시지), ...]) offset 순
+        self.schedule: list[tuple[int, list[tuple[str, object]]]] = []
+        self.cursor = 0
+        self.timer = None
+        self.queue: _PublishQueue | None = None
 
 
 class ROS2Playback(Node):
-    def __init__(self, data: dict, speed: float = 1.0, loop: bool = False):
+    def __init__(
+        self,
+        data: dict | None = None,
+        timeline: list[tuple[int, list[tuple[str, object]]]] | None = None,
+        speed: float = 1.0,
+        loop: bool = False,
+        tick_ms: float = 5.0,
+        backpressure: str = "drop",
+    ):
         super().__init__("rmf_playback")
 
-        self.data = data
+        # history를 제외한 캡처 섹션 (latest_states 등). 캡처 파일 로드와 ROS 2
+        # 초기화를 겹치기 위해 생성 후 지정해도 됨 (재생 목록은 set_timeline())
+        self.data = data or {}
         self.speed = speed
         self.loop = loop
+        # 재생 타이머 주기(초). 타이머 콜백마다 그 시점까지 도래한 메시지를 모두 발행하므로
+        # 메시지 발행 시각의 오차는 최대 이 주기만큼
+        self.tick = tick_ms / 1000
+        # publish 큐가 가득 찼을 때 "drop" (큐에 있는 같은 엔티티의 이전 상태를 새 상태로 대체) 또는 "block"
+        self.backpressure = backpressure
 
         # QoS 설정 (RMF와 동일하게)
         qos = QoSProfile(
@@ -110,6 +552,17 @@ class ROS2Playback(Node):
         self.dispenser_pub = self.create_publisher(DispenserState, "/dispenser_states", qos)
         self.ingestor_pub = self.create_publisher(IngestorState, "/ingestor_states", qos)
         self.map_pub = self.create_publisher(BuildingMap, "/map", qos)
+        self._type_publishers = {
+            "door_state": self.door_pub,
+            "lift_state": self.lift_pub,
+            "dispenser_state": self.dispenser_pub,
+            "ingestor_state": self.ingestor_pub,
+        }
+        # 토픽별 재생 목록
+        self._topics: list[_TopicSchedule] = []
+        self._progress_lock = threading.Lock()
+        if timeline:
+            self.set_timeline(timeline)
 
         self.get_logger().info(f"ROS 2 Playback 시작 (속도: {speed}x, 반복: {loop})")
 
@@ -148,86 +601,162 @@ class ROS2Playback(Node):
 
         self.get_logger().info(f"총 {count}개 메시지 발행 완료")
 
-    def replay_history(self):
-        """히스토리 시간순 재생"""
-        history = self.data.get("history", {})
+    def set_timeline(self, timeline: list[tuple[int, list[tuple[str, object]]]]) -> None:
+        """build_timeline()으로 만든 재생 목록 지정
 
-        # 모든 히스토리 엔트리를 시간순으로 정렬
-        all_entries = []
+        토픽끼리는 발행 시각이 서로 독립적이므로 토픽별 재생 목록으로 나눠 둡니다.
+        publisher도 여기서 한 번만 찾아 두고, 재생 중에는 메시지마다 유형 비교나
+        조회 없이 publish만 호출합니다.
 
-        for data_type, entries in history.items():
-            if data_type in ["door_state", "lift_state", "dispenser_state", "ingestor_state"]:
-                for entry in entries:
-                    all_entries.append({
-                        "timestamp": entry["timestamp"],
-                        "type": data_type,
-                        "data": entry["data"]
-                    })
+        어차피 타이머 주기 단위로 발행되므로 offset을 주기 경계로 올림해 같은 주기의
+        메시지를 하나로 묶어 둡니다. 고속 재생에서도 콜백 횟수가 메시지 수가 아닌
+        재생 시간에 비례합니다.
+        """
+        # 타이머 주기 하나에 해당하는 캡처 기준 나노초
+        tick_ns = max(int(self.tick * self.speed * 1e9), 1)
+        topics: dict[str, _TopicSchedule] = {}
+        for offset, bucket in timeline:
+            offset = -(-offset // tick_ns) * tick_ns
+            for data_type, msg in bucket:
+                topic = topics.get(data_type)
+                if topic is None:
+                    topic = topics[data_type] = _TopicSchedule(
+                        data_type, self._type_publishers[data_type].publish
+                    )
+                item = (_ENTITY_KEYS[data_type](msg), msg)
+                schedule = topic.schedule
+                if schedule and schedule[-1][0] == offset:
+                    schedule[-1][1].append(item)
+                else:
+                    schedule.append((offset, [item]))
+        self._topics = list(topics.values())
+
+    def start_replay(self) -> Future:
+        """히스토리 시간순 재생 시작
+
+        메인 스레드를 sleep으로 막지 않도록 주기 타이머 콜백에서 도래한 메시지를
+        발행합니다. executor가 타이머 사이사이에 DDS/rclpy 내부 작업과 Ctrl-C를
+        처리할 수 있습니다. 토픽마다 별도 callback group의 타이머를 두므로, 한 토픽의
+        publish가 늦어져도 다른 토픽의 발행을 막지 않습니다.
+        반환된 Future는 재생이 끝나면 완료됩니다 (반복 재생이면 완료되지 않음).
+        """
+        self.replay_done = Future()
 
-        if not all_entries:
+        if not self._topics:
             self.get_logger().warn("재생할 데이터가 없습니다.")
+            self.replay_done.set_result(0)
+            return self.replay_done
+
+        self._total = sum(len(bucket) for topic in self._topics for _, bucket in topic.schedule)
+        # 재생 중 반복 호출되므로 logger 조회를 미리 해 둠
+        self._log_info = self.get_logger().info
+        self._restart(time.monotonic())
+        for topic in self._topics:
+            topic.queue = _PublishQueue(topic.publish, topic.name, block=self.backpressure == "block")
+            topic.timer = self.create_timer(
+                self.tick,
+                functools.partial(self._on_replay_tick, topic),
+                callback_group=MutuallyExclusiveCallbackGroup(),
+            )
+        return self.replay_done
+
+    def stop_replay(self) -> None:
+        """큐에 남은 메시지를 발행하고 토픽별 publish 스레드 종료"""
+        replaced = 0
+        for topic in self._topics:
+            if topic.queue is None:
+                continue
+            topic.queue.close()
+            replaced += topic.queue.replaced
+            topic.queue = None
+        if replaced:
+            self.get_logger().warn(
+                f"publish 큐가 가득 차 {replaced}개 메시지를 같은 엔티티의 최신 상태로 대체 "
+                f"(--backpressure block으로 모두 발행)"
+            )
+
+    def _restart(self, start: float) -> None:
+        """start(time.monotonic() 기준)부터 재생 목록을 처음부터 다시 재생"""
+        self._start = start
+        self._sent = 0
+        self._finished = 0
+        for topic in self._topics:
+            topic.cursor = 0
+        self._next_report = start + _REPORT_INTERVAL
+        self._log_info(f"재생 시작: {self._total}개 메시지 (속도: {self.speed}x)")
+
+    def _on_replay_tick(self, topic: "_TopicSchedule") -> None:
+        """재생 시작 이후 경과 시간까지 도래한 topic의 메시지를 모두 발행"""
+        schedule = topic.schedule
+        cursor = topic.cursor
+        if cursor >= len(schedule):
             return
 
-        # 시간순 정렬
-        all_entries.sort(key=lambda x: x["timestamp"])
-
-        total = len(all_entries)
-        self.get_logger().info(f"재생 시작: {total}개 메시지 (속도: {self.speed}x)")
-
-        prev_time = None
-
-        for i, entry in enumerate(all_entries):
-            # 타임스탬프 파싱
-            curr_time = datetime.fromisoformat(entry["timestamp"])
-
-            # 이전 메시지와의 시간 차이만큼 대기
-            if prev_time:
-                delay = (curr_time - prev_time).total_seconds() / self.speed
-                if delay > 0:
-                    time.sleep(min(delay, 2.0))  # 최대 2초 대기
-
-            # 메시지 발행
-            data_type = entry["type"]
-            data = entry["data"]
-
-            if data_type == "door_state":
-                self.door_pub.publish(create_door_state(data))
-            elif data_type == "lift_state":
-                self.lift_pub.publish(create_lift_state(data))
-            elif data_type == "dispenser_state":
-                self.dispenser_pub.publish(create_dispenser_state(data))
-            elif data_type == "ingestor_state":
-                self.ingestor_pub.publish(create_ingestor_state(data))
-
-            # 진행 상황 출력 (10% 단위)
-            progress = (i + 1) * 100 // total
-            if (i + 1) % (total // 10 + 1) == 0 or i == total - 1:
-                self.get_logger().info(f"진행: {i + 1}/{total} ({progress}%)")
-
-            prev_time = curr_time
-
-        self.get_logger().info("재생 완료!")
-
-
-def print_info(data: dict):
-    """캡처 데이터 정보 출력"""
+        # 경과 시간을 캡처 기준 나노초 offset으로 환산. 재생 시작 기준 절대 시각과
+        # 비교하므로 타이머가 늦게 깨어나도 오차가 누적되지 않음
+        mono = time.monotonic()
+        now = (mono - self._start) * self.speed * 1e9
+        sent = 0
+        put = topic.queue.put
+        while cursor < len(schedule) and schedule[cursor][0] <= now:
+            bucket = schedule[cursor][1]
+            # 같은 시각의 메시지는 연달아 publish 큐에 넣음
+            for key, msg in bucket:
+                put(key, msg)
+            sent += len(bucket)
+            cursor += 1
+        if not sent:
+            return
+        topic.cursor = cursor
+
+        # 진행 상황과 종료는 모든 토픽을 합쳐서 판단
+        with self._progress_lock:
+            self._sent += sent
+            total_sent = self._sent
+            # 진행 상황 출력 (최대 _REPORT_INTERVAL초에 한 번, 그리고 마지막 메시지 발행 시)
+            if mono >= self._next_report or total_sent == self._total:
+                self._log_info(f"진행: {total_sent}/{self._total} ({total_sent * 100 // self._total}%)")
+                self._next_report = mono + _REPORT_INTERVAL
+
+            if cursor < len(schedule):
+                return
+            self._finished += 1
+            if self._finished < len(self._topics):
+                return
+
+            self._log_info("재생 완료!")
+            if self.loop:
+                self._log_info("반복 재생...")
+                # 1초 쉬었다가 처음부터 다시 재생
+                self._restart(time.monotonic() + 1.0)
+            else:
+                for t in self._topics:
+                    t.timer.cancel()
+                self.replay_done.set_result(total_sent)
+
+
+def print_info(data: dict, counts: dict[str, int]):
+    """캡처 데이터 정보 출력 (counts: history 유형별 메시지 수)"""
     metadata = data.get("_metadata", {})
 
-    print("\n" + "=" * 60)
-    print("  캡처 데이터 정보")
-    print("=" * 60)
-    print(f"  캡처 시작: {metadata.get('capture_start', 'N/A')}")
-    print(f"  캡처 종료: {metadata.get('capture_end', 'N/A')}")
-    print(f"  총 메시지: {metadata.get('total_messages', 0)}")
-    print("-" * 60)
-
-    history = data.get("history", {})
-    print("  [ROS 2 데이터]")
+    # 줄마다 print하지 않고 한 번에 출력 (느린 터미널/CI 로그에서 줄 단위 flush 대기 방지)
+    lines = [
+        "\n" + "=" * 60,
+        "  캡처 데이터 정보",
+        "=" * 60,
+        f"  캡처 시작: {metadata.get('capture_start', 'N/A')}",
+        f"  캡처 종료: {metadata.get('capture_end', 'N/A')}",
+        f"  총 메시지: {metadata.get('total_messages', 0)}",
+        "-" * 60,
+        "  [ROS 2 데이터]",
+    ]
     ros2_types = ["door_state", "lift_state", "dispenser_state", "ingestor_state", "building_map"]
     for data_type in ros2_types:
-        if data_type in history:
-            print(f"    {data_type}: {len(history[data_type])}개 메시지")
-    print("=" * 60)
+        if data_type in counts:
+            lines.append(f"    {data_type}: {counts[data_type]}개 메시지")
+    lines.append("=" * 60)
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
 
 
 def main():
@@ -253,7 +782,35 @@ def main():
     parser.add_argument("--replay", action="store_true", help="히스토리를 시간순으로 재생")
     parser.add_argument("--speed", type=float, default=1.0, help="재생 속도 (기본: 1.0)")
     parser.add_argument("--loop", action="store_true", help="반복 재생")
+    parser.add_argument(
+        "--max-gap",
+        type=float,
+        default=None,
+        help="재생 시 메시지 사이 최대 대기 시간(초). 지정하지 않으면 캡처 간격 그대로 재생",
+    )
+    parser.add_argument(
+        "--tick-ms",
+        type=float,
+        default=5.0,
+        help="재생 타이머 주기(ms). 주기마다 도래한 메시지를 한꺼번에 발행 (기본: 5)",
+    )
+    parser.add_argument(
+        "--backpressure",
+        choices=["drop", "block"],
+        default="drop",
+        help="publish 큐가 가득 찼을 때 큐에 있는 같은 엔티티의 이전 상태를 새 상태로 바꾸거나(drop) 기다림(block) (기본: drop)",
+    )
     parser.add_argument("--info-only", action="store_true", help="정보만 출력")
+    parser.add_argument(
+        "--no-dedup",
+        action="store_true",
+        help="직전과 같은 상태도 모두 발행 (기본: 엔티티별로 변경된 상태만 발행)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="$XDG_CACHE_HOME/rmf-playback/ 의 pickle 캐시를 읽거나 만들지 않음",
+    )
 
     args = parser.parse_args()
 
@@ -263,28 +820,46 @@ def main():
         print(f"오류: 파일을 찾을 수 없습니다: {captured_file}")
         sys.exit(1)
 
-    print(f"캡처 파일 로드 중: {captured_file}")
-    with open(captured_file) as f:
-        data = json.load(f)
-
-    print_info(data)
+    def load() -> tuple[dict, dict[str, int], list]:
+        data, counts, rows = load_capture(captured_file, use_cache=not args.no_cache)
+        timeline = []
+        if args.replay and not args.info_only:
+            timeline = build_timeline(rows, args.speed, args.max_gap, dedup=not args.no_dedup)
+        return data, counts, timeline
 
+    print(f"캡처 파일 로드 중: {captured_file}")
     if args.info_only:
+        data, counts, _ = load()
+        print_info(data, counts)
         return
 
-    # ROS 2 초기화
+    # 캡처 파일 파싱과 ROS 2 초기화(DDS discovery, publisher 생성)는 서로 독립적이므로
+    # 파싱을 별도 스레드에서 진행하면서 ROS 2를 초기화
+    loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="capture-loader")
+    load_future = loader.submit(load)
+    loader.shutdown(wait=False)
+
     rclpy.init()
 
     try:
-        node = ROS2Playback(data, args.speed, args.loop)
+        node = ROS2Playback(
+            speed=args.speed, loop=args.loop, tick_ms=args.tick_ms, backpressure=args.backpressure
+        )
+        node.data, counts, timeline = load_future.result()
+        node.set_timeline(timeline)
+        print_info(node.data, counts)
 
         if args.replay:
-            while True:
-                node.replay_history()
-                if not args.loop:
-                    break
-                node.get_logger().info("반복 재생...")
-                time.sleep(1)
+            # 재생은 토픽별 타이머 콜백에서 진행되고, 끝나면 (반복 재생이 아닐 때) Future가 완료됨.
+            # 토픽마다 스레드 하나씩 두어 한 토픽의 publish(직렬화/rmw 전송)가 진행되는 동안
+            # 다른 토픽의 발행이 기다리지 않도록 함
+            executor = MultiThreadedExecutor(num_threads=len(node._type_publishers))
+            executor.add_node(node)
+            try:
+                executor.spin_until_future_complete(node.start_replay())
+            finally:
+                node.stop_replay()
+                executor.shutdown()
         else:
             node.publish_latest_states()
             # 메시지가 전송될 시간 확보
@@ -20,12 +20,15 @@ RMF API Server 테스트 스크립트
 
 import argparse
 import asyncio
+import copy
+import functools
 import json
 import sys
+from collections import Counter
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from typing import Any
+from typing import Any, Awaitable, Callable
 
 try:
     import httpx
@@ -33,6 +36,26 @@ except ImportError:
     print("⚠️ httpx 패키지가 필요합니다: pip install httpx")
     sys.exit(1)
 
+try:
+    import h2  # noqa: F401
+except ImportError:  # h2가 없으면 HTTP/1.1만 사용 (pip install httpx[http2])
+    h2 = None
+
+try:
+    import brotli  # noqa: F401
+except ImportError:  # brotli가 없으면 gzip/deflate 압축만 요청 (pip install httpx[brotli])
+    brotli = None
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json 사용
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # ijson이 없으면 빌딩 맵 응답 전체를 파싱
+    ijson = None
+
 
 class TestStatus(Enum):
     PASS = "✓ PASS"
@@ -41,7 +64,7 @@ class TestStatus(Enum):
     WARN = "⚠ WARN"
 
 
-@dataclass
+@dataclass(slots=True)
 class TestResult:
     name: str
     status: TestStatus
@@ -49,524 +72,449 @@ class TestResult:
     details: dict | None = None
 
 
-class ApiTester:
-    """API 테스터"""
+# 200 응답 요약: (상태, 메시지, 상세 정보)
+Summary = tuple[TestStatus, str, dict | None]
 
-    def __init__(self, api_url: str, expected_data_file: str | None = None):
-        self.api_url = api_url.rstrip("/")
-        self.results: list[TestResult] = []
-        self.expected_data: dict = {}
+# 인증이 필요한 엔드포인트의 공통 응답 처리
+_AUTH_RESPONSES = {401: (TestStatus.SKIP, "인증 필요")}
 
-        if expected_data_file:
-            with open(expected_data_file, "r", encoding="utf-8") as f:
-                self.expected_data = json.load(f)
 
-    async def run_all_tests(self):
-        """모든 테스트 실행"""
-        print("\n" + "=" * 60)
-        print("RMF API Server 테스트")
-        print("=" * 60)
-        print(f"API URL: {self.api_url}")
-        print("=" * 60 + "\n")
-
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            # 기본 연결 테스트
-            await self.test_connection(client)
-
-            # API 엔드포인트 테스트
-            await self.test_building_map(client)
-            await self.test_fleets(client)
-            await self.test_tasks(client)
-            await self.test_doors(client)
-            await self.test_lifts(client)
-            await self.test_dispensers(client)
-            await self.test_ingestors(client)
-            await self.test_alerts(client)
-            await self.test_beacons(client)
-
-            # 사용자/권한 테스트 (인증 필요 시 건너뜀)
-            await self.test_users(client)
+def _loads(raw: bytes) -> Any:
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
 
-        self.print_summary()
 
-    async def test_connection(self, client: httpx.AsyncClient):
-        """기본 연결 테스트"""
-        test_name = "API 서버 연결"
-        try:
-            response = await client.get(f"{self.api_url}/time")
-            if response.status_code == 200:
-                data = response.json()
-                self.results.append(TestResult(
-                    test_name, TestStatus.PASS,
-                    f"서버 시간: {data}"
-                ))
-            else:
-                self.results.append(TestResult(
-                    test_name, TestStatus.FAIL,
-                    f"HTTP {response.status_code}"
-                ))
-        except Exception as e:
-            self.results.append(TestResult(
-                test_name, TestStatus.FAIL, str(e)
-            ))
+@functools.lru_cache(maxsize=8)
+def _load_expected_data(path: Path, mtime_ns: int) -> dict:
+    """기대 데이터 파일 로드. 여러 ApiTester가 같은 파일을 쓰면 한 번만 파싱
+    (mtime_ns는 파일이 바뀌었을 때 다시 읽기 위한 캐시 키, 반환값은 수정하지 말 것)"""
+    return _loads(path.read_bytes())
 
-    async def test_building_map(self, client: httpx.AsyncClient):
-        """빌딩 맵 API 테스트"""
-        test_name = "빌딩 맵 조회"
-        try:
-            response = await client.get(f"{self.api_url}/building_map")
-
-            if response.status_code == 200:
-                data = response.json()
-                expected = self.expected_data.get("building_map", {})
-
-                if data:
-                    details = {
-                        "name": data.get("name"),
-                        "levels": len(data.get("levels", [])),
-                        "lifts": len(data.get("lifts", []))
-                    }
-
-                    # 기대값과 비교
-                    if expected and data.get("name") != expected.get("name"):
-                        self.results.append(TestResult(
-                            test_name, TestStatus.WARN,
-                            f"맵 이름 불일치: {data.get('name')} != {expected.get('name')}",
-                            details
-                        ))
-                    else:
-                        self.results.append(TestResult(
-                            test_name, TestStatus.PASS,
-                            f"맵: {data.get('name')}, 레벨: {details['levels']}, 리프트: {details['lifts']}",
-                            details
-                        ))
-                else:
-                    self.results.append(TestResult(
-                        test_name, TestStatus.WARN, "빌딩 맵 데이터 없음"
-                    ))
-            elif response.status_code == 401:
-                self.results.append(TestResult(
-                    test_name, TestStatus.SKIP, "인증 필요"
-                ))
-            else:
-                self.results.append(TestResult(
-                    test_name, TestStatus.FAIL, f"HTTP {response.status_code}"
-                ))
-        except Exception as e:
-            self.results.append(TestResult(
-                test_name, TestStatus.FAIL, str(e)
-            ))
 
-    async def test_fleets(self, client: httpx.AsyncClient):
-        """Fleet API 테스트"""
-        test_name = "Fleet 목록 조회"
-        try:
-            response = await client.get(f"{self.api_url}/fleets")
+async def _read_json(response: httpx.Response) -> Any:
+    return _loads(await response.aread())
 
-            if response.status_code == 200:
-                data = response.json()
-                expected_fleets = self.expected_data.get("fleets", [])
 
-                if data:
-                    fleet_info = []
-                    for fleet in data:
-                        robots = fleet.get("robots", {})
-                        fleet_info.append(f"{fleet.get('name')}({len(robots)}대)")
+def _reduce_building_map(data: dict | None) -> dict | None:
+    """빌딩 맵에서 테스트에 필요한 이름과 레벨/리프트 수만 남김"""
+    if not data:
+        return None
+    return {
+        "name": data.get("name"),
+        "levels": len(data.get("levels", [])),
+        "lifts": len(data.get("lifts", [])),
+    }
 
-                    self.results.append(TestResult(
-                        test_name, TestStatus.PASS,
-                        f"Fleet {len(data)}개: {', '.join(fleet_info)}",
-                        {"fleets": data}
-                    ))
 
-                    # 각 Fleet 상세 테스트
-                    for fleet in data:
-                        await self.test_fleet_detail(client, fleet.get("name"))
-                else:
-                    self.results.append(TestResult(
-                        test_name, TestStatus.WARN, "Fleet 데이터 없음"
-                    ))
-            elif response.status_code == 401:
-                self.results.append(TestResult(
-                    test_name, TestStatus.SKIP, "인증 필요"
-                ))
-            else:
-                self.results.append(TestResult(
-                    test_name, TestStatus.FAIL, f"HTTP {response.status_code}"
-                ))
-        except Exception as e:
-            self.results.append(TestResult(
-                test_name, TestStatus.FAIL, str(e)
-            ))
+# ijson 이벤트 중 배열 원소 하나의 시작을 나타내는 이벤트
+_VALUE_START_EVENTS = {"start_map", "start_array", "string", "number", "boolean", "null"}
 
-    async def test_fleet_detail(self, client: httpx.AsyncClient, fleet_name: str):
-        """Fleet 상세 테스트"""
-        test_name = f"Fleet 상세: {fleet_name}"
-        try:
-            response = await client.get(f"{self.api_url}/fleets/{fleet_name}/state")
-
-            if response.status_code == 200:
-                data = response.json()
-                robots = data.get("robots", {})
-                robot_states = []
-                for name, robot in robots.items():
-                    status = robot.get("status", "unknown")
-                    battery = robot.get("battery")
-                    if battery is not None:
-                        battery_str = f"{battery*100:.0f}%"
-                    else:
-                        battery_str = "N/A"
-                    robot_states.append(f"{name}({status}, {battery_str})")
-
-                self.results.append(TestResult(
-                    test_name, TestStatus.PASS,
-                    f"로봇: {', '.join(robot_states) if robot_states else '없음'}"
-                ))
-            elif response.status_code == 404:
-                self.results.append(TestResult(
-                    test_name, TestStatus.WARN, "Fleet을 찾을 수 없음"
-                ))
-            elif response.status_code == 401:
-                self.results.append(TestResult(
-                    test_name, TestStatus.SKIP, "인증 필요"
-                ))
-            else:
-                self.results.append(TestResult(
-                    test_name, TestStatus.FAIL, f"HTTP {response.status_code}"
-                ))
-        except Exception as e:
-            self.results.append(TestResult(
-                test_name, TestStatus.FAIL, str(e)
-            ))
 
-    async def test_tasks(self, client: httpx.AsyncClient):
-        """Task API 테스트"""
-        test_name = "Task 목록 조회"
-        try:
-            response = await client.get(f"{self.api_url}/tasks")
+async def _read_building_map(response: httpx.Response) -> dict | None:
+    """빌딩 맵 응답을 스트리밍으로 파싱하여 _reduce_building_map()과 같은 값을 반환
 
-            if response.status_code == 200:
-                data = response.json()
+    빌딩 맵은 수 MB가 될 수 있으므로 전체 dict 트리를 만들지 않고, 받은 청크를
+    ijson에 바로 넘기며 이름과 레벨/리프트 수만 셉니다.
+    """
+    if ijson is None:
+        return _reduce_building_map(await _read_json(response))
 
-                if data:
-                    status_counts = {}
-                    for task in data:
-                        status = task.get("status", "unknown")
-                        status_counts[status] = status_counts.get(status, 0) + 1
+    summary = {"name": None, "levels": 0, "lifts": 0}
+    has_keys = False
+    events = ijson.sendable_list()
+    parser = ijson.parse_coro(events)
 
-                    status_str = ", ".join([f"{k}: {v}" for k, v in status_counts.items()])
-                    self.results.append(TestResult(
-                        test_name, TestStatus.PASS,
-                        f"Task {len(data)}개 ({status_str})"
-                    ))
+    def consume():
+        nonlocal has_keys
+        for prefix, event, value in events:
+            if prefix == "":
+                has_keys = has_keys or event == "map_key"
+            elif prefix == "name":
+                summary["name"] = value
+            elif prefix in ("levels.item", "lifts.item") and event in _VALUE_START_EVENTS:
+                summary[prefix[:-5]] += 1
+        del events[:]
 
-                    # 첫 번째 Task 상세 테스트
-                    if data:
-                        first_task_id = data[0].get("booking", {}).get("id")
-                        if first_task_id:
-                            await self.test_task_detail(client, first_task_id)
-                else:
-                    self.results.append(TestResult(
-                        test_name, TestStatus.WARN, "Task 데이터 없음"
-                    ))
-            elif response.status_code == 401:
-                self.results.append(TestResult(
-                    test_name, TestStatus.SKIP, "인증 필요"
-                ))
-            else:
-                self.results.append(TestResult(
-                    test_name, TestStatus.FAIL, f"HTTP {response.status_code}"
-                ))
-        except Exception as e:
-            self.results.append(TestResult(
-                test_name, TestStatus.FAIL, str(e)
-            ))
+    async for chunk in response.aiter_bytes():
+        parser.send(chunk)
+        consume()
+    parser.close()
+    consume()
+    return summary if has_keys else None
 
-    async def test_task_detail(self, client: httpx.AsyncClient, task_id: str):
-        """Task 상세 테스트"""
-        test_name = f"Task 상세: {task_id[:20]}..."
-        try:
-            response = await client.get(f"{self.api_url}/tasks/{task_id}/state")
-
-            if response.status_code == 200:
-                data = response.json()
-                status = data.get("status", "unknown")
-                category = data.get("category", "unknown")
-                assigned = data.get("assigned_to", {})
-                assigned_str = f"{assigned.get('group')}/{assigned.get('name')}" if assigned else "미배정"
-
-                self.results.append(TestResult(
-                    test_name, TestStatus.PASS,
-                    f"상태: {status}, 유형: {category}, 배정: {assigned_str}"
-                ))
-            elif response.status_code == 404:
-                self.results.append(TestResult(
-                    test_name, TestStatus.WARN, "Task를 찾을 수 없음"
-                ))
-            elif response.status_code == 401:
-                self.results.append(TestResult(
-                    test_name, TestStatus.SKIP, "인증 필요"
-                ))
-            else:
-                self.results.append(TestResult(
-                    test_name, TestStatus.FAIL, f"HTTP {response.status_code}"
-                ))
-        except Exception as e:
-            self.results.append(TestResult(
-                test_name, TestStatus.FAIL, str(e)
-            ))
 
-    async def test_doors(self, client: httpx.AsyncClient):
-        """Door API 테스트"""
-        test_name = "Door 목록 조회"
-        try:
-            response = await client.get(f"{self.api_url}/doors")
+def _summarize_connection(data: Any) -> Summary:
+    return TestStatus.PASS, f"서버 시간: {data}", None
 
-            if response.status_code == 200:
-                data = response.json()
 
-                if data:
-                    door_names = [d.get("door_name", "unknown") for d in data]
-                    self.results.append(TestResult(
-                        test_name, TestStatus.PASS,
-                        f"Door {len(data)}개: {', '.join(door_names[:5])}{'...' if len(door_names) > 5 else ''}"
-                    ))
-                else:
-                    self.results.append(TestResult(
-                        test_name, TestStatus.WARN, "Door 데이터 없음"
-                    ))
-            elif response.status_code == 401:
-                self.results.append(TestResult(
-                    test_name, TestStatus.SKIP, "인증 필요"
-                ))
-            else:
-                self.results.append(TestResult(
-                    test_name, TestStatus.FAIL, f"HTTP {response.status_code}"
-                ))
-        except Exception as e:
-            self.results.append(TestResult(
-                test_name, TestStatus.FAIL, str(e)
-            ))
+def _summarize_building_map(details: dict | None, expected: dict) -> Summary:
+    """details: _reduce_building_map()/_read_building_map()의 결과"""
+    if not details:
+        return TestStatus.WARN, "빌딩 맵 데이터 없음", None
 
-    async def test_lifts(self, client: httpx.AsyncClient):
-        """Lift API 테스트"""
-        test_name = "Lift 목록 조회"
-        try:
-            response = await client.get(f"{self.api_url}/lifts")
+    # 기대값과 비교
+    if expected and details["name"] != expected.get("name"):
+        return (
+            TestStatus.WARN,
+            f"맵 이름 불일치: {details['name']} != {expected.get('name')}",
+            details,
+        )
+    return (
+        TestStatus.PASS,
+        f"맵: {details['name']}, 레벨: {details['levels']}, 리프트: {details['lifts']}",
+        details,
+    )
 
-            if response.status_code == 200:
-                data = response.json()
 
-                if data:
-                    lift_info = []
-                    for lift in data:
-                        name = lift.get("lift_name", "unknown")
-                        floor = lift.get("current_floor", "?")
-                        lift_info.append(f"{name}(현재: {floor})")
+def _summarize_fleets(data: list) -> Summary:
+    if not data:
+        return TestStatus.WARN, "Fleet 데이터 없음", None
 
-                    self.results.append(TestResult(
-                        test_name, TestStatus.PASS,
-                        f"Lift {len(data)}개: {', '.join(lift_info)}"
-                    ))
-                else:
-                    self.results.append(TestResult(
-                        test_name, TestStatus.WARN, "Lift 데이터 없음"
-                    ))
-            elif response.status_code == 401:
-                self.results.append(TestResult(
-                    test_name, TestStatus.SKIP, "인증 필요"
-                ))
-            else:
-                self.results.append(TestResult(
-                    test_name, TestStatus.FAIL, f"HTTP {response.status_code}"
-                ))
-        except Exception as e:
-            self.results.append(TestResult(
-                test_name, TestStatus.FAIL, str(e)
-            ))
+    fleet_info = []
+    for fleet in data:
+        robots = fleet.get("robots", {})
+        fleet_info.append(f"{fleet.get('name')}({len(robots)}대)")
+    return TestStatus.PASS, f"Fleet {len(data)}개: {', '.join(fleet_info)}", {"fleets": data}
 
-    async def test_dispensers(self, client: httpx.AsyncClient):
-        """Dispenser API 테스트"""
-        test_name = "Dispenser 목록 조회"
-        try:
-            response = await client.get(f"{self.api_url}/dispensers")
 
-            if response.status_code == 200:
-                data = response.json()
+def _summarize_fleet_state(data: dict) -> Summary:
+    robots = data.get("robots", {})
+    robot_states = []
+    for name, robot in robots.items():
+        status = robot.get("status", "unknown")
+        battery = robot.get("battery")
+        if battery is not None:
+            battery_str = f"{battery*100:.0f}%"
+        else:
+            battery_str = "N/A"
+        robot_states.append(f"{name}({status}, {battery_str})")
+    return TestStatus.PASS, f"로봇: {', '.join(robot_states) if robot_states else '없음'}", None
 
-                if data:
-                    guids = [d.get("guid", "unknown") for d in data]
-                    self.results.append(TestResult(
-                        test_name, TestStatus.PASS,
-                        f"Dispenser {len(data)}개: {', '.join(guids)}"
-                    ))
-                else:
-                    self.results.append(TestResult(
-                        test_name, TestStatus.WARN, "Dispenser 데이터 없음"
-                    ))
-            elif response.status_code == 401:
-                self.results.append(TestResult(
-                    test_name, TestStatus.SKIP, "인증 필요"
-                ))
-            else:
-                self.results.append(TestResult(
-                    test_name, TestStatus.FAIL, f"HTTP {response.status_code}"
-                ))
-        except Exception as e:
-            self.results.append(TestResult(
-                test_name, TestStatus.FAIL, str(e)
-            ))
 
-    async def test_ingestors(self, client: httpx.AsyncClient):
-        """Ingestor API 테스트"""
-        test_name = "Ingestor 목록 조회"
-        try:
-            response = await client.get(f"{self.api_url}/ingestors")
+def _summarize_tasks(data: list) -> Summary:
+    if not data:
+        return TestStatus.WARN, "Task 데이터 없음", None
 
-            if response.status_code == 200:
-                data = response.json()
+    status_counts = Counter(task.get("status", "unknown") for task in data)
 
-                if data:
-                    guids = [d.get("guid", "unknown") for d in data]
-                    self.results.append(TestResult(
-                        test_name, TestStatus.PASS,
-                        f"Ingestor {len(data)}개: {', '.join(guids)}"
-                    ))
-                else:
-                    self.results.append(TestResult(
-                        test_name, TestStatus.WARN, "Ingestor 데이터 없음"
-                    ))
-            elif response.status_code == 401:
-                self.results.append(TestResult(
-                    test_name, TestStatus.SKIP, "인증 필요"
-                ))
-            else:
-                self.results.append(TestResult(
-                    test_name, TestStatus.FAIL, f"HTTP {response.status_code}"
-                ))
-        except Exception as e:
-            self.results.append(TestResult(
-                test_name, TestStatus.FAIL, str(e)
-            ))
+    status_str = ", ".join([f"{k}: {v}" for k, v in status_counts.items()])
+    return TestStatus.PASS, f"Task {len(data)}개 ({status_str})", None
 
-    async def test_alerts(self, client: httpx.AsyncClient):
-        """Alert API 테스트"""
-        test_name = "Alert 목록 조회"
-        try:
-            # Alert API는 다른 엔드포인트 구조를 가질 수 있음
-            response = await client.get(f"{self.api_url}/alerts/requests")
-
-            if response.status_code == 200:
-                # WebSocket 엔드포인트일 수 있으므로 건너뜀
-                self.results.append(TestResult(
-                    test_name, TestStatus.SKIP, "WebSocket 엔드포인트"
-                ))
-            elif response.status_code == 401:
-                self.results.append(TestResult(
-                    test_name, TestStatus.SKIP, "인증 필요"
-                ))
-            else:
-                self.results.append(TestResult(
-                    test_name, TestStatus.WARN, f"HTTP {response.status_code}"
-                ))
-        except Exception as e:
-            self.results.append(TestResult(
-                test_name, TestStatus.SKIP, "Alert API는 WebSocket 기반"
-            ))
 
-    async def test_beacons(self, client: httpx.AsyncClient):
-        """Beacon API 테스트"""
-        test_name = "Beacon 목록 조회"
-        try:
-            response = await client.get(f"{self.api_url}/beacons")
+def _summarize_task_state(data: dict) -> Summary:
+    status = data.get("status", "unknown")
+    category = data.get("category", "unknown")
+    assigned = data.get("assigned_to", {})
+    assigned_str = f"{assigned.get('group')}/{assigned.get('name')}" if assigned else "미배정"
+    return TestStatus.PASS, f"상태: {status}, 유형: {category}, 배정: {assigned_str}", None
 
-            if response.status_code == 200:
-                data = response.json()
 
-                if data:
-                    online_count = sum(1 for b in data if b.get("online"))
-                    self.results.append(TestResult(
-                        test_name, TestStatus.PASS,
-                        f"Beacon {len(data)}개 (온라인: {online_count})"
-                    ))
-                else:
-                    self.results.append(TestResult(
-                        test_name, TestStatus.WARN, "Beacon 데이터 없음"
-                    ))
-            elif response.status_code == 401:
-                self.results.append(TestResult(
-                    test_name, TestStatus.SKIP, "인증 필요"
-                ))
-            else:
-                self.results.append(TestResult(
-                    test_name, TestStatus.FAIL, f"HTTP {response.status_code}"
-                ))
-        except Exception as e:
-            self.results.append(TestResult(
-                test_name, TestStatus.FAIL, str(e)
-            ))
+def _summarize_doors(data: list) -> Summary:
+    if not data:
+        return TestStatus.WARN, "Door 데이터 없음", None
 
-    async def test_users(self, client: httpx.AsyncClient):
-        """User API 테스트 (관리자 전용)"""
-        test_name = "사용자 목록 조회"
-        try:
-            response = await client.get(f"{self.api_url}/admin/users")
+    get = dict.get
+    door_names = [get(d, "door_name", "unknown") for d in data]
+    return (
+        TestStatus.PASS,
+        f"Door {len(data)}개: {', '.join(door_names[:5])}{'...' if len(door_names) > 5 else ''}",
+        None,
+    )
 
-            if response.status_code == 200:
-                data = response.json()
-                users = data.get("items", data) if isinstance(data, dict) else data
 
-                if users:
-                    admin_count = sum(1 for u in users if u.get("is_admin"))
-                    self.results.append(TestResult(
-                        test_name, TestStatus.PASS,
-                        f"사용자 {len(users)}명 (관리자: {admin_count})"
-                    ))
+def _summarize_lifts(data: list) -> Summary:
+    if not data:
+        return TestStatus.WARN, "Lift 데이터 없음", None
+
+    get = dict.get
+    lift_info = [
+        f"{get(lift, 'lift_name', 'unknown')}(현재: {get(lift, 'current_floor', '?')})"
+        for lift in data
+    ]
+    return TestStatus.PASS, f"Lift {len(data)}개: {', '.join(lift_info)}", None
+
+
+def _summarize_dispensers(data: list) -> Summary:
+    if not data:
+        return TestStatus.WARN, "Dispenser 데이터 없음", None
+
+    get = dict.get
+    guids = [get(d, "guid", "unknown") for d in data]
+    return TestStatus.PASS, f"Dispenser {len(data)}개: {', '.join(guids)}", None
+
+
+def _summarize_ingestors(data: list) -> Summary:
+    if not data:
+        return TestStatus.WARN, "Ingestor 데이터 없음", None
+
+    get = dict.get
+    guids = [get(d, "guid", "unknown") for d in data]
+    return TestStatus.PASS, f"Ingestor {len(data)}개: {', '.join(guids)}", None
+
+
+def _summarize_beacons(data: list) -> Summary:
+    if not data:
+        return TestStatus.WARN, "Beacon 데이터 없음", None
+
+    online_count = sum(1 for b in data if b.get("online"))
+    return TestStatus.PASS, f"Beacon {len(data)}개 (온라인: {online_count})", None
+
+
+def _summarize_users(data: Any) -> Summary:
+    users = data.get("items", data) if isinstance(data, dict) else data
+    if not users:
+        return TestStatus.WARN, "사용자 데이터 없음", None
+
+    admin_count = sum(1 for u in users if u.get("is_admin"))
+    return TestStatus.PASS, f"사용자 {len(users)}명 (관리자: {admin_count})", None
+
+
+# 엔드포인트 테스트 이름 (ApiTester.test_<이름>, --test 값). 사용자/권한 테스트는 인증 필요 시 건너뜀
+ENDPOINT_TESTS = [
+    "building_map", "fleets", "tasks", "doors", "lifts",
+    "dispensers", "ingestors", "alerts", "beacons", "users",
+]
+
+
+class ApiTester:
+    """API 테스터"""
+
+    def __init__(
+        self,
+        api_url: str,
+        expected_data_file: str | None = None,
+        max_concurrency: int = 4,
+        only: str | None = None,
+    ):
+        self.api_url = api_url.rstrip("/")
+        self.results: list[TestResult] = []
+        self.expected_data: dict = {}
+        # 지정하면 연결 테스트와 이 엔드포인트 테스트(ENDPOINT_TESTS 중 하나)만 실행
+        self.only = only
+        # async with 블록 동안 유지되어 여러 번의 run_all_tests()가 연결을 재사용
+        self.client: httpx.AsyncClient | None = None
+        # 연결 테스트가 실패하면 False가 되어 나머지 테스트는 요청 없이 건너뜀
+        self.server_up = True
+        # 테스트를 동시에 실행해도 한 번에 보내는 요청은 max_concurrency개까지
+        # (개발 PC의 서버에 요청이 한꺼번에 몰리지 않도록)
+        self._request_slots = asyncio.Semaphore(max_concurrency)
+
+        if expected_data_file:
+            path = Path(expected_data_file)
+            self.expected_data = _load_expected_data(path, path.stat().st_mtime_ns)
+
+    async def __aenter__(self) -> "ApiTester":
+        # 엔드포인트 테스트를 동시에 요청하므로 연결 풀을 넉넉히 두고, 풀 대기에는
+        # 시간 제한을 두지 않음. HTTP/2가 가능하면 요청들이 연결 하나를 함께 사용
+        self.client = httpx.AsyncClient(
+            base_url=self.api_url,
+            timeout=httpx.Timeout(30.0, connect=10.0, pool=None),
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=200),
+            http2=h2 is not None,
+            # JSON 응답(fleets, building_map 등)은 압축 효과가 크므로 압축 방식을 명시.
+            # br은 httpx가 풀 수 있을 때(brotli 설치 시)만 요청
+            headers={"Accept-Encoding": "gzip, deflate, br" if brotli is not None else "gzip, deflate"},
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """HTTP 클라이언트 종료"""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def run_all_tests(self):
+        """모든 테스트 실행 (async with ApiTester(...) 블록 안에서 호출)"""
+        banner = ["\n" + "=" * 60, "RMF API Server 테스트", "=" * 60, f"API URL: {self.api_url}", "=" * 60 + "\n"]
+        sys.stdout.write("\n".join(banner) + "\n")
+        sys.stdout.flush()
+
+        self.results = []
+        self.server_up = True
+
+        # 기본 연결 테스트
+        await self.test_connection()
+
+        # API 엔드포인트 테스트는 서로 독립적이므로 동시에 요청
+        tests = [
+            getattr(ApiTester, f"test_{name}")
+            for name in ENDPOINT_TESTS
+            if self.only is None or name == self.only
+        ]
+        for results in await asyncio.gather(*(self._run_test(test) for test in tests)):
+            self.results.extend(results)
+
+        self.print_summary()
+
+    async def _run_test(self, test, *args) -> list[TestResult]:
+        """테스트 하나를 별도 결과 목록에 기록하며 실행
+
+        동시에 실행해도 결과가 완료 순서가 아닌 테스트 순서대로 출력되도록,
+        결과 목록만 따로 가진 사본에서 실행합니다.
+        """
+        tester = copy.copy(self)
+        tester.results = []
+        await test(tester, *args)
+        return tester.results
+
+    async def _probe(
+        self,
+        test_name: str,
+        path: str,
+        summarize: Callable[[Any], Summary] | None = None,
+        responses: dict[int, tuple[TestStatus, str]] = _AUTH_RESPONSES,
+        other_status: TestStatus = TestStatus.FAIL,
+        on_error: tuple[TestStatus, str] | None = None,
+        read: Callable[[httpx.Response], Awaitable[Any]] = _read_json,
+    ) -> Any:
+        """path를 GET 요청하고 응답 상태에 따라 결과를 기록
+
+        responses에 있는 상태 코드는 지정된 결과로, 그 외 200 응답은 summarize(응답
+        데이터)의 결과로, 나머지 상태 코드는 other_status로 기록합니다. 요청 중 예외가
+        나면 on_error(없으면 FAIL과 예외 메시지)로 기록합니다.
+        200 응답 본문은 read(응답)로 읽습니다 (기본: 전체 JSON 파싱).
+        200 응답이면 read의 결과를, 아니면 None을 반환합니다.
+        연결 테스트가 실패했으면 요청하지 않고 SKIP으로 기록합니다.
+        """
+        if not self.server_up:
+            self.results.append(TestResult(test_name, TestStatus.SKIP, "서버 연결 실패로 건너뜀"))
+            return None
+
+        try:
+            async with self._request_slots, self.client.stream("GET", path) as response:
+                if response.status_code in responses:
+                    self.results.append(TestResult(test_name, *responses[response.status_code]))
+                elif response.status_code == 200:
+                    data = await read(response)
+                    self.results.append(TestResult(test_name, *summarize(data)))
+                    return data
                 else:
                     self.results.append(TestResult(
-                        test_name, TestStatus.WARN, "사용자 데이터 없음"
+                        test_name, other_status, f"HTTP {response.status_code}"
                     ))
-            elif response.status_code == 401:
-                self.results.append(TestResult(
-                    test_name, TestStatus.SKIP, "인증 필요"
-                ))
-            elif response.status_code == 403:
-                self.results.append(TestResult(
-                    test_name, TestStatus.SKIP, "관리자 권한 필요"
-                ))
-            else:
-                self.results.append(TestResult(
-                    test_name, TestStatus.FAIL, f"HTTP {response.status_code}"
-                ))
         except Exception as e:
-            self.results.append(TestResult(
-                test_name, TestStatus.FAIL, str(e)
+            self.results.append(TestResult(test_name, *(on_error or (TestStatus.FAIL, str(e)))))
+        return None
+
+    async def test_connection(self):
+        """기본 연결 테스트"""
+        data = await self._probe("API 서버 연결", "/time", _summarize_connection, responses={})
+        self.server_up = data is not None
+
+    async def test_building_map(self):
+        """빌딩 맵 API 테스트"""
+        expected = self.expected_data.get("building_map", {})
+        await self._probe(
+            "빌딩 맵 조회", "/building_map",
+            functools.partial(_summarize_building_map, expected=expected),
+            read=_read_building_map,
+        )
+
+    async def test_fleets(self):
+        """Fleet API 테스트"""
+        data = await self._probe("Fleet 목록 조회", "/fleets", _summarize_fleets)
+
+        if data:
+            # 각 Fleet 상세 테스트 (동시에 요청)
+            details = await asyncio.gather(*(
+                self._run_test(ApiTester.test_fleet_detail, fleet.get("name"))
+                for fleet in data
             ))
+            for results in details:
+                self.results.extend(results)
+
+    async def test_fleet_detail(self, fleet_name: str):
+        """Fleet 상세 테스트"""
+        await self._probe(
+            f"Fleet 상세: {fleet_name}", f"/fleets/{fleet_name}/state", _summarize_fleet_state,
+            responses={**_AUTH_RESPONSES, 404: (TestStatus.WARN, "Fleet을 찾을 수 없음")},
+        )
+
+    async def test_tasks(self):
+        """Task API 테스트"""
+        data = await self._probe("Task 목록 조회", "/tasks", _summarize_tasks)
+
+        # 첫 번째 Task 상세 테스트
+        if data:
+            first_task_id = data[0].get("booking", {}).get("id")
+            if first_task_id:
+                await self.test_task_detail(first_task_id)
+
+    async def test_task_detail(self, task_id: str):
+        """Task 상세 테스트"""
+        await self._probe(
+            f"Task 상세: {task_id[:20]}...", f"/tasks/{task_id}/state", _summarize_task_state,
+            responses={**_AUTH_RESPONSES, 404: (TestStatus.WARN, "Task를 찾을 수 없음")},
+        )
+
+    async def test_doors(self):
+        """Door API 테스트"""
+        await self._probe("Door 목록 조회", "/doors", _summarize_doors)
+
+    async def test_lifts(self):
+        """Lift API 테스트"""
+        await self._probe("Lift 목록 조회", "/lifts", _summarize_lifts)
+
+    async def test_dispensers(self):
+        """Dispenser API 테스트"""
+        await self._probe("Dispenser 목록 조회", "/dispensers", _summarize_dispensers)
+
+    async def test_ingestors(self):
+        """Ingestor API 테스트"""
+        await self._probe("Ingestor 목록 조회", "/ingestors", _summarize_ingestors)
+
+    async def test_alerts(self):
+        """Alert API 테스트"""
+        # Alert API는 다른 엔드포인트 구조를 가질 수 있음.
+        # 200이어도 WebSocket 엔드포인트일 수 있으므로 건너뜀
+        await self._probe(
+            "Alert 목록 조회", "/alerts/requests",
+            responses={
+                **_AUTH_RESPONSES,
+                200: (TestStatus.SKIP, "WebSocket 엔드포인트"),
+            },
+            other_status=TestStatus.WARN,
+            on_error=(TestStatus.SKIP, "Alert API는 WebSocket 기반"),
+        )
+
+    async def test_beacons(self):
+        """Beacon API 테스트"""
+        await self._probe("Beacon 목록 조회", "/beacons", _summarize_beacons)
+
+    async def test_users(self):
+        """User API 테스트 (관리자 전용)"""
+        await self._probe(
+            "사용자 목록 조회", "/admin/users", _summarize_users,
+            responses={**_AUTH_RESPONSES, 403: (TestStatus.SKIP, "관리자 권한 필요")},
+        )
 
     def print_summary(self):
         """테스트 결과 요약 출력"""
-        print("\n" + "=" * 60)
-        print("테스트 결과")
-        print("=" * 60)
+        lines = ["\n" + "=" * 60, "테스트 결과", "=" * 60]
 
         for result in self.results:
-            print(f"{result.status.value} {result.name}")
+            lines.append(f"{result.status.value} {result.name}")
             if result.message:
-                print(f"     {result.message}")
+                lines.append(f"     {result.message}")
 
         # 통계
-        pass_count = sum(1 for r in self.results if r.status == TestStatus.PASS)
-        fail_count = sum(1 for r in self.results if r.status == TestStatus.FAIL)
-        warn_count = sum(1 for r in self.results if r.status == TestStatus.WARN)
-        skip_count = sum(1 for r in self.results if r.status == TestStatus.SKIP)
-
-        print("\n" + "-" * 60)
-        print(f"총 {len(self.results)}개 테스트")
-        print(f"  ✓ 성공: {pass_count}")
-        print(f"  ✗ 실패: {fail_count}")
-        print(f"  ⚠ 경고: {warn_count}")
-        print(f"  ○ 건너뜀: {skip_count}")
-        print("=" * 60)
+        counts = Counter(r.status for r in self.results)
+        fail_count = counts[TestStatus.FAIL]
+
+        lines += [
+            "\n" + "-" * 60,
+            f"총 {len(self.results)}개 테스트",
+            f"  ✓ 성공: {counts[TestStatus.PASS]}",
+            f"  ✗ 실패: {fail_count}",
+            f"  ⚠ 경고: {counts[TestStatus.WARN]}",
+            f"  ○ 건너뜀: {counts[TestStatus.SKIP]}",
+            "=" * 60,
+        ]
+        # 결과가 많아도 한 번에 출력
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
 
         # 실패가 있으면 비정상 종료
         if fail_count > 0:
@@ -587,10 +535,15 @@ async def main():
         default=None,
         help="기대하는 데이터가 담긴 JSON 파일 (sample_data.json)"
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="동시에 보내는 최대 요청 수 (기본값: 4)"
+    )
     parser.add_argument(
         "--test",
-        choices=["building_map", "fleets", "tasks", "doors", "lifts",
-                 "dispensers", "ingestors", "alerts", "beacons", "users"],
+        choices=ENDPOINT_TESTS,
         help="특정 테스트만 실행"
     )
 
@@ -602,9 +555,15 @@ async def main():
         if default_path.exists():
             args.expected_data = str(default_path)
 
-    tester = ApiTester(args.api_url, args.expected_data)
-    await tester.run_all_tests()
+    async with ApiTester(args.api_url, args.expected_data, args.concurrency, args.test) as tester:
+        await tester.run_all_tests()
 
 
 if __name__ == "__main__":
+    try:
+        import uvloop
+    except ImportError:  # 선택 사항: 없으면 기본 asyncio loop 사용
+        pass
+    else:
+        uvloop.install()
     asyncio.run(main())